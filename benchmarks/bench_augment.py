@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ml"))
+
+from training.augment import generate_dataset_with_noise, iter_dataset_with_noise  # noqa: E402
+
+DATASET = os.path.join(os.path.dirname(__file__), "..", "dataset", "finaldata(1).csv.xlsx")
+
+# usage: python benchmarks/bench_augment.py
+# Rows/s of the notebook's original per-cell loop against the block sampler,
+# plus a two-sample KS test per numeric column between their outputs (the
+# samplers use different RNG streams, so only the distributions can match).
+# Uses the real dataset when openpyxl can read it, synthetic rows otherwise.
+
+
+# the original notebook implementation, kept as the baseline
+def legacy_noise(df, labels, n_samples=100, noise_level_numeric=0.05, noise_level_categorical=0.01):
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    cat_cols = df.select_dtypes(exclude=[np.number]).columns
+    new_data = []
+    new_labels = []
+    for _ in range(n_samples):
+        idx = np.random.randint(0, len(df))
+        row = df.iloc[idx].copy()
+        label = labels.iloc[idx]
+        for col in numeric_cols:
+            noise_type = np.random.choice(['normal', 'uniform'])
+            if noise_type == 'normal':
+                noise = np.random.normal(0, noise_level_numeric * df[col].std())
+            else:
+                noise = np.random.uniform(-noise_level_numeric * df[col].std(), noise_level_numeric * df[col].std())
+            row[col] += noise
+            if col == "Age":
+                row[col] = int(round(row[col]))
+        for col in cat_cols:
+            if np.random.rand() < noise_level_categorical:
+                unique_values = df[col].unique()
+                row[col] = np.random.choice(unique_values)
+        for col in numeric_cols:
+            row[col] = np.clip(row[col], df[col].min(), df[col].max())
+        new_data.append(row)
+        new_labels.append(label)
+    df_aug = pd.DataFrame(new_data)
+    df_aug['Liver Healthy'] = new_labels
+    return df_aug
+
+
+def load():
+    try:
+        data = pd.read_excel(DATASET).drop(columns=["S. No."])
+        data["Liver Healthy"] = data["Liver Healthy"].map({"Yes": 1, "No": 0, "Mid": 1}).astype(int)
+    except (ImportError, OSError):
+        rng = np.random.default_rng(0)
+        n = 131
+        data = pd.DataFrame({
+            "Age": rng.integers(19, 86, n), "Gender": rng.choice(["Male", "Female"], n),
+            "R": rng.uniform(80, 2000, n), "G": rng.uniform(45, 1500, n), "B": rng.uniform(30, 1100, n),
+            "C": rng.uniform(150, 4300, n), "Temp90614": rng.normal(31, 3, n), "Temp90640": rng.normal(34, 3, n),
+            "GSR": rng.uniform(40, 1600, n), "BMI": rng.normal(24.7, 4.5, n), "Liver Healthy": rng.integers(0, 2, n)
+        })
+    return data.drop(columns=["Liver Healthy"]), data["Liver Healthy"]
+
+
+def main():
+    df, labels = load()
+    n = 2000
+    np.random.seed(0)
+    t0 = time.perf_counter()
+    legacy = legacy_noise(df, labels, n_samples=n)
+    legacy_rate = n / (time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    block = generate_dataset_with_noise(df, labels, n_samples=n, seed=0)
+    block_rate = n / (time.perf_counter() - t0)
+
+    print(f"{len(df)} source rows, {n} augmented rows")
+    print(f"{'legacy loop':>12}  {legacy_rate:12.0f} rows/s")
+    print(f"{'block':>12}  {block_rate:12.0f} rows/s  x{block_rate / legacy_rate:.0f}")
+
+    print("KS p-value per column (legacy vs block):")
+    for col in df.select_dtypes(include=[np.number]).columns:
+        p = stats.ks_2samp(legacy[col].astype(float), block[col].astype(float)).pvalue
+        print(f"  {col:>12}  {p:.3f}")
+
+    big = 1_000_000
+    t0 = time.perf_counter()
+    rows = sum(len(chunk) for chunk in iter_dataset_with_noise(df, labels, big, seed=0, chunk_rows=100_000))
+    print(f"streamed {rows} rows in 100k chunks: {rows / (time.perf_counter() - t0):.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+BACKEND = os.path.join(os.path.dirname(__file__), "..", "website", "backend")
+sys.path.insert(0, BACKEND)
+
+from batcher import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, MicroBatcher  # noqa: E402
+
+# usage: python benchmarks/bench_batching.py [model_dir]
+# Drives the backend's scoring path with N concurrent clients, each sending
+# one-row requests back to back, once per request (threadpool, no batching)
+# and once through the micro-batching scheduler. The prediction cache is off
+# so every request reaches the models.
+
+REQUESTS_PER_CLIENT = 20
+
+
+async def drive(score, readings, clients):
+    latencies = []
+
+    async def client(offset):
+        for i in range(REQUESTS_PER_CLIENT):
+            reading = readings[(offset * REQUESTS_PER_CLIENT + i) % len(readings)]
+            t0 = time.perf_counter()
+            await score(reading)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client(k) for k in range(clients)))
+    elapsed = time.perf_counter() - t0
+    return len(latencies) / elapsed, np.percentile(latencies, 99) * 1e3
+
+
+async def run(server, readings, clients):
+    bundle = server.registry.active
+
+    async def per_request(reading):
+        p_vote, p_stack = await asyncio.to_thread(server.score_features, [reading], bundle)
+        return p_vote[0], p_stack[0]
+
+    batcher = MicroBatcher(server.score_features)
+    batcher.start()
+    try:
+        rows = []
+        for name, score in (("per-request", per_request),
+                            ("batched", lambda reading: batcher.score(reading, bundle))):
+            await score(readings[0])  # warm up
+            rows.append((name,) + await drive(score, readings, clients))
+    finally:
+        await batcher.stop()
+    return rows, batcher.stats()["mean_batch_size"]
+
+
+def main(model_dir=BACKEND):
+    warnings.filterwarnings("ignore")
+    os.environ.update(LIVERGUARD_MODEL_DIR=os.path.abspath(model_dir), ESP32_POLL_INTERVAL="0",
+                      PREDICTION_CACHE_SIZE="0")
+    # server loads the models at import time, after the environment is set
+    import server
+
+    rng = np.random.default_rng(0)
+    readings = [
+        server.PatientReading(
+            age=int(rng.integers(20, 80)), gender=str(rng.choice(["Male", "Female"])),
+            height=float(rng.normal(168, 8)), weight=float(rng.normal(70, 12)),
+            r=float(rng.uniform(80, 200)), g=float(rng.uniform(80, 200)), b=float(rng.uniform(40, 160)),
+            bodyTemp=float(rng.normal(36.8, 0.5)), thermalMax=float(rng.normal(35, 1)),
+            gsr=float(rng.uniform(200, 800)), c=float(rng.uniform(300, 900))
+        )
+        for _ in range(512)
+    ]
+
+    print(f"engine: {server.registry.active.engine}, batch <= {BATCH_MAX_SIZE}, "
+          f"wait <= {BATCH_MAX_WAIT_MS} ms")
+    print(f"{'clients':>7}  {'path':>11}  {'req/s':>9}  {'p99 ms':>9}  {'mean batch':>10}")
+    for clients in (1, 32, 256):
+        rows, mean_batch = asyncio.run(run(server, readings, clients))
+        for name, throughput, p99 in rows:
+            batch = f"{mean_batch:10.1f}" if name == "batched" else f"{1:10.1f}"
+            print(f"{clients:>7}  {name:>11}  {throughput:9.0f}  {p99:9.2f}  {batch}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,86 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "website", "backend"))
+
+# usage: python benchmarks/bench_cold_start.py [model_dir]
+# Starts `uvicorn server:app --workers N` for N in 1, 4, 16 and reports the
+# time until every worker finished startup, plus per-worker RSS and PSS
+# (PSS splits shared pages, e.g. memory-mapped model arrays, between workers).
+
+STARTUP_LINE = "Application startup complete"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def proc_kb(pid, path, field):
+    try:
+        with open(f"/proc/{pid}/{path}") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def worker_pids(parent):
+    pids = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/status") as f:
+                ppid = next(int(line.split()[1]) for line in f if line.startswith("PPid:"))
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except (OSError, StopIteration):
+            continue
+        if ppid == parent and b"spawn_main" in cmdline:
+            pids.append(int(entry))
+    return pids
+
+
+def run(workers, model_dir):
+    env = dict(os.environ, LIVERGUARD_MODEL_DIR=model_dir, ESP32_POLL_INTERVAL="0")
+    cmd = [sys.executable, "-m", "uvicorn", "server:app", "--port", str(free_port()),
+           "--workers", str(workers), "--log-level", "info"]
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=BACKEND, env=env, stderr=subprocess.PIPE, text=True)
+    ready = 0
+    try:
+        for line in proc.stderr:
+            if STARTUP_LINE in line:
+                ready += 1
+                if ready == workers:
+                    break
+        elapsed = time.perf_counter() - t0
+        if ready < workers:
+            raise RuntimeError(f"only {ready}/{workers} workers started")
+        # a single worker is served by the uvicorn process itself
+        pids = worker_pids(proc.pid) or [proc.pid]
+        rss = [proc_kb(pid, "status", "VmRSS") for pid in pids]
+        pss = [proc_kb(pid, "smaps_rollup", "Pss") for pid in pids]
+        return elapsed, sum(rss) / len(rss) / 1024, sum(pss) / len(pss) / 1024
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(model_dir=BACKEND):
+    model_dir = os.path.abspath(model_dir)
+    print(f"{'workers':>7}  {'cold start s':>12}  {'RSS MB/worker':>13}  {'PSS MB/worker':>13}")
+    for workers in (1, 4, 16):
+        elapsed, rss, pss = run(workers, model_dir)
+        print(f"{workers:>7}  {elapsed:12.2f}  {rss:13.1f}  {pss:13.1f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+BACKEND = os.path.join(os.path.dirname(__file__), "..", "website", "backend")
+sys.path.insert(0, BACKEND)
+
+import joblib  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from compiled_model import CompiledEnsemble, compile_ensembles, max_deviation  # noqa: E402
+from ensemble import SharedEnsemble  # noqa: E402
+from features import FEATURE_COLUMNS  # noqa: E402
+
+# usage: python benchmarks/bench_compiled.py [model_dir]
+
+
+def latencies(fn, repeats):
+    out = np.empty(repeats)
+    for i in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        out[i] = time.perf_counter() - t0
+    return out * 1e3
+
+
+def main(model_dir=BACKEND):
+    warnings.filterwarnings("ignore")
+    scaler = joblib.load(os.path.join(model_dir, "scaler.pkl"))
+    voting_model = joblib.load(os.path.join(model_dir, "voting_model.pkl"))
+    stacked_model = joblib.load(os.path.join(model_dir, "stacked_model.pkl"))
+    engine = CompiledEnsemble(compile_ensembles(scaler, voting_model, stacked_model))
+    shared = SharedEnsemble(voting_model, stacked_model)
+
+    def sklearn_path(features):
+        X = scaler.transform(features)
+        return voting_model.predict_proba(X)[:, 1], stacked_model.predict_proba(X)[:, 1]
+
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>6}  {'engine':>8}  {'p50 ms':>9}  {'p99 ms':>9}  {'us/row':>9}")
+    for batch in (1, 32, 1024):
+        raw = scaler.mean_ + scaler.scale_ * rng.normal(size=(batch, len(FEATURE_COLUMNS)))
+        frame = pd.DataFrame(raw, columns=FEATURE_COLUMNS)
+        repeats = 200 if batch < 1024 else 20
+        for name, fn in (("sklearn", lambda: sklearn_path(frame)),
+                         ("shared", lambda: shared.predict_proba(scaler.transform(frame))),
+                         ("compiled", lambda: engine.predict_proba(raw))):
+            fn()  # warm up
+            ms = latencies(fn, repeats)
+            p50, p99 = np.percentile(ms, [50, 99])
+            print(f"{batch:>6}  {name:>8}  {p50:9.3f}  {p99:9.3f}  {p50 * 1e3 / batch:9.1f}")
+
+    raw = scaler.mean_ + scaler.scale_ * rng.normal(scale=1.5, size=(2000, len(FEATURE_COLUMNS)))
+    deviation = max_deviation(engine, scaler, voting_model, stacked_model,
+                              pd.DataFrame(raw, columns=FEATURE_COLUMNS))
+    print(f"max |p_compiled - p_sklearn| = {deviation:.2e}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier, StackingClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import SVC
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ml"))
+
+from training.stacking import fit_ensembles  # noqa: E402
+
+# usage: python benchmarks/bench_ensembles.py [rows] [n_jobs]
+# Seconds to produce the voting and stacked ensembles from the five tuned
+# base learners: the notebook's two .fit calls (35 base-learner fits)
+# against training/stacking.py (5 full fits + 25 fold fits as parallel
+# jobs), and the largest probability difference between the two.
+
+ROWS = 2000
+
+
+def members():
+    from catboost import CatBoostClassifier
+    from xgboost import XGBClassifier
+    return [
+        ("xgb", XGBClassifier(n_estimators=200, max_depth=5, random_state=42, n_jobs=-1)),
+        ("cat", CatBoostClassifier(iterations=200, depth=6, verbose=0, random_state=42, thread_count=-1,
+                                   allow_writing_files=False)),
+        ("rf", RandomForestClassifier(n_estimators=200, max_depth=10, random_state=42, n_jobs=-1)),
+        # fixed seeds so libsvm's internal Platt CV is the same in both runs
+        ("svm_rbf", SVC(C=2.0, probability=True, class_weight="balanced", random_state=0)),
+        ("svm_poly", SVC(kernel="poly", C=1.0, probability=True, class_weight="balanced", random_state=0)),
+    ]
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    n_jobs = int(sys.argv[2]) if len(sys.argv) > 2 else -1
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(rows, 7))
+    y = (X[:, 0] + X[:, 2] * X[:, 3] - 0.5 * X[:, 5] ** 2 + rng.normal(size=rows) > 0).astype(int)
+    X_new = rng.normal(size=(1000, 7))
+    base = members()
+
+    t0 = time.perf_counter()
+    stacked = StackingClassifier(estimators=base, final_estimator=LogisticRegression(max_iter=1000),
+                                 n_jobs=n_jobs).fit(X, y)
+    voting = VotingClassifier(estimators=base, voting="soft", n_jobs=n_jobs).fit(X, y)
+    sklearn_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    # the training pipeline already has these from its fit stage
+    fitted = [(name, clone(model).fit(X, y)) for name, model in base]
+    full_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    shared_voting, shared_stacked = fit_ensembles(fitted, X, y, final_estimator=LogisticRegression(max_iter=1000),
+                                                  n_jobs=n_jobs)
+    oof_s = time.perf_counter() - t0
+
+    diff = max(
+        np.abs(voting.predict_proba(X_new) - shared_voting.predict_proba(X_new)).max(),
+        np.abs(stacked.predict_proba(X_new) - shared_stacked.predict_proba(X_new)).max()
+    )
+    shared_s = full_s + oof_s
+    print(f"{rows} rows, n_jobs={n_jobs} ({os.cpu_count()} CPUs)")
+    print(f"{'sklearn .fit x2':>16}  {sklearn_s:7.2f}s")
+    print(f"{'shared fits':>16}  {shared_s:7.2f}s  ({full_s:.2f}s full + {oof_s:.2f}s folds)  "
+          f"x{sklearn_s / shared_s:.2f}")
+    print(f"max |p difference| {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
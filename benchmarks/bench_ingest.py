@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND = os.path.join(os.path.dirname(__file__), "..", "website", "backend")
+sys.path.insert(0, BACKEND)
+
+from rolling_stats import RollingStats  # noqa: E402
+from sensor_buffer import SENSOR_CHANNELS, SensorPoller  # noqa: E402
+from telemetry import TelemetryIngest, device_key, encode_packet  # noqa: E402
+
+# usage: python benchmarks/bench_ingest.py [devices]
+# Samples/s from wire bytes into the device buffers and rolling stats:
+# one JSON object per reading (what the poller parses today) against packed
+# binary packets of 1, 38 (one 1400-byte UDP datagram) and 1000 samples.
+
+SAMPLES = 100_000
+
+
+def make_poller(device_ids):
+    poller = SensorPoller(device_ids, interval=0)
+    stats = {device_id: RollingStats() for device_id in device_ids}
+    poller.listeners.append(lambda device_id, ts, values: stats[device_id].update_many(ts, values))
+    return poller
+
+
+def main(devices="100"):
+    device_ids = [f"station-{i}" for i in range(int(devices))]
+    rng = np.random.default_rng(0)
+    owner = rng.integers(0, len(device_ids), SAMPLES)
+    ts = time.time() + np.arange(SAMPLES) * 1e-3
+    values = rng.normal([150, 130, 90, 36.8, 35.0, 500], [2, 2, 2, 0.05, 0.3, 10], size=(SAMPLES, len(SENSOR_CHANNELS)))
+
+    # JSON: one body per reading, parsed into a dict and recorded
+    bodies = [json.dumps(dict(zip(SENSOR_CHANNELS, map(float, row)))).encode() for row in values]
+    poller = make_poller(device_ids)
+    t0 = time.perf_counter()
+    for i, body in enumerate(bodies):
+        poller.record(device_ids[owner[i]], json.loads(body))
+    json_rate = SAMPLES / (time.perf_counter() - t0)
+
+    print(f"{len(device_ids)} devices, {SAMPLES} samples")
+    print(f"{'path':>16}  {'bytes/sample':>12}  {'samples/s':>12}  {'speedup':>8}")
+    print(f"{'json':>16}  {sum(map(len, bodies)) / SAMPLES:12.1f}  {json_rate:12.0f}  {1.0:8.2f}")
+
+    # "board": each board packs its own readings; "gateway": packets mix devices
+    device_keys = np.array([device_key(d) for d in device_ids], dtype=np.uint32)
+    by_board = np.argsort(owner, kind="stable")
+    for layout, order in (("board", by_board), ("gateway", np.arange(SAMPLES))):
+        keys = device_keys[owner[order]]
+        for batch in (1, 38, 1000):
+            packets = [encode_packet(keys[i:i + batch], ts[order[i:i + batch]], values[order[i:i + batch]])
+                       for i in range(0, SAMPLES, batch)]
+            ingest = TelemetryIngest(make_poller(device_ids))
+            t0 = time.perf_counter()
+            for packet in packets:
+                ingest.ingest(packet)
+            rate = SAMPLES / (time.perf_counter() - t0)
+            assert ingest.samples == SAMPLES
+            name = f"{layout} x{batch}"
+            print(f"{name:>16}  {sum(map(len, packets)) / SAMPLES:12.1f}  {rate:12.0f}  {rate / json_rate:8.2f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
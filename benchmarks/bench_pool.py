@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BACKEND = os.path.join(os.path.dirname(__file__), "..", "website", "backend")
+sys.path.insert(0, BACKEND)
+
+from features import FEATURE_COLUMNS  # noqa: E402
+from inference_pool import InferencePool  # noqa: E402
+from model_registry import load_bundle, warm_bundle  # noqa: E402
+
+# usage: python benchmarks/bench_pool.py [model_dir] [batch_rows]
+# Throughput of scoring in the server process (threads, GIL-bound) against
+# the process pool with 1, 2, 4, ... workers up to the core count. One client
+# thread per worker keeps every worker busy.
+
+CALLS_PER_CLIENT = 20
+
+
+def throughput(score, batches, clients):
+    def client(k):
+        for i in range(CALLS_PER_CLIENT):
+            score(batches[(k + i) % len(batches)])
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(clients) as threads:
+        list(threads.map(client, range(clients)))
+    return clients * CALLS_PER_CLIENT * len(batches[0]) / (time.perf_counter() - t0)
+
+
+def main(model_dir=BACKEND, batch_rows="32"):
+    warnings.filterwarnings("ignore")
+    model_dir = os.path.abspath(model_dir)
+    bundle = warm_bundle(load_bundle(model_dir))
+    rng = np.random.default_rng(0)
+    scaler = bundle.scaler
+    batches = [scaler.mean_ + scaler.scale_ * rng.normal(size=(int(batch_rows), len(FEATURE_COLUMNS)))
+               for _ in range(16)]
+
+    cores = os.cpu_count() or 1
+    counts = sorted({n for n in (1, 2, 4, 8, 16, 32) if n < cores} | {cores})
+    print(f"engine: {bundle.engine}, {batch_rows} rows per call, {cores} cores")
+    print(f"{'workers':>7}  {'threads rows/s':>14}  {'pool rows/s':>12}  {'speedup':>8}")
+    for workers in counts:
+        in_process = throughput(bundle.score, batches, workers)
+        pool = InferencePool(workers, model_dirs=[model_dir])
+        pool.start()
+        try:
+            pool.warm()
+            pooled = throughput(lambda features: pool.score(features, bundle), batches, workers)
+        finally:
+            pool.stop()
+        print(f"{workers:>7}  {in_process:14.0f}  {pooled:12.0f}  {pooled / in_process:8.2f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND = os.path.join(os.path.dirname(__file__), "..", "website", "backend")
+sys.path.insert(0, BACKEND)
+
+from sensor_buffer import SENSOR_CHANNELS  # noqa: E402
+from store import ColumnStore  # noqa: E402
+
+# usage: python benchmarks/bench_store.py [devices] [hours]
+# Cost of ColumnStore.append on the request path (one reading per call, as
+# the poller produces them), flush throughput, and latency of the range
+# queries dashboards issue: one device over the last hour / day, and the
+# whole fleet over the last hour. Readings arrive at 2 Hz per device.
+
+RATE_HZ = 2.0
+
+
+def main(devices="50", hours="24"):
+    devices, hours = int(devices), float(hours)
+    device_ids = [f"station-{i}" for i in range(devices)]
+    n = int(devices * hours * 3600 * RATE_HZ)
+    rng = np.random.default_rng(0)
+    now = time.time()
+    ts = np.sort(rng.uniform(now - hours * 3600, now, n))
+    owner = rng.integers(0, devices, n)
+    values = rng.normal([150, 130, 90, 36.8, 35.0, 500], [2, 2, 2, 0.05, 0.3, 10], size=(n, len(SENSOR_CHANNELS)))
+
+    with tempfile.TemporaryDirectory() as root:
+        store = ColumnStore(root, flush_rows=n + 1, max_pending=n + 1)
+
+        calls = min(n, 100_000)
+        t0 = time.perf_counter()
+        for i in range(calls):
+            store.append("readings", ts=ts[i:i + 1], device_id=device_ids[owner[i]],
+                         **{ch: values[i:i + 1, j] for j, ch in enumerate(SENSOR_CHANNELS)})
+        per_call = (time.perf_counter() - t0) / calls
+        store.flush()
+
+        # the rest in device-sized chunks, flushed roughly every 10 minutes of data
+        step = int(devices * 600 * RATE_HZ)
+        t0 = time.perf_counter()
+        for i in range(calls, n, step):
+            sl = slice(i, min(n, i + step))
+            for d in np.unique(owner[sl]):
+                rows = np.flatnonzero(owner[sl] == d) + i
+                store.append("readings", ts=ts[rows], device_id=device_ids[d],
+                             **{ch: values[rows, j] for j, ch in enumerate(SENSOR_CHANNELS)})
+            store.flush()
+        flush_rate = (n - calls) / max(time.perf_counter() - t0, 1e-9)
+
+        print(f"{devices} devices, {hours:g} h at {RATE_HZ:g} Hz: {n} readings in {store.files} files")
+        print(f"append (1 reading/call)  {per_call * 1e6:8.1f} us")
+        print(f"append+flush             {flush_rate:8.0f} rows/s")
+        for name, kwargs in (
+            ("1 device, last hour", dict(device_id=device_ids[0], start=now - 3600)),
+            ("1 device, last day", dict(device_id=device_ids[0], start=now - 86400)),
+            ("fleet, last hour", dict(start=now - 3600)),
+        ):
+            t0 = time.perf_counter()
+            rows = store.query("readings", **kwargs)
+            ms = (time.perf_counter() - t0) * 1e3
+            print(f"{name:<24} {ms:8.1f} ms  {len(rows)} rows")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
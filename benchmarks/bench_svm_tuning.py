@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from sklearn.svm import SVC
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ml"))
+
+from training.svm_cv import SVMFoldCache, calibrated_svc  # noqa: E402
+from training.tuning import cv_folds, cv_splitter  # noqa: E402
+
+# usage: python benchmarks/bench_svm_tuning.py [rows] [trials]
+# Seconds for the same SVM_RBF / SVM_Poly trial grid scored two ways: an
+# SVC(probability=True) refit per fold (the notebook's objective) against
+# svm_cv's cached precomputed kernels. Also checks that both give the same
+# CV AUC and that the calibrated refit agrees with libsvm's predict_proba.
+
+ROWS = 1500
+TRIALS = 24
+
+
+def grid(trials, rng):
+    # the tuning search space, sampled like a TPE start-up phase would
+    for i in range(trials):
+        C = float(np.exp(rng.uniform(np.log(0.1), np.log(10))))
+        if i % 2:
+            yield "poly", C, {"degree": int(rng.integers(2, 5))}
+        else:
+            yield "rbf", C, {"gamma": str(rng.choice(["scale", "auto"]))}
+
+
+def legacy(X, y, folds, kernel, C, params):
+    scores = []
+    for tr, va in folds:
+        model = SVC(kernel=kernel, C=C, probability=True, class_weight="balanced", **params).fit(X[tr], y[tr])
+        scores.append(roc_auc_score(y[va], model.predict_proba(X[va])[:, 1]))
+    return float(np.mean(scores))
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    trials = int(sys.argv[2]) if len(sys.argv) > 2 else TRIALS
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(rows, 10))
+    y = (X[:, 0] + 0.5 * X[:, 3] ** 2 - X[:, 5] * X[:, 6] + rng.normal(size=rows) > 0.5).astype(int)
+    folds = cv_folds(y)
+    space = list(grid(trials, np.random.default_rng(1)))
+
+    t0 = time.perf_counter()
+    slow = [legacy(X, y, folds, kernel, C, params) for kernel, C, params in space]
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cache = SVMFoldCache(X, y, folds)
+    fast = [float(np.mean(cache.cv_decision(kernel, C, **params)[1])) for kernel, C, params in space]
+    cached_s = time.perf_counter() - t0
+
+    print(f"{rows} rows, {trials} trials, {len(folds)} folds")
+    print(f"{'per-fold SVC':>14}  {legacy_s:8.2f}s")
+    print(f"{'cached kernels':>14}  {cached_s:8.2f}s  x{legacy_s / cached_s:.1f}")
+    print(f"max |AUC difference| {np.max(np.abs(np.array(slow) - np.array(fast))):.4f}")
+
+    kernel, C, params = space[int(np.argmax(fast))]
+    t0 = time.perf_counter()
+    ours = calibrated_svc(cv_splitter(), kernel, C, **params).fit(X, y)
+    refit_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ref = SVC(kernel=kernel, C=C, probability=True, class_weight="balanced", random_state=0, **params).fit(X, y)
+    ref_s = time.perf_counter() - t0
+    diff = np.abs(ours.predict_proba(X)[:, 1] - ref.predict_proba(X)[:, 1]).max()
+    print(f"refit {kernel} C={C:.2f} {params}: {refit_s:.2f}s vs {ref_s:.2f}s, max |p difference| {diff:.3f}")
+
+
+if __name__ == "__main__":
+    main()
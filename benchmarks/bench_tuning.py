@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ml"))
+
+from training.tuning import MODEL_FAMILIES, run_tuning  # noqa: E402
+
+# usage: python benchmarks/bench_tuning.py [rows] [trials] [processes]
+# Wall seconds to tune every model family one after another (processes=1,
+# the notebook's loop) against one process per family, each into a fresh
+# SQLite study, next to the speedup run_tuning estimates from CPU time.
+
+ROWS = 400
+TRIALS = 5
+
+
+def main():
+    warnings.filterwarnings("ignore")
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    trials = int(sys.argv[2]) if len(sys.argv) > 2 else TRIALS
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(rows, 7))
+    y = (X[:, 0] + X[:, 2] * X[:, 3] - 0.5 * X[:, 5] ** 2 + rng.normal(size=rows) > 0).astype(int)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        serial = run_tuning(X, y, f"sqlite:///{tmp}/serial.db", trials, MODEL_FAMILIES, processes=1)
+        serial_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        parallel = run_tuning(X, y, f"sqlite:///{tmp}/parallel.db", trials, MODEL_FAMILIES, processes)
+        parallel_s = time.perf_counter() - t0
+
+    print(f"{rows} rows, {trials} trials x {len(MODEL_FAMILIES)} families ({os.cpu_count()} CPUs)")
+    print(f"{'processes=1':>16}  {serial_s:7.1f}s")
+    label = f"processes={parallel['processes']}"
+    print(f"{label:>16}  {parallel_s:7.1f}s  x{serial_s / parallel_s:.2f} measured")
+    print(f"{'estimate':>16}  {parallel['serial_estimate_seconds']:7.1f}s  x{parallel['speedup_estimate']:.2f} "
+          f"from CPU time (processes=1 run estimated {serial['serial_estimate_seconds']:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
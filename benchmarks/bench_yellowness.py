@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "website", "backend"))
+
+from features import YellownessWorkspace, yellowness_index  # noqa: E402
+
+
+# the original per-reading implementation from server.py, kept as the baseline
+def legacy_yellowness(r, g, b, c):
+    rgb = np.array([[r, g, b]], dtype=float)
+    rgb_norm = rgb / max(c, 1e-6)
+    gray_world_avg = np.mean(rgb_norm, axis=0)
+    rgb_balanced = np.clip(rgb_norm / (gray_world_avg + 1e-6), 0, 1)
+    rgb_linear = np.power(rgb_balanced, 2.2)
+    M = np.array([
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041]
+    ])
+    X, Y, Z = (rgb_linear @ M.T)[0]
+    return 100 * (1.2769 * X - 1.0592 * Z) / max(Y, 1e-6)
+
+
+def per_row(fn, n, budget=0.5):
+    # repeat until the time budget is spent, report the best run per row
+    best = float("inf")
+    spent = 0.0
+    while spent < budget or best == float("inf"):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = min(best, dt)
+        spent += dt
+    return best / n * 1e9
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'N':>9}  {'legacy loop':>14}  {'kernel':>14}  {'kernel+buffers':>14}   (ns/row)")
+    for n in (1, 1_000, 1_000_000):
+        rgb = rng.uniform(0, 255, size=(n, 3))
+        c = rng.uniform(0.5, 1.5, size=n)
+        out = np.empty(n)
+        ws = YellownessWorkspace(n)
+
+        if n <= 1_000:
+            rows = [(*rgb[i], c[i]) for i in range(n)]
+            legacy = per_row(lambda: [legacy_yellowness(*row) for row in rows], n)
+            expected = np.array([legacy_yellowness(*row) for row in rows])
+            np.testing.assert_allclose(yellowness_index(rgb, c), expected, rtol=1e-9, atol=1e-9)
+            legacy = f"{legacy:14.1f}"
+        else:
+            legacy = f"{'-':>14}"
+
+        kernel = per_row(lambda: yellowness_index(rgb, c), n)
+        buffered = per_row(lambda: yellowness_index(rgb, c, out=out, workspace=ws), n)
+        print(f"{n:>9}  {legacy}  {kernel:14.1f}  {buffered:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND = os.path.join(ROOT, "website", "backend")
+SIMULATOR = os.path.join(ROOT, "esp32", "simulator.py")
+
+# usage:
+#   python benchmarks/loadgen.py --url http://127.0.0.1:8000 --concurrency 32 --duration 20
+#   python benchmarks/loadgen.py --spawn --sim-devices 200 --concurrency 64
+# Drives GET /predict with random patients spread over the backend's devices
+# and reports throughput, latency percentiles and status codes. --spawn starts
+# esp32/simulator.py and a backend wired to it, so the whole stack runs
+# without hardware; --json appends the result for regression tracking.
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def patient(rng):
+    return {
+        "age": rng.randint(18, 85),
+        "gender": rng.choice(["Male", "Female"]),
+        "height": round(rng.uniform(145, 195), 1),
+        "weight": round(rng.uniform(40, 120), 1)
+    }
+
+
+async def wait_ready(url, timeout=120.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/devices", timeout=2.0)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"backend at {url} did not come up within {timeout:.0f}s")
+
+
+async def run_load(url, devices, concurrency, duration, warmup, stable, seed):
+    rng = random.Random(seed)
+    latencies = []
+    statuses = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        if not devices:
+            devices = list((await client.get("/devices")).json()["devices"])
+        start = time.monotonic()
+        measure_from = start + warmup
+        stop_at = measure_from + duration
+
+        async def worker():
+            while True:
+                now = time.monotonic()
+                if now >= stop_at:
+                    return
+                params = dict(patient(rng), device_id=rng.choice(devices))
+                if stable:
+                    params["stable"] = "true"
+                t0 = time.perf_counter()
+                try:
+                    status = (await client.get("/predict", params=params)).status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - t0
+                if now >= measure_from:
+                    latencies.append(elapsed)
+                    statuses[status] = statuses.get(status, 0) + 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    ms = np.asarray(latencies) * 1e3 if latencies else np.zeros(1)
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {
+        "devices": len(devices),
+        "concurrency": concurrency,
+        "duration_s": duration,
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / duration, 1),
+        "ok": statuses.get(200, 0),
+        "statuses": {str(k): v for k, v in sorted(statuses.items(), key=str)},
+        "latency_ms": {"p50": round(p50, 2), "p90": round(p90, 2), "p99": round(p99, 2),
+                       "max": round(float(ms.max()), 2)}
+    }
+
+
+def spawn_stack(args, workdir):
+    # simulator first: it writes the fleet file the backend loads
+    sim_port, api_port = free_port(), free_port()
+    fleet_file = os.path.join(workdir, "devices.json")
+    sim = subprocess.Popen(
+        [sys.executable, SIMULATOR, "--devices", str(args.sim_devices), "--port", str(sim_port),
+         "--profile", args.sim_profile, "--latency-ms", str(args.sim_latency_ms),
+         "--jitter-ms", str(args.sim_jitter_ms), "--drop-rate", str(args.sim_drop_rate),
+         "--fleet-file", fleet_file],
+        stdout=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while not os.path.exists(fleet_file):
+        if sim.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("simulator did not start")
+        time.sleep(0.1)
+
+    env = dict(os.environ, LIVERGUARD_DEVICES_FILE=fleet_file)
+    if args.model_dir:
+        env["LIVERGUARD_MODEL_DIR"] = os.path.abspath(args.model_dir)
+    log = open(os.path.join(workdir, "backend.log"), "w")
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(api_port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    return f"http://127.0.0.1:{api_port}", [api, sim], log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LiverGuard /predict load generator")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--devices", help="comma-separated device ids (default: all from GET /devices)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--stable", action="store_true", help="use /predict?stable=true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="append the result as one JSON line to this file")
+    parser.add_argument("--spawn", action="store_true", help="start a simulator and a backend locally")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--model-dir")
+    parser.add_argument("--sim-devices", type=int, default=100)
+    parser.add_argument("--sim-profile", default="typical")
+    parser.add_argument("--sim-latency-ms", type=float, default=20.0)
+    parser.add_argument("--sim-jitter-ms", type=float, default=5.0)
+    parser.add_argument("--sim-drop-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    devices = args.devices.split(",") if args.devices else None
+    procs, log = [], None
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            url = args.url
+            if args.spawn:
+                url, procs, log = spawn_stack(args, workdir)
+            asyncio.run(wait_ready(url))
+            result = asyncio.run(run_load(url, devices, args.concurrency, args.duration,
+                                          args.warmup, args.stable, args.seed))
+        finally:
+            for proc in procs:
+                proc.terminate()
+                proc.wait()
+            if log is not None:
+                log.close()
+
+    result["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    lat = result["latency_ms"]
+    print(f"{result['requests']} requests over {result['devices']} devices, concurrency {result['concurrency']}")
+    print(f"throughput {result['throughput_rps']} req/s, ok {result['ok']}, statuses {result['statuses']}")
+    print(f"latency ms  p50 {lat['p50']}  p90 {lat['p90']}  p99 {lat['p99']}  max {lat['max']}")
+    if args.json:
+        with open(args.json, "a") as f:
+            f.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+
+# usage: python esp32/simulator.py --devices 1000 --port 8090 --fleet-file devices.json
+# Serves GET /read like the LiverGuard board, for any number of virtual
+# devices from one asyncio process. Every device gets its own loopback
+# address (127.0.x.y, all routed to lo on Linux) so the backend pools
+# connections per device as it would for real boards; /dev/<n>/read on
+# any address works too. --fleet-file writes a devices.json for the backend.
+
+# per-reading noise (std) and behaviour of the simulated sensors
+NOISE_PROFILES = {
+    "clean": {"rgb": 0.5, "bodyTemp": 0.02, "thermalMax": 0.05, "gsr": 2.0, "settle_s": 0.0},
+    "typical": {"rgb": 2.0, "bodyTemp": 0.05, "thermalMax": 0.3, "gsr": 10.0, "settle_s": 0.0},
+    "noisy": {"rgb": 6.0, "bodyTemp": 0.15, "thermalMax": 1.0, "gsr": 40.0, "settle_s": 0.0},
+    # probe warming up on the skin: thermalMax and gsr converge exponentially
+    "settling": {"rgb": 2.0, "bodyTemp": 0.05, "thermalMax": 0.3, "gsr": 10.0, "settle_s": 20.0}
+}
+
+MAX_HEADER_BYTES = 8192
+
+
+class VirtualDevice:
+    def __init__(self, index, profile, rng):
+        self.index = index
+        self.profile = profile
+        self.rng = rng
+        self.started = time.monotonic()
+        # one patient per device: skin tone, temperatures, skin conductance
+        jaundice = rng.uniform(0.0, 1.0)
+        self.rgb = (rng.uniform(150, 220), rng.uniform(110, 170) + 20 * jaundice, rng.uniform(70, 130) - 40 * jaundice)
+        self.body_temp = rng.gauss(36.8, 0.4)
+        self.thermal_max = self.body_temp - rng.uniform(0.5, 2.5)
+        self.gsr = rng.uniform(200, 800)
+        self.reads = 0
+
+    def reading(self):
+        p, rng = self.profile, self.rng
+        settle = 0.0
+        if p["settle_s"] > 0:
+            settle = math.exp(-(time.monotonic() - self.started) / p["settle_s"])
+        self.reads += 1
+        return {
+            "r": round(self.rgb[0] + rng.gauss(0, p["rgb"]), 2),
+            "g": round(self.rgb[1] + rng.gauss(0, p["rgb"]), 2),
+            "b": round(self.rgb[2] + rng.gauss(0, p["rgb"]), 2),
+            "bodyTemp": round(self.body_temp + rng.gauss(0, p["bodyTemp"]), 2),
+            "thermalMax": round(self.thermal_max - 4.0 * settle + rng.gauss(0, p["thermalMax"]), 2),
+            "gsr": round(self.gsr * (1 + 0.5 * settle) + rng.gauss(0, p["gsr"]), 1)
+        }
+
+
+def device_address(index):
+    return f"127.0.{index // 250}.{index % 250 + 1}"
+
+
+class Simulator:
+    def __init__(self, devices=100, profile="typical", latency_ms=20.0, jitter_ms=5.0,
+                 drop_rate=0.0, drop_mode="close", seed=0):
+        rng = random.Random(seed)
+        self.profile = NOISE_PROFILES[profile]
+        self.devices = [VirtualDevice(i, self.profile, random.Random(rng.random())) for i in range(devices)]
+        self.by_address = {device_address(i): d for i, d in enumerate(self.devices)}
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.drop_rate = drop_rate
+        self.drop_mode = drop_mode
+        self.rng = rng
+        self.requests = 0
+        self.dropped = 0
+
+    def device_for(self, host, path):
+        # /dev/<n>/read wins, otherwise the loopback address picks the device
+        parts = path.strip("/").split("/")
+        if len(parts) == 3 and parts[0] == "dev" and parts[2] == "read":
+            try:
+                return self.devices[int(parts[1])], True
+            except (ValueError, IndexError):
+                return None, False
+        if path != "/read":
+            return None, False
+        return self.by_address.get(host, self.devices[0] if self.devices else None), True
+
+    async def handle(self, reader, writer):
+        host = writer.get_extra_info("sockname")[0]
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if len(head) > MAX_HEADER_BYTES:
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = lines[0].split(" ", 2)
+                close = any(line.lower() == "connection: close" for line in lines[1:])
+                self.requests += 1
+
+                device, known = self.device_for(host, path.split("?", 1)[0])
+                delay = max(0.0, self.rng.gauss(self.latency, self.jitter))
+                if delay:
+                    await asyncio.sleep(delay)
+                if known and device is not None and self.rng.random() < self.drop_rate:
+                    self.dropped += 1
+                    if self.drop_mode == "hang":
+                        await asyncio.sleep(3600)
+                    break
+
+                if method != "GET" or device is None:
+                    status, body = "404 Not Found", b'{"error": "not found"}'
+                else:
+                    status, body = "200 OK", json.dumps(device.reading()).encode()
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: {'close' if close else 'keep-alive'}\r\n\r\n"
+                    .encode() + body
+                )
+                await writer.drain()
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def fleet(self, port, prefix="sim"):
+        return {
+            "devices": {
+                f"{prefix}{d.index}": {"url": f"http://{device_address(d.index)}:{port}/read"}
+                for d in self.devices
+            }
+        }
+
+    async def serve(self, host="0.0.0.0", port=8090):
+        server = await asyncio.start_server(self.handle, host, port, backlog=4096)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated LiverGuard ESP32 boards")
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--profile", choices=sorted(NOISE_PROFILES), default="typical")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--drop-mode", choices=["close", "hang"], default="close")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fleet-file", help="write a backend devices.json for the simulated fleet")
+    args = parser.parse_args()
+
+    sim = Simulator(args.devices, args.profile, args.latency_ms, args.jitter_ms,
+                    args.drop_rate, args.drop_mode, args.seed)
+    if args.fleet_file:
+        with open(args.fleet_file, "w") as f:
+            json.dump(sim.fleet(args.port), f, indent=2)
+    print(f"simulating {args.devices} devices ({args.profile}) on port {args.port}", flush=True)
+    try:
+        asyncio.run(sim.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from .pipeline import main
+
+# python -m training [--data ...] [--out ...]; see pipeline.py
+main()
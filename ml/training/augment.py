@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+
+# -----------------------
+# Noise augmentation (dataset A in the training notebook)
+# -----------------------
+# Same sampling scheme as the notebook's original
+# generate_dataset_with_noise_improved, drawn for a whole block of rows at
+# once instead of cell by cell:
+#   - rows are picked uniformly with replacement
+#   - every numeric cell gets N(0, level*std) or U(-level*std, level*std)
+#     noise, each with probability 1/2 (std with ddof=1, as pandas computes it)
+#   - ROUND_COLUMNS are rounded half-to-even like Python's round()
+#   - numeric values are clipped to the column's original [min, max]
+#   - each categorical cell is replaced, with probability level, by a
+#     uniform draw from the column's distinct values (which may be its own)
+
+LABEL_COLUMN = "Liver Healthy"
+ROUND_COLUMNS = ("Age",)
+CHUNK_ROWS = 100_000  # rows per generated block; bounds peak memory
+
+
+class NoiseAugmenter:
+    # Column statistics are computed once here and reused for every block.
+    def __init__(self, df, labels, noise_level_numeric=0.05, noise_level_categorical=0.01,
+                 round_columns=ROUND_COLUMNS):
+        if len(df) == 0:
+            raise ValueError("cannot augment an empty frame")
+        self.columns = list(df.columns)
+        self.numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+        self.cat_cols = [c for c in self.columns if c not in self.numeric_cols]
+        self.noise_level_categorical = noise_level_categorical
+        self.dtypes = df.dtypes
+
+        numeric = df[self.numeric_cols]
+        self._values = numeric.to_numpy(dtype=float)
+        self._scale = noise_level_numeric * numeric.std().to_numpy(dtype=float)
+        self._lo = numeric.min().to_numpy(dtype=float)
+        self._hi = numeric.max().to_numpy(dtype=float)
+        self._round = np.isin(self.numeric_cols, round_columns)
+
+        # categorical columns as integer codes into their distinct values;
+        # NaN counts as a value, as it does for Series.unique()
+        self._codes = np.empty((len(df), len(self.cat_cols)), dtype=np.int64)
+        self._uniques = []
+        for j, col in enumerate(self.cat_cols):
+            codes, uniques = pd.factorize(df[col], use_na_sentinel=False)
+            self._codes[:, j] = codes
+            self._uniques.append(np.asarray(uniques, dtype=object))
+
+        self.labels = np.asarray(labels)
+        self.label_name = getattr(labels, "name", None) or LABEL_COLUMN
+
+    def sample(self, n, rng):
+        # one block of n augmented rows (columns as in df, plus the label)
+        rows = rng.integers(0, len(self._values), n)
+        k = len(self.numeric_cols)
+
+        scale = np.broadcast_to(self._scale, (n, k))
+        normal = rng.random((n, k)) < 0.5
+        noise = np.empty((n, k))
+        noise[normal] = rng.standard_normal(int(normal.sum())) * scale[normal]
+        uniform = ~normal
+        noise[uniform] = rng.uniform(-1.0, 1.0, int(uniform.sum())) * scale[uniform]
+
+        values = self._values[rows] + noise
+        values[:, self._round] = np.rint(values[:, self._round])
+        np.clip(values, self._lo, self._hi, out=values)
+
+        out = {}
+        for j, col in enumerate(self.numeric_cols):
+            out[col] = values[:, j]
+            if self._round[j] and np.issubdtype(self.dtypes[col], np.integer):
+                out[col] = values[:, j].astype(self.dtypes[col])
+
+        codes = self._codes[rows]
+        if self.cat_cols:
+            flip = rng.random(codes.shape) < self.noise_level_categorical
+            for j, col in enumerate(self.cat_cols):
+                uniques = self._uniques[j]
+                swap = np.flatnonzero(flip[:, j])
+                codes[swap, j] = rng.integers(0, len(uniques), len(swap))
+                out[col] = uniques[codes[:, j]]
+
+        frame = pd.DataFrame({col: out[col] for col in self.columns})
+        frame[self.label_name] = self.labels[rows]
+        return frame
+
+    def chunks(self, n_samples, rng, chunk_rows=CHUNK_ROWS):
+        # n_samples rows as consecutive blocks of at most chunk_rows
+        for start in range(0, n_samples, chunk_rows):
+            yield self.sample(min(chunk_rows, n_samples - start), rng)
+
+
+def generate_dataset_with_noise(df, labels, n_samples=100, noise_level_numeric=0.05,
+                                noise_level_categorical=0.01, seed=None, chunk_rows=CHUNK_ROWS):
+    # drop-in for the notebook's generate_dataset_with_noise_improved
+    rng = np.random.default_rng(seed)
+    augmenter = NoiseAugmenter(df, labels, noise_level_numeric, noise_level_categorical)
+    blocks = list(augmenter.chunks(n_samples, rng, chunk_rows))
+    if not blocks:
+        return augmenter.sample(0, rng)
+    return pd.concat(blocks, ignore_index=True) if len(blocks) > 1 else blocks[0]
+
+
+def iter_dataset_with_noise(df, labels, n_samples, noise_level_numeric=0.05,
+                            noise_level_categorical=0.01, seed=None, chunk_rows=CHUNK_ROWS):
+    # same rows as generate_dataset_with_noise (for equal seed and chunk_rows),
+    # but only one block is alive at a time; e.g. append each to Parquet/CSV
+    rng = np.random.default_rng(seed)
+    augmenter = NoiseAugmenter(df, labels, noise_level_numeric, noise_level_categorical)
+    yield from augmenter.chunks(n_samples, rng, chunk_rows)
+
+
+# -----------------------
+# Class-wise sampling (dataset B) and neighbour interpolation (dataset C)
+# -----------------------
+# Ports of the notebook's generate_dataset_statistical_improved and
+# generate_dataset_interpolation_extrapolation with a seeded Generator, so a
+# scripted training run is reproducible. Same schemes, drawn per block.
+def _split_columns(df):
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    return numeric_cols, [c for c in df.columns if c not in numeric_cols]
+
+
+def _finish(df, numeric, cats, numeric_cols, cat_cols, labels, label_name, round_columns):
+    # clip to the source ranges, round like round() and restore integer dtypes
+    numeric = np.clip(numeric, df[numeric_cols].min().to_numpy(float), df[numeric_cols].max().to_numpy(float))
+    out = {}
+    for j, col in enumerate(numeric_cols):
+        out[col] = numeric[:, j]
+        if col in round_columns:
+            out[col] = np.rint(numeric[:, j])
+            if np.issubdtype(df[col].dtype, np.integer):
+                out[col] = out[col].astype(df[col].dtype)
+    for j, col in enumerate(cat_cols):
+        out[col] = cats[:, j]
+    frame = pd.DataFrame({col: out[col] for col in df.columns})
+    frame[label_name] = labels
+    return frame
+
+
+def generate_dataset_statistical(df, labels, n_samples=100, seed=None, round_columns=ROUND_COLUMNS):
+    # each row: a random class, numeric cells ~ N(class mean, class std)
+    # scaled by U(0.8, 1.2), categorical cells drawn from that class's rows
+    rng = np.random.default_rng(seed)
+    label_name = getattr(labels, "name", None) or LABEL_COLUMN
+    labels = np.asarray(labels)
+    numeric_cols, cat_cols = _split_columns(df)
+    drawn = rng.integers(0, 2, n_samples)
+    numeric = np.empty((n_samples, len(numeric_cols)))
+    cats = np.empty((n_samples, len(cat_cols)), dtype=object)
+    for label in (0, 1):
+        rows = np.flatnonzero(drawn == label)
+        source = df[labels == label] if (labels == label).any() else df
+        mu = source[numeric_cols].mean().to_numpy(float)
+        sigma = source[numeric_cols].std().to_numpy(float)
+        shape = (len(rows), len(numeric_cols))
+        numeric[rows] = rng.normal(mu, sigma, shape) * rng.uniform(0.8, 1.2, shape)
+        picks = rng.integers(0, len(source), (len(rows), len(cat_cols)))
+        for j, col in enumerate(cat_cols):
+            cats[rows, j] = source[col].to_numpy(dtype=object)[picks[:, j]]
+    return _finish(df, numeric, cats, numeric_cols, cat_cols, drawn, label_name, round_columns)
+
+
+def generate_dataset_interpolation(df, labels, n_samples=100, k=3, extrapolation_factor=0.2, seed=None,
+                                   round_columns=ROUND_COLUMNS):
+    # SMOTE-like: per class, n_samples // 2 points on the line from a random
+    # row to one of its k nearest same-class neighbours, extended by
+    # extrapolation_factor past both ends; categorical cells come from the
+    # first row. Classes with k rows or fewer are resampled as they are.
+    from sklearn.neighbors import NearestNeighbors
+
+    rng = np.random.default_rng(seed)
+    label_name = getattr(labels, "name", None) or LABEL_COLUMN
+    labels = np.asarray(labels)
+    numeric_cols, cat_cols = _split_columns(df)
+    blocks = []
+    for label in (0, 1):
+        numeric = df.loc[labels == label, numeric_cols].to_numpy(float)
+        cats = df.loc[labels == label, cat_cols].to_numpy(dtype=object)
+        m = n_samples // 2
+        if len(numeric) == 0 or m == 0:
+            continue
+        idx = rng.integers(0, len(numeric), m)
+        values = numeric[idx]
+        if len(numeric) > k:
+            neighbours = NearestNeighbors(n_neighbors=k + 1).fit(numeric).kneighbors(numeric, return_distance=False)
+            other = neighbours[idx, 1 + rng.integers(0, k, m)]
+            alpha = rng.uniform(-extrapolation_factor, 1 + extrapolation_factor, (m, 1))
+            values = values + alpha * (numeric[other] - values)
+        blocks.append(_finish(df, values, cats[idx], numeric_cols, cat_cols, np.full(m, label),
+                              label_name, round_columns))
+    if not blocks:
+        return _finish(df, np.empty((0, len(numeric_cols))), np.empty((0, len(cat_cols)), dtype=object),
+                       numeric_cols, cat_cols, np.empty(0, dtype=int), label_name, round_columns)
+    return pd.concat(blocks, ignore_index=True)
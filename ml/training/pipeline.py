@@ -0,0 +1,308 @@
+import argparse
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from . import augment, stacking, svm_cv, tuning
+
+# usage (from ml/):
+#   python -m training --data "../dataset/finaldata(1).csv.xlsx" --out ../website/backend
+# The training notebook, end to end and headless: load -> augment -> features
+# -> split/scale -> tune -> fit -> oof -> ensembles, then the artifacts the backend
+# loads (scaler.pkl, voting_model.pkl, stacked_model.pkl, feature_pipeline.json
+# and manifest.json) are written to --out.
+#
+# Each stage's output is cached under --cache, keyed by a hash of its
+# parameters, the keys of the stages it reads and the source code it runs:
+# the whole module that defines the stage function, so its constants
+# (LABEL_MAP, RENAME, ENSEMBLE_MEMBERS) and helpers count too, plus the
+# modules it lists (the data stage hashes the file itself). A re-run recomputes only the
+# stages whose key changed; cached stages downstream of the last change are
+# not even loaded unless something still needs them.
+
+logger = logging.getLogger("liverguard.training")
+
+ML_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(ML_DIR)
+DEFAULT_DATA = os.path.join(REPO_DIR, "dataset", "finaldata(1).csv.xlsx")
+DEFAULT_OUT = os.path.join(REPO_DIR, "website", "backend")
+DEFAULT_CACHE = os.path.join(ML_DIR, ".training_cache")
+# features.py and model_registry.py are shared with the backend, as in the notebook
+BACKEND_DIR = os.getenv("LIVERGUARD_BACKEND_DIR", os.path.join(REPO_DIR, "website", "backend"))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+import features  # noqa: E402
+from features import FEATURE_COLUMNS, YellownessPipeline  # noqa: E402
+
+LABEL_COLUMN = "Liver Healthy"
+LABEL_MAP = {"Yes": 1, "No": 0, "Mid": 1}
+RENAME = {"Temp90614": "BodyTemp", "Temp90640": "LiverTemp"}
+# notebook order and names; the compiled engine and the backend expect them
+ENSEMBLE_MEMBERS = [("xgb", "XGBoost"), ("cat", "CatBoost"), ("rf", "RandomForest"),
+                    ("svm_rbf", "SVM_RBF"), ("svm_poly", "SVM_Poly")]
+
+
+# -----------------------
+# Content-hashed stage cache
+# -----------------------
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StageResult:
+    # a stage's cache key plus its value, loaded from disk on first use
+    _MISSING = object()
+
+    def __init__(self, key, value=_MISSING, path=None):
+        self.key = key
+        self._value = value
+        self.path = path
+
+    def value(self):
+        if self._value is StageResult._MISSING:
+            self._value = joblib.load(self.path)
+        return self._value
+
+
+class StageCache:
+    def __init__(self, root=DEFAULT_CACHE):
+        # root=None disables caching: every stage runs
+        self.root = root
+        if root:
+            os.makedirs(root, exist_ok=True)
+
+    def source(self, path):
+        # a file input, keyed by its content
+        return StageResult(sha256_file(path), path)
+
+    def key(self, name, fn, inputs, params, modules):
+        digest = hashlib.sha256(name.encode())
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        for item in inputs:
+            digest.update(item.key.encode())
+        # fn's own module first: a stage also depends on the constants and
+        # helpers next to it, not just on its body
+        for module in [inspect.getmodule(fn)] + [m for m in modules if m is not inspect.getmodule(fn)]:
+            digest.update(sha256_file(inspect.getsourcefile(module)).encode())
+        return digest.hexdigest()[:16]
+
+    def stage(self, name, fn, inputs=(), params=None, modules=(), options=None):
+        # fn(*input values, **params, **options); modules are the code it
+        # depends on besides its own source. options (worker counts) do not
+        # change the result and are left out of the key
+        params = params or {}
+        key = self.key(name, fn, inputs, params, modules)
+        path = os.path.join(self.root, f"{name}-{key}.joblib") if self.root else None
+        if path and os.path.exists(path):
+            logger.info("%-10s cached (%s)", name, key)
+            return StageResult(key, path=path)
+
+        t0 = time.perf_counter()
+        value = fn(*[item.value() for item in inputs], **params, **(options or {}))
+        logger.info("%-10s ran in %.1fs (%s)", name, time.perf_counter() - t0, key)
+        if path:
+            # write then rename, so an interrupted run never leaves a
+            # truncated file under a valid key
+            fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            os.close(fd)
+            joblib.dump(value, tmp)
+            os.replace(tmp, path)
+        return StageResult(key, value, path)
+
+
+# -----------------------
+# Stages (the notebook's cells)
+# -----------------------
+def load_data(path):
+    data = pd.read_csv(path) if path.lower().endswith(".csv") else pd.read_excel(path)
+    data = data.drop(columns=["S. No."], errors="ignore")
+    data[LABEL_COLUMN] = data[LABEL_COLUMN].map(LABEL_MAP).astype(int)
+    return data
+
+
+def augment_data(data, n_samples, seed):
+    # datasets A, B and C, each with its own stream from the one seed
+    df_features = data.drop(columns=[LABEL_COLUMN])
+    df_labels = data[LABEL_COLUMN]
+    seeds = np.random.SeedSequence(seed).spawn(3)
+    return pd.concat([
+        data,
+        augment.generate_dataset_with_noise(df_features, df_labels, n_samples=n_samples, seed=seeds[0]),
+        augment.generate_dataset_statistical(df_features, df_labels, n_samples=n_samples, seed=seeds[1]),
+        augment.generate_dataset_interpolation(df_features, df_labels, n_samples=n_samples, seed=seeds[2])
+    ], ignore_index=True)
+
+
+def build_features(df):
+    # Yellowness Index from the raw color channels, then the notebook's
+    # encoding; columns end up in the backend's FEATURE_COLUMNS order
+    df = df.copy()
+    yellowness = YellownessPipeline()
+    df["Yellowness Index"] = yellowness.fit_transform(df[["R", "G", "B"]].to_numpy(dtype=float),
+                                                      df["C"].to_numpy(dtype=float))
+    df = df.drop(columns=["R", "G", "B", "C"]).rename(columns=RENAME)
+    df["Gender"] = df["Gender"].map({"Male": 1, "Female": 0}).astype(float)
+    return {"X": df[FEATURE_COLUMNS], "y": df[LABEL_COLUMN].to_numpy(), "yellowness": yellowness}
+
+
+def split_and_scale(feats, test_size, seed):
+    X_train, X_test, y_train, y_test = train_test_split(
+        feats["X"], feats["y"], test_size=test_size, random_state=seed, stratify=feats["y"]
+    )
+    # fit on the frame so the scaler records FEATURE_COLUMNS as its input names
+    scaler = StandardScaler().fit(X_train)
+    return {"X_train": scaler.transform(X_train), "X_test": scaler.transform(X_test),
+            "y_train": y_train, "y_test": y_test, "scaler": scaler}
+
+
+def tune(split, storage, prefix, n_trials, models, processes):
+    report = tuning.run_tuning(split["X_train"], split["y_train"], storage=storage, n_trials=n_trials,
+                               models=models, processes=processes, prefix=prefix)
+    return {name: r["best_params"] for name, r in report["results"].items()}
+
+
+def fit_estimators(split, best_params, n_jobs):
+    # from the tune stage's params alone, so a cached tune needs no study db
+    return tuning.fit_estimators(split["X_train"], split["y_train"], best_params, n_jobs=n_jobs)
+
+
+def ensemble_members(estimators):
+    return [(short, estimators[name]) for short, name in ENSEMBLE_MEMBERS]
+
+
+def out_of_fold(split, estimators, n_jobs):
+    # the stacker's CV: 5 folds x 5 base learners as parallel jobs
+    return stacking.oof_predictions(ensemble_members(estimators), split["X_train"], split["y_train"],
+                                    n_jobs=n_jobs)
+
+
+def build_ensembles(split, estimators, oof):
+    # both ensembles reuse the fitted estimators; only the stacker's
+    # LogisticRegression is fitted here
+    voting_model, stacked_model = stacking.fit_ensembles(
+        ensemble_members(estimators), split["X_train"], split["y_train"],
+        final_estimator=LogisticRegression(max_iter=1000), oof=oof
+    )
+    return {"stacked": stacked_model, "voting": voting_model}
+
+
+def evaluate(split, estimators, ensembles):
+    models = dict(estimators, Stacked=ensembles["stacked"], Voting=ensembles["voting"])
+    return {name: float(roc_auc_score(split["y_test"], model.predict_proba(split["X_test"])[:, 1]))
+            for name, model in models.items()}
+
+
+# -----------------------
+# Artifacts
+# -----------------------
+def write_artifacts(out_dir, scaler, voting_model, stacked_model, yellowness, version=None, compiled=False):
+    from model_registry import write_manifest
+
+    os.makedirs(out_dir, exist_ok=True)
+    joblib.dump(stacked_model, os.path.join(out_dir, "stacked_model.pkl"))
+    joblib.dump(voting_model, os.path.join(out_dir, "voting_model.pkl"))
+    joblib.dump(scaler, os.path.join(out_dir, "scaler.pkl"))
+    yellowness.save(os.path.join(out_dir, "feature_pipeline.json"))
+    stale = os.path.join(out_dir, "compiled_model.pkl")
+    if compiled:
+        import compiled_model
+        compiled_model.main(out_dir)
+    elif os.path.exists(stale):
+        # built from the previous pickles; the registry would only skip it
+        os.remove(stale)
+    return write_manifest(out_dir, version)
+
+
+def run_pipeline(data=DEFAULT_DATA, out_dir=DEFAULT_OUT, cache_dir=DEFAULT_CACHE, n_samples=250,
+                 test_size=0.2, seed=tuning.RANDOM_STATE, n_trials=10, models=None, processes=None,
+                 n_jobs=-1, version=None, compiled=False):
+    # without a cache the Optuna studies live in a scratch directory that
+    # is removed at the end, so nothing is resumed or left behind
+    with tempfile.TemporaryDirectory() as scratch:
+        return _run_pipeline(data, out_dir, cache_dir, cache_dir or scratch, n_samples, test_size, seed,
+                             n_trials, models, processes, n_jobs, version, compiled)
+
+
+def _run_pipeline(data, out_dir, cache_dir, studies_dir, n_samples, test_size, seed, n_trials, models,
+                  processes, n_jobs, version, compiled):
+    cache = StageCache(cache_dir)
+    models = list(models or tuning.MODEL_FAMILIES)
+    missing = [name for _, name in ENSEMBLE_MEMBERS if name not in models]
+    if missing:
+        raise ValueError(f"the ensembles need {', '.join(missing)}")
+
+    raw = cache.stage("load", load_data, [cache.source(data)])
+    augmented = cache.stage("augment", augment_data, [raw], {"n_samples": n_samples, "seed": seed},
+                            modules=[augment])
+    feats = cache.stage("features", build_features, [augmented], modules=[features])
+    split = cache.stage("split", split_and_scale, [feats], {"test_size": test_size, "seed": seed})
+
+    # the Optuna studies are resumable on their own: one study set per
+    # training split, so raising n_trials only runs the missing trials
+    storage = "sqlite:///" + os.path.join(studies_dir, "tuning.db")
+    prefix = f"liverguard-{split.key}"
+    best = cache.stage("tune", tune, [split], {"prefix": prefix, "n_trials": n_trials, "models": models},
+                       modules=[tuning, svm_cv], options={"storage": storage, "processes": processes})
+    estimators = cache.stage("fit", fit_estimators, [split, best], modules=[tuning, svm_cv],
+                             options={"n_jobs": n_jobs})
+    oof = cache.stage("oof", out_of_fold, [split, estimators], modules=[stacking], options={"n_jobs": n_jobs})
+    ensembles = cache.stage("ensembles", build_ensembles, [split, estimators, oof], modules=[stacking])
+    scores = cache.stage("evaluate", evaluate, [split, estimators, ensembles])
+
+    manifest = write_artifacts(out_dir, split.value()["scaler"], ensembles.value()["voting"],
+                               ensembles.value()["stacked"], feats.value()["yellowness"], version, compiled)
+    with open(os.path.join(out_dir, "training_report.json"), "w") as f:
+        json.dump({"version": manifest["version"], "test_auc": scores.value(),
+                   "best_params": best.value(), "stages": {
+                       "load": raw.key, "augment": augmented.key, "features": feats.key, "split": split.key,
+                       "tune": best.key, "fit": estimators.key, "oof": oof.key, "ensembles": ensembles.key
+                   }}, f, indent=2)
+    return {"manifest": manifest, "test_auc": scores.value()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the LiverGuard ensembles and write the backend artifacts")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="training sheet (.xlsx or .csv)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="model directory the backend loads")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="stage cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="run every stage and keep nothing")
+    parser.add_argument("--samples", type=int, default=250, help="rows per augmented dataset")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=tuning.RANDOM_STATE)
+    parser.add_argument("--trials", type=int, default=10, help="finished trials per model family")
+    parser.add_argument("--models", default=",".join(tuning.MODEL_FAMILIES))
+    parser.add_argument("--processes", type=int, help="tuning processes (default: one per family)")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="workers for fitting base learners")
+    parser.add_argument("--version", help="manifest version (default: hash of the artifacts)")
+    parser.add_argument("--compile", action="store_true", help="also write compiled_model.pkl")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    result = run_pipeline(args.data, args.out, None if args.no_cache else args.cache, args.samples,
+                          args.test_size, args.seed, args.trials, args.models.split(","), args.processes,
+                          args.n_jobs, args.version, args.compile)
+    for name, auc in result["test_auc"].items():
+        print(f"{name:>18}  test AUC {auc:.4f}")
+    print(f"wrote {args.out} (version {result['manifest']['version']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.base import clone
+from sklearn.ensemble import StackingClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import check_cv
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils import Bunch
+
+from .tuning import set_threads
+
+# -----------------------
+# Voting and stacking from one set of base-learner fits
+# -----------------------
+# VotingClassifier.fit and StackingClassifier.fit each refit clones of the
+# five base learners on the full training set, and the stacker refits them
+# again in every fold of its internal CV (cross_val_predict): 35 fits for
+# what needs 5 full fits + 25 fold fits. Here the full fits are the tuned
+# estimators themselves, the 25 fold fits run as independent jobs in worker
+# processes, and both ensembles are assembled from the results with the
+# fitted attributes sklearn's own fit sets, so they pickle, predict and
+# compile exactly like fitted ones (tests/test_stacking.py checks this
+# against StackingClassifier.fit / VotingClassifier.fit).
+#
+# Fold jobs fit clones of the members, so each fold model is calibrated the
+# way its full-set model was: the SVMs are CalibratedClassifierCV clones
+# (training.svm_cv.calibrated_svc), and the meta-learner sees the same kind
+# of sigmoid on its training columns as at inference.
+
+STACK_CV = 5  # StackingClassifier's default: StratifiedKFold(5), unshuffled
+
+
+def _fit_fold(estimator, X, y, train, test, single_thread):
+    model = clone(estimator)
+    if single_thread:
+        # one thread per fold job when the jobs already fill the cores
+        set_threads(model, 1)
+    model.fit(X[train], y[train])
+    return test, model.predict_proba(X[test])
+
+
+def oof_predictions(members, X, y, cv=STACK_CV, n_jobs=-1):
+    # members: [(name, fitted or unfitted estimator)]. Returns {name:
+    # out-of-fold predict_proba} for the stacker, computed with the folds
+    # StackingClassifier(cv=cv) would use
+    X = np.asarray(X)
+    y = np.asarray(y)
+    folds = list(check_cv(cv, y, classifier=True).split(X, y))
+    jobs = [(name, estimator, train, test) for name, estimator in members for train, test in folds]
+    single_thread = effective_n_jobs(n_jobs) > 1
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)(estimator, X, y, train, test, single_thread) for _, estimator, train, test in jobs
+    )
+    oof = {}
+    for (name, _, _, _), (test, proba) in zip(jobs, results):
+        out = oof.setdefault(name, np.empty((len(y), proba.shape[1])))
+        out[test] = proba
+    return oof
+
+
+def _set_members(ensemble, members):
+    ensemble.estimators_ = [estimator for _, estimator in members]
+    ensemble.named_estimators_ = Bunch(**dict(members))
+    names = getattr(members[0][1], "feature_names_in_", None)
+    if names is not None:
+        ensemble.feature_names_in_ = names
+
+
+def assemble_voting(members, y, voting="soft", weights=None):
+    # members are already fitted on the full training set
+    model = VotingClassifier(estimators=members, voting=voting, weights=weights)
+    model.le_ = LabelEncoder().fit(y)
+    model.classes_ = model.le_.classes_
+    _set_members(model, members)
+    return model
+
+
+def assemble_stacking(members, oof, y, final_estimator=None, cv=STACK_CV):
+    # members fitted on the full set, oof from oof_predictions(members, ...);
+    # only the meta-learner is fitted here
+    model = StackingClassifier(estimators=members, final_estimator=final_estimator or LogisticRegression(), cv=cv)
+    encoder = LabelEncoder().fit(y)
+    if len(encoder.classes_) != 2:
+        raise ValueError("only binary stacking can be assembled")
+    model.classes_ = encoder.classes_
+    # StackingClassifier.predict maps the meta-learner's output back
+    # through this encoder; it is set here, never read
+    model._label_encoder = encoder
+    _set_members(model, members)
+    model.stack_method_ = ["predict_proba"] * len(members)
+    # binary: the class-1 column of each member, as sklearn stacks them
+    X_meta = np.column_stack([oof[name][:, 1:] for name, _ in members])
+    model.final_estimator_ = clone(model.final_estimator).fit(X_meta, encoder.transform(y))
+    return model
+
+
+def fit_ensembles(members, X, y, final_estimator=None, cv=STACK_CV, n_jobs=-1, oof=None):
+    # (voting_model, stacked_model) sharing the fitted members
+    if oof is None:
+        oof = oof_predictions(members, X, y, cv, n_jobs)
+    return assemble_voting(members, y), assemble_stacking(members, oof, y, final_estimator, cv)
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+import numpy as np
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.metrics import roc_auc_score
+from sklearn.svm import SVC
+
+# -----------------------
+# Cross-validation harness for the SVM families
+# -----------------------
+# An SVC trial used to rebuild the whole kernel in every fold and, with
+# probability=True, run libsvm's internal 5-fold CV for the Platt sigmoid on
+# every fit. Here the folds and the Gram matrix (X @ X.T) are computed once
+# per study; each (fold, gamma, degree) kernel block is derived from it once
+# and reused by every trial that only changes C, through
+# SVC(kernel="precomputed"). Trials are scored on decision values: Platt
+# scaling is monotonic, so the AUC is the same without the internal CV.
+# benchmarks/bench_svm_tuning.py measures about x4 (1500 rows, 24 trials),
+# short of an order of magnitude: once kernels are cached the libsvm solves
+# themselves dominate.
+#
+# The refit model (calibrated_svc) is a plain SVC inside
+# CalibratedClassifierCV(ensemble=False): one sigmoid fitted on out-of-fold
+# decision values over the same kind of folds, then one full fit.
+#
+# Memory per SVM-family process: 8 n^2 bytes for the Gram matrix (0.8 GB at
+# GRAM_MAX_ROWS) plus at most BLOCK_CACHE_BYTES of cached kernel blocks
+# (least recently used blocks are dropped and rebuilt on demand).
+
+SVM_KERNELS = {"SVM_RBF": "rbf", "SVM_Poly": "poly"}
+# above this many rows the harness is not used
+GRAM_MAX_ROWS = 10_000
+BLOCK_CACHE_BYTES = 2 << 30
+
+
+class SVMFoldCache:
+    def __init__(self, X, y, folds, max_block_bytes=BLOCK_CACHE_BYTES):
+        self.X = np.asarray(X, dtype=float)
+        self.y = np.asarray(y)
+        self.folds = [(np.asarray(tr), np.asarray(va)) for tr, va in folds]
+        self.gram = self.X @ self.X.T
+        self.sq_norms = np.diag(self.gram).copy()
+        self.max_block_bytes = max_block_bytes
+        self.block_bytes = 0
+        self._blocks = OrderedDict()
+
+    def gamma(self, fold, gamma):
+        # sklearn's "scale" uses the variance of the data the SVC is fit on
+        if gamma == "scale":
+            X_tr = self.X if fold is None else self.X[self.folds[fold][0]]
+            var = X_tr.var()
+            return 1.0 / (X_tr.shape[1] * var) if var > 0 else 1.0
+        if gamma == "auto":
+            return 1.0 / self.X.shape[1]
+        return float(gamma)
+
+    def _kernel(self, rows, cols, kernel, gamma, degree, coef0):
+        # built in place on the gathered Gram block
+        K = self.gram[np.ix_(rows, cols)]
+        if kernel == "rbf":
+            # squared distances |a|^2 + |b|^2 - 2 a.b
+            K *= -2.0
+            K += self.sq_norms[rows, None]
+            K += self.sq_norms[None, cols]
+            np.maximum(K, 0.0, out=K)
+            K *= -gamma
+            return np.exp(K, out=K)
+        K *= gamma
+        K += coef0
+        return np.power(K, degree, out=K)
+
+    def block(self, fold, kernel, gamma="scale", degree=3, coef0=0.0):
+        # (K_train, K_val) for one fold; cached for every C
+        g = self.gamma(fold, gamma)
+        key = (fold, kernel, g, degree if kernel == "poly" else None, coef0)
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            return block
+        tr, va = self.folds[fold]
+        block = (self._kernel(tr, tr, kernel, g, degree, coef0),
+                 self._kernel(va, tr, kernel, g, degree, coef0))
+        size = block[0].nbytes + block[1].nbytes
+        while self._blocks and self.block_bytes + size > self.max_block_bytes:
+            _, old = self._blocks.popitem(last=False)
+            self.block_bytes -= old[0].nbytes + old[1].nbytes
+        if size <= self.max_block_bytes:
+            self._blocks[key] = block
+            self.block_bytes += size
+        return block
+
+    def cv_decision(self, kernel, C, gamma="scale", degree=3, coef0=0.0,
+                    class_weight="balanced", report=None):
+        # out-of-fold decision values for every row, plus the per-fold AUCs;
+        # report(step, running_mean_auc) may raise to stop early (pruning)
+        decision = np.full(len(self.y), np.nan)
+        scores = []
+        for step, (tr, va) in enumerate(self.folds):
+            K_tr, K_va = self.block(step, kernel, gamma, degree, coef0)
+            model = SVC(kernel="precomputed", C=C, class_weight=class_weight).fit(K_tr, self.y[tr])
+            decision[va] = model.decision_function(K_va)
+            scores.append(roc_auc_score(self.y[va], decision[va]))
+            if report is not None:
+                report(step, float(np.nanmean(scores)))
+        return decision, scores
+
+
+def calibrated_svc(cv, kernel, C, gamma="scale", degree=3, coef0=0.0, class_weight="balanced"):
+    # unfitted; cv is a splitter (not index lists) so clones fit on any rows
+    svc = SVC(kernel=kernel, C=C, gamma=gamma, degree=degree, coef0=coef0, class_weight=class_weight)
+    return CalibratedClassifierCV(svc, method="sigmoid", cv=cv, ensemble=False)
@@ -0,0 +1,321 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import optuna
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from optuna.samplers import TPESampler
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.svm import SVC
+
+from .svm_cv import GRAM_MAX_ROWS, SVM_KERNELS, SVMFoldCache, calibrated_svc
+
+# usage (from ml/):
+#   python -m training.tuning train.csv --trials 50 --storage sqlite:///tuning.db
+# Tunes every model family of the training notebook in its own process. All
+# studies live in one SQLite (or any SQLAlchemy URL) store, so an interrupted
+# run picks up where it stopped: finished trials are kept and only the
+# missing ones run. Trials report their running CV AUC after every
+# StratifiedKFold fold and the median pruner stops the weak ones early.
+# The SVM families are scored through svm_cv's cached precomputed kernels.
+
+RANDOM_STATE = 42
+MODEL_FAMILIES = ["RandomForest", "LogisticRegression", "SVM_RBF", "SVM_Poly", "XGBoost", "CatBoost"]
+LABEL_COLUMN = "Liver Healthy"
+
+N_SPLITS = 3
+# trials that run every fold before the pruner may stop anything, and the
+# first fold index at which pruning is allowed
+PRUNER_STARTUP_TRIALS = 5
+PRUNER_WARMUP_FOLDS = 1
+SQLITE_TIMEOUT = 60  # seconds a worker waits on the database lock
+# a RUNNING trial whose worker stopped heartbeating this long ago (killed
+# run) is marked failed, so a resumed study does not wait on it
+HEARTBEAT_INTERVAL = 30
+HEARTBEAT_GRACE = 120
+FINISHED = (TrialState.COMPLETE, TrialState.PRUNED)
+THREAD_PARAMS = ("n_jobs", "thread_count")  # sklearn / xgboost, catboost
+
+
+# -----------------------
+# Search spaces (as in the notebook's tune_model)
+# -----------------------
+def build_model(trial, model_name, n_jobs=1, random_state=RANDOM_STATE):
+    # n_jobs=1 while tuning: the families already run one per process
+    if model_name == "RandomForest":
+        return RandomForestClassifier(
+            n_estimators=trial.suggest_int("n_estimators", 100, 300),
+            max_depth=trial.suggest_int("max_depth", 3, 15),
+            min_samples_split=trial.suggest_int("min_samples_split", 2, 10),
+            min_samples_leaf=trial.suggest_int("min_samples_leaf", 1, 4),
+            class_weight="balanced",
+            random_state=random_state,
+            n_jobs=n_jobs
+        )
+
+    elif model_name == "LogisticRegression":
+        return LogisticRegression(
+            C=trial.suggest_float("C", 0.001, 10, log=True),
+            penalty="l2",
+            solver="lbfgs",
+            max_iter=1000,
+            class_weight="balanced",
+        )
+
+    elif model_name == "SVM_RBF":
+        return SVC(
+            kernel="rbf",
+            C=trial.suggest_float("C", 0.1, 10, log=True),
+            gamma=trial.suggest_categorical("gamma", ["scale", "auto"]),
+            probability=True,
+            class_weight="balanced",
+        )
+
+    elif model_name == "SVM_Poly":
+        return SVC(
+            kernel="poly",
+            C=trial.suggest_float("C", 0.1, 10, log=True),
+            degree=trial.suggest_int("degree", 2, 4),
+            probability=True,
+            class_weight="balanced",
+        )
+
+    elif model_name == "XGBoost":
+        from xgboost import XGBClassifier
+        return XGBClassifier(
+            n_estimators=trial.suggest_int("n_estimators", 100, 300),
+            learning_rate=trial.suggest_float("learning_rate", 0.01, 0.3, log=True),
+            max_depth=trial.suggest_int("max_depth", 3, 8),
+            subsample=trial.suggest_float("subsample", 0.6, 1.0),
+            colsample_bytree=trial.suggest_float("colsample_bytree", 0.6, 1.0),
+            eval_metric="logloss",
+            random_state=random_state,
+            n_jobs=n_jobs
+        )
+
+    elif model_name == "CatBoost":
+        from catboost import CatBoostClassifier
+        return CatBoostClassifier(
+            iterations=trial.suggest_int("iterations", 100, 300),
+            learning_rate=trial.suggest_float("learning_rate", 0.01, 0.3, log=True),
+            depth=trial.suggest_int("depth", 4, 8),
+            verbose=0,
+            random_state=random_state,
+            thread_count=n_jobs,
+            allow_writing_files=False
+        )
+
+    raise ValueError(f"unknown model family {model_name}")
+
+
+def cv_splitter(n_splits=N_SPLITS, random_state=RANDOM_STATE):
+    return StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+
+
+def cv_folds(y, n_splits=N_SPLITS, random_state=RANDOM_STATE):
+    # computed once per study instead of once per trial
+    return list(cv_splitter(n_splits, random_state).split(np.zeros(len(y)), y))
+
+
+def objective(trial, model_name, X, y, folds):
+    model = build_model(trial, model_name)
+    scores = []
+    for step, (train_idx, val_idx) in enumerate(folds):
+        model.fit(X[train_idx], y[train_idx])
+        scores.append(roc_auc_score(y[val_idx], model.predict_proba(X[val_idx])[:, 1]))
+        # running mean, so fold k is comparable across trials
+        trial.report(float(np.nanmean(scores)), step)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+    return float(np.nanmean(scores))
+
+
+# -----------------------
+# Studies
+# -----------------------
+def storage_for(url):
+    kwargs = {"connect_args": {"timeout": SQLITE_TIMEOUT}} if url.startswith("sqlite:") else {}
+    return optuna.storages.RDBStorage(url, engine_kwargs=kwargs, heartbeat_interval=HEARTBEAT_INTERVAL,
+                                      grace_period=HEARTBEAT_GRACE)
+
+
+def open_study(model_name, storage, prefix="liverguard", seed=RANDOM_STATE):
+    return optuna.create_study(
+        study_name=f"{prefix}-{model_name}",
+        storage=storage_for(storage),
+        direction="maximize",
+        sampler=TPESampler(seed=seed),
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=PRUNER_STARTUP_TRIALS,
+                                           n_warmup_steps=PRUNER_WARMUP_FOLDS),
+        load_if_exists=True
+    )
+
+
+def finished_trials(study):
+    return len(study.get_trials(deepcopy=False, states=FINISHED))
+
+
+def svm_objective(trial, model_name, cache):
+    # same search space as build_model; only the kernel blocks are shared
+    kernel = SVM_KERNELS[model_name]
+    C = trial.suggest_float("C", 0.1, 10, log=True)
+    if kernel == "rbf":
+        params = {"gamma": trial.suggest_categorical("gamma", ["scale", "auto"])}
+    else:
+        params = {"degree": trial.suggest_int("degree", 2, 4)}
+
+    def report(step, value):
+        trial.report(value, step)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+
+    _, scores = cache.cv_decision(kernel, C, report=report, **params)
+    return float(np.nanmean(scores))
+
+
+def objective_for(model_name, X, y, folds):
+    if model_name in SVM_KERNELS and len(X) <= GRAM_MAX_ROWS:
+        cache = SVMFoldCache(X, y, folds)
+        return lambda trial: svm_objective(trial, model_name, cache)
+    return lambda trial: objective(trial, model_name, X, y, folds)
+
+
+def tune_family(model_name, X, y, storage, n_trials, prefix="liverguard", n_splits=N_SPLITS):
+    # runs in a worker process; returns once the study holds n_trials
+    # finished (complete or pruned) trials, counting earlier runs
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    t0, cpu0 = time.perf_counter(), time.process_time()
+    study = open_study(model_name, storage, prefix)
+    resumed = finished_trials(study)
+    if resumed < n_trials:
+        # failed trials never count as finished, so this run is capped at
+        # the missing number of attempts instead of retrying forever
+        study.optimize(
+            objective_for(model_name, X, y, cv_folds(y, n_splits)),
+            n_trials=n_trials - resumed,
+            callbacks=[MaxTrialsCallback(n_trials, states=FINISHED)],
+            catch=(ValueError,)
+        )
+    states = [t.state for t in study.get_trials(deepcopy=False)]
+    complete = states.count(TrialState.COMPLETE)
+    return {
+        "model": model_name,
+        "best_value": study.best_value if complete else None,
+        "best_params": study.best_params if complete else None,
+        "complete": complete,
+        "pruned": states.count(TrialState.PRUNED),
+        "failed": states.count(TrialState.FAIL),
+        "resumed": resumed,
+        "seconds": time.perf_counter() - t0,
+        # what this family costs when run alone, the serial baseline
+        "cpu_seconds": time.process_time() - cpu0
+    }
+
+
+def run_tuning(X, y, storage="sqlite:///tuning.db", n_trials=10, models=MODEL_FAMILIES,
+               processes=None, prefix="liverguard"):
+    # one process per model family (processes=1 runs them in this process)
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    processes = min(len(models), processes or os.cpu_count() or 1)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    t0 = time.perf_counter()
+    # create the schema and studies here: concurrent first-time creation
+    # from several processes races on SQLite
+    for model_name in models:
+        open_study(model_name, storage, prefix)
+    if processes == 1:
+        results = [tune_family(m, X, y, storage, n_trials, prefix) for m in models]
+    else:
+        with ProcessPoolExecutor(processes) as pool:
+            futures = [pool.submit(tune_family, m, X, y, storage, n_trials, prefix) for m in models]
+            results = [f.result() for f in futures]
+    wall = time.perf_counter() - t0
+    # an estimate, not a measurement: models are tuned single-threaded, so
+    # summed CPU time approximates the wall time of the notebook's
+    # one-family-after-another loop (benchmarks/bench_tuning.py times a
+    # real processes=1 run)
+    serial = sum(r["cpu_seconds"] for r in results)
+    return {
+        "results": {r["model"]: r for r in results},
+        "wall_seconds": wall,
+        "serial_estimate_seconds": serial,
+        "speedup_estimate": serial / wall if wall > 0 else None,
+        "processes": processes
+    }
+
+
+def set_threads(estimator, n_jobs):
+    params = estimator.get_params(deep=False)
+    return estimator.set_params(**{p: n_jobs for p in THREAD_PARAMS if p in params})
+
+
+def _fit_estimator(model_name, params, X, y, threads):
+    # the SVMs get their sigmoid from one out-of-fold CalibratedClassifierCV
+    # fit instead of libsvm's internal 5-fold Platt CV
+    if model_name in SVM_KERNELS:
+        model = calibrated_svc(cv_splitter(), SVM_KERNELS[model_name], **params)
+    else:
+        model = build_model(optuna.trial.FixedTrial(params), model_name, n_jobs=threads)
+    return model.fit(X, y)
+
+
+def fit_estimators(X, y, best_params, n_jobs=-1):
+    # best_params: {family: params}. The families are fitted in parallel
+    # worker processes, the cores split between them (each fitted model
+    # keeps that thread count; CatBoost cannot change it after fit)
+    missing = [name for name, params in best_params.items() if params is None]
+    if missing:
+        raise ValueError(f"no completed trial for {', '.join(missing)}")
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y)
+    cores = effective_n_jobs(n_jobs)
+    workers = max(1, min(len(best_params), cores))
+    threads = max(1, cores // workers)
+    fitted = Parallel(n_jobs=workers)(
+        delayed(_fit_estimator)(name, params, X, y, threads) for name, params in best_params.items()
+    )
+    return dict(zip(best_params, fitted))
+
+
+def fit_best_estimators(X, y, storage="sqlite:///tuning.db", models=MODEL_FAMILIES, prefix="liverguard", n_jobs=-1):
+    # refit each family's best trial on the full training set
+    best_params = {name: open_study(name, storage, prefix).best_params for name in models}
+    return fit_estimators(X, y, best_params, n_jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, resumable Optuna tuning for the LiverGuard base learners")
+    parser.add_argument("data", help=f"CSV of scaled training features plus a '{LABEL_COLUMN}' column")
+    parser.add_argument("--storage", default="sqlite:///tuning.db")
+    parser.add_argument("--trials", type=int, default=10, help="finished trials per model family")
+    parser.add_argument("--models", default=",".join(MODEL_FAMILIES))
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--prefix", default="liverguard", help="study name prefix")
+    args = parser.parse_args()
+
+    frame = pd.read_csv(args.data)
+    y = frame.pop(LABEL_COLUMN).to_numpy()
+    report = run_tuning(frame.to_numpy(dtype=float), y, args.storage, args.trials,
+                        args.models.split(","), args.processes, args.prefix)
+
+    print(f"{'model':>18}  {'best AUC':>8}  {'complete':>8}  {'pruned':>6}  {'failed':>6}  {'resumed':>7}  "
+          f"{'seconds':>8}")
+    for r in report["results"].values():
+        best = "-" if r["best_value"] is None else f"{r['best_value']:.4f}"
+        print(f"{r['model']:>18}  {best:>8}  {r['complete']:8d}  {r['pruned']:6d}  {r['failed']:6d}  "
+              f"{r['resumed']:7d}  {r['seconds']:8.1f}")
+    print(f"wall {report['wall_seconds']:.1f}s on {report['processes']} processes; "
+          f"serial ~{report['serial_estimate_seconds']:.1f}s (CPU time); speedup ~x{report['speedup_estimate']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
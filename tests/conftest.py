@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the backend imports its modules flat; the training code is the ml/training
+# package; esp32/simulator.py stands in for boards in the device tests
+for path in (os.path.join(ROOT, "website", "backend"), os.path.join(ROOT, "ml"), os.path.join(ROOT, "esp32")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
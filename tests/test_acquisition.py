@@ -0,0 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from acquisition import DeviceError, DeviceTimeout, SensorClient
+from simulator import Simulator
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@asynccontextmanager
+async def simulated_board(**kwargs):
+    # a simulated board on an ephemeral loopback port
+    sim = Simulator(2, jitter_ms=0.0, **kwargs)
+    server = await asyncio.start_server(sim.handle, "127.0.0.1", 0)
+    try:
+        yield sim, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    finally:
+        server.close()
+
+
+@pytest.mark.anyio
+async def test_reads_and_reuses_one_pool_per_origin():
+    client = SensorClient(read_timeout=1.0)
+    async with simulated_board(latency_ms=0.0) as (sim, base):
+        readings = await asyncio.gather(client.read(f"{base}/dev/0/read"), client.read(f"{base}/dev/1/read"))
+        assert all({"r", "g", "b", "bodyTemp", "thermalMax", "gsr"} <= set(r) for r in readings)
+        assert [d.reads for d in sim.devices] == [1, 1]
+        assert len(client._clients) == 1
+        await client.aclose()
+        assert client._clients == {}
+
+
+@pytest.mark.anyio
+async def test_slow_board_times_out():
+    client = SensorClient(connect_timeout=1.0, read_timeout=0.1)
+    async with simulated_board(latency_ms=1000.0) as (sim, base):
+        with pytest.raises(DeviceTimeout):
+            await client.read(f"{base}/read")
+    await client.aclose()
+
+
+@pytest.mark.anyio
+async def test_errors_become_device_errors():
+    client = SensorClient(read_timeout=1.0)
+    async with simulated_board(latency_ms=0.0, drop_rate=1.0) as (sim, base):
+        # connection dropped mid-request
+        with pytest.raises(DeviceError) as e:
+            await client.read(f"{base}/read")
+        assert not isinstance(e.value, DeviceTimeout)
+        # HTTP error status
+        sim.drop_rate = 0.0
+        with pytest.raises(DeviceError, match="404"):
+            await client.read(f"{base}/missing")
+    await client.aclose()
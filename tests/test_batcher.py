@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from batcher import MicroBatcher
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def score_fn(calls):
+    # fails the whole call on a zero height, as build_features did
+    def score(records, bundle):
+        calls.append(len(records))
+        heights = np.array([rec.height for rec in records])
+        bmi = np.array([rec.weight for rec in records]) / heights ** 2
+        if not np.all(np.isfinite(bmi)):
+            raise ZeroDivisionError("height is zero")
+        return bmi, 2 * bmi
+    return score
+
+
+@pytest.mark.anyio
+async def test_bad_row_fails_alone():
+    calls = []
+    batcher = MicroBatcher(score_fn(calls), max_size=16, max_wait_ms=50)
+    batcher.start()
+    bundle = SimpleNamespace(version="v1")
+    records = [SimpleNamespace(height=h, weight=50.0) for h in (1.0, 2.0, 0.0, 5.0, 10.0, 0.5)]
+    try:
+        with np.errstate(divide="ignore"):
+            results = await asyncio.gather(*(batcher.score(rec, bundle) for rec in records),
+                                           return_exceptions=True)
+    finally:
+        await batcher.stop()
+    # one batch of six, then each row on its own
+    assert calls == [6, 1, 1, 1, 1, 1, 1]
+    assert isinstance(results[2], ZeroDivisionError)
+    for rec, result in zip(records, results):
+        if rec.height:
+            assert result == (50.0 / rec.height ** 2, 100.0 / rec.height ** 2)
+    assert batcher.rows == 5
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier, StackingClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+
+from compiled_model import TOLERANCE, CompiledEnsemble, compile_ensembles, max_deviation
+from features import FEATURE_COLUMNS
+
+
+def learners():
+    yield "rf", lambda: RandomForestClassifier(n_estimators=25, max_depth=6, random_state=0)
+    yield "xgb", lambda: pytest.importorskip("xgboost").XGBClassifier(n_estimators=30, max_depth=4, random_state=0)
+    yield "cat", lambda: pytest.importorskip("catboost").CatBoostClassifier(
+        iterations=30, depth=4, verbose=0, random_state=0, allow_writing_files=False)
+    yield "svc_rbf", lambda: SVC(probability=True, random_state=0)
+    yield "svc_poly", lambda: SVC(kernel="poly", degree=3, probability=True, random_state=0)
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(3)
+    features = rng.normal(loc=[40, 0.5, 31, 34, 400, 24, 0.5], scale=[12, 0.5, 2, 2, 150, 4, 0.2], size=(400, 7))
+    z = (features - features.mean(axis=0)) / features.std(axis=0)
+    y = (z[:, 0] + z[:, 4] * z[:, 6] + rng.normal(size=400) > 0).astype(int)
+    return features, y
+
+
+@pytest.mark.parametrize("name, make", list(learners()))
+def test_compiled_matches_sklearn_within_tolerance(data, name, make):
+    features, y = data
+    scaler = StandardScaler().fit(features)
+    X = scaler.transform(features)
+    members = [(name, make()), ("rf_extra", RandomForestClassifier(n_estimators=10, random_state=1))]
+    voting = VotingClassifier(members, voting="soft").fit(X, y)
+    stacked = StackingClassifier(members, final_estimator=LogisticRegression()).fit(X, y)
+
+    engine = CompiledEnsemble(compile_ensembles(scaler, voting, stacked))
+    probe = pd.DataFrame(scaler.mean_ + scaler.scale_ * np.random.default_rng(0).normal(scale=1.5, size=(500, 7)),
+                         columns=FEATURE_COLUMNS)
+    assert max_deviation(engine, scaler, voting, stacked, probe) < TOLERANCE
+
+
+def test_empty_batch(data):
+    features, y = data
+    scaler = StandardScaler().fit(features)
+    X = scaler.transform(features)
+    members = [("rf", RandomForestClassifier(n_estimators=5, random_state=0))]
+    voting = VotingClassifier(members, voting="soft").fit(X, y)
+    stacked = StackingClassifier(members).fit(X, y)
+    p_vote, p_stack = CompiledEnsemble(compile_ensembles(scaler, voting, stacked)).predict_proba(np.empty((0, 7)))
+    assert p_vote.shape == (0,) and p_stack.shape == (0,)
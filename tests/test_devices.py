@@ -0,0 +1,179 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from acquisition import DeviceError, DeviceTimeout, SensorClient
+from devices import CircuitBreaker, CircuitOpen, DeviceFleet
+from simulator import Simulator
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@asynccontextmanager
+async def simulated_fleet(devices=2, read_timeout=0.2, **kwargs):
+    # simulated boards on an ephemeral loopback port, one /dev/<n>/read each
+    sim = Simulator(devices, jitter_ms=0.0, **kwargs)
+    server = await asyncio.start_server(sim.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    client = SensorClient(connect_timeout=1.0, read_timeout=read_timeout)
+    fleet = DeviceFleet(client)
+    for i in range(devices):
+        fleet.add(f"sim{i}", f"http://127.0.0.1:{port}/dev/{i}/read")
+    try:
+        yield sim, fleet
+    finally:
+        await client.aclose()
+        server.close()
+
+
+class StubClient:
+    # records the peak number of in-flight reads per url
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = {}
+        self.peak = {}
+
+    async def read(self, url):
+        self.active[url] = self.active.get(url, 0) + 1
+        self.peak[url] = max(self.peak.get(url, 0), self.active[url])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active[url] -= 1
+        return {"url": url}
+
+
+@pytest.mark.anyio
+async def test_reads_simulated_boards():
+    async with simulated_fleet(latency_ms=0.0) as (sim, fleet):
+        readings = await asyncio.gather(fleet.read("sim0"), fleet.read("sim1"))
+        assert all({"r", "g", "b", "bodyTemp", "thermalMax", "gsr"} <= set(r) for r in readings)
+        info = fleet.info()
+        assert info["healthy"] == 2
+        assert info["devices"]["sim0"]["reads"] == 1
+
+
+@pytest.mark.anyio
+async def test_slow_board_times_out():
+    async with simulated_fleet(latency_ms=1000.0, read_timeout=0.1) as (sim, fleet):
+        with pytest.raises(DeviceTimeout):
+            await fleet.read("sim0")
+        device = fleet.devices["sim0"]
+        assert device.errors == 1
+        assert device.breaker.consecutive == 1
+        assert device.breaker.state == "closed"
+
+
+@pytest.mark.anyio
+async def test_breaker_opens_and_recovers_through_half_open():
+    async with simulated_fleet(latency_ms=0.0, drop_rate=1.0) as (sim, fleet):
+        device = fleet.devices["sim0"]
+        device.breaker = CircuitBreaker(failures=3, cooldown=0.1)
+        for _ in range(3):
+            with pytest.raises(DeviceError):
+                await fleet.read("sim0")
+        assert device.breaker.state == "open"
+        assert device.breaker.trips == 1
+
+        # open: rejected without touching the board
+        requests = sim.requests
+        with pytest.raises(CircuitOpen):
+            await fleet.read("sim0")
+        assert sim.requests == requests
+
+        # after the cooldown one trial read goes through and closes the circuit
+        sim.drop_rate = 0.0
+        await asyncio.sleep(0.15)
+        await fleet.read("sim0")
+        assert device.breaker.state == "closed"
+        assert device.breaker.consecutive == 0
+        assert sim.requests == requests + 1
+        # the other board never noticed
+        assert fleet.devices["sim1"].breaker.state == "closed"
+
+
+def test_half_open_failure_reopens():
+    breaker = CircuitBreaker(failures=2, cooldown=5.0)
+    breaker.failure(now=0.0)
+    assert breaker.state == "closed"
+    breaker.failure(now=1.0)
+    assert breaker.state == "open"
+    assert not breaker.allow(now=5.9)
+    assert breaker.allow(now=6.0)
+    assert breaker.state == "half_open"
+    # a single failed trial is enough to open it again, for a fresh cooldown
+    breaker.failure(now=6.0)
+    assert breaker.state == "open"
+    assert breaker.trips == 2
+    assert not breaker.allow(now=10.0)
+    assert breaker.allow(now=11.0)
+
+
+@pytest.mark.anyio
+async def test_concurrency_is_limited_per_device():
+    client = StubClient()
+    fleet = DeviceFleet(client)
+    fleet.add("a", "http://10.0.0.1/read", max_concurrency=2)
+    fleet.add("b", "http://10.0.0.2/read", max_concurrency=1)
+    await asyncio.gather(*(fleet.read(device_id) for device_id in ["a", "b"] * 6))
+    assert client.peak == {"http://10.0.0.1/read": 2, "http://10.0.0.2/read": 1}
+    assert fleet.devices["a"].reads == fleet.devices["b"].reads == 6
+
+
+def test_default_device():
+    fleet = DeviceFleet(StubClient())
+    assert fleet.default() is None
+    fleet.add("ward1", "http://10.0.0.1/read")
+    fleet.add("ward2", "http://10.0.0.2/read")
+    assert fleet.default() == "ward1"
+    assert fleet.default("ward2") == "ward2"
+    assert fleet.default("missing") == "ward1"
+    fleet.add("default", "http://10.0.0.3/read")
+    assert fleet.default() == "default"
+    assert fleet.default("ward2") == "ward2"
+
+
+@pytest.mark.anyio
+async def test_cancelled_half_open_trial_reopens():
+    client = StubClient(delay=10.0)
+    fleet = DeviceFleet(client)
+    device = fleet.add("a", "http://10.0.0.1/read")
+    device.breaker = CircuitBreaker(failures=1, cooldown=0.05)
+    device.breaker.failure()
+    await asyncio.sleep(0.06)
+
+    trial = asyncio.create_task(fleet.read("a"))
+    await asyncio.sleep(0.01)
+    assert device.breaker.state == "half_open"
+    # e.g. the client disconnected while the trial read was in flight
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+    assert device.breaker.state == "open"
+
+    # not stuck: the next cooldown lets a new trial through
+    client.delay = 0.0
+    await asyncio.sleep(0.06)
+    await fleet.read("a")
+    assert device.breaker.state == "closed"
+
+
+@pytest.mark.anyio
+async def test_unexpected_error_counts_as_failure():
+    class BrokenClient:
+        async def read(self, url):
+            raise RuntimeError("bad url")
+
+    fleet = DeviceFleet(BrokenClient())
+    device = fleet.add("a", "http://10.0.0.1/read")
+    device.breaker = CircuitBreaker(failures=1, cooldown=60.0)
+    with pytest.raises(RuntimeError):
+        await fleet.read("a")
+    assert device.breaker.state == "open"
+    assert device.errors == 1
+    with pytest.raises(CircuitOpen):
+        await fleet.read("a")
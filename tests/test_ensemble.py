@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, StackingClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import SVC
+
+from ensemble import SharedEnsemble
+
+
+@pytest.fixture(scope="module")
+def models():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(300, 7))
+    y = (X[:, 0] - X[:, 2] * X[:, 5] + rng.normal(size=300) > 0).astype(int)
+    # as in the notebook: one estimator list, two separately fitted ensembles;
+    # the SVC has no random_state, so the two copies get different Platt fits
+    members = [
+        ("rf", RandomForestClassifier(n_estimators=20, random_state=0)),
+        ("svm_rbf", SVC(probability=True, class_weight="balanced")),
+        ("svm_poly", SVC(kernel="poly", degree=2, probability=True)),
+    ]
+    voting = VotingClassifier(members, voting="soft").fit(X, y)
+    stacked = StackingClassifier(members, final_estimator=LogisticRegression(max_iter=1000)).fit(X, y)
+    return voting, stacked, rng.normal(size=(200, 7))
+
+
+def test_matches_the_separate_models(models):
+    voting, stacked, X = models
+    p_vote, p_stack = SharedEnsemble(voting, stacked).predict_proba(X)
+    np.testing.assert_allclose(p_vote, voting.predict_proba(X)[:, 1], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(p_stack, stacked.predict_proba(X)[:, 1], rtol=0, atol=1e-12)
+
+
+def test_each_shared_learner_runs_once_per_call(models, monkeypatch):
+    voting, stacked, X = models
+    shared = SharedEnsemble(voting, stacked)
+    # three distinct learners behind six fitted copies
+    assert shared.n_evaluations == 3
+
+    calls = []
+    for model, use_decision in shared.groups:
+        method = "decision_function" if use_decision else "predict_proba"
+        original = getattr(model, method)
+
+        def counted(X, model=model, original=original):
+            calls.append(id(model))
+            return original(X)
+
+        monkeypatch.setattr(model, method, counted)
+    shared.predict_proba(X)
+    assert sorted(calls) == sorted(id(model) for model, _ in shared.groups)
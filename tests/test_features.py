@@ -0,0 +1,97 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier, StackingClassifier, VotingClassifier
+from sklearn.preprocessing import RobustScaler, StandardScaler
+
+from features import FEATURE_COLUMNS, YellownessPipeline
+from model_registry import load_bundle
+
+DATASET = os.path.join(os.path.dirname(__file__), "..", "dataset", "finaldata(1).csv.xlsx")
+
+
+def notebook_yellowness(df):
+    # the baseline notebook's "Yellowness Index" cell, verbatim
+    R, G, B, C = df["R"].astype(float), df["G"].astype(float), df["B"].astype(float), df["C"].astype(float)
+
+    rgb = np.stack([R, G, B], axis=1)
+    C_array = C.to_numpy().reshape(-1, 1)
+    rgb_norm = rgb / np.clip(C_array, 1e-6, None)
+
+    gray_world_avg = np.mean(rgb_norm, axis=0)
+    rgb_balanced = np.clip(rgb_norm / gray_world_avg, 0, 1)
+
+    gamma = 2.2
+    rgb_linear = np.power(rgb_balanced, gamma)
+
+    M_sRGB_D65 = np.array([
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041]
+    ])
+    xyz = rgb_linear @ M_sRGB_D65.T
+    X, Y, Z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+
+    scaler_xyz = RobustScaler()
+    X_scaled, Y_scaled, Z_scaled = scaler_xyz.fit_transform(np.stack([X, Y, Z], axis=1)).T
+
+    Cx, Cz = 1.2769, 1.0592
+    YI_raw = 100 * (Cx * X_scaled - Cz * Z_scaled) / np.clip(Y_scaled, 1e-6, None)
+    return (YI_raw - YI_raw.min()) / (YI_raw.max() - YI_raw.min())
+
+
+def synthetic():
+    rng = np.random.default_rng(5)
+    n = 300
+    df = pd.DataFrame({
+        "R": rng.uniform(80, 2000, n), "G": rng.uniform(45, 1500, n),
+        "B": rng.uniform(30, 1100, n), "C": rng.uniform(150, 4300, n)
+    })
+    # saturated channels, a zero intensity and a black reading
+    df.loc[0, ["R", "G", "B", "C"]] = [4000, 10, 10, 200]
+    df.loc[1, "C"] = 0
+    df.loc[2, ["R", "G", "B"]] = 0
+    return df
+
+
+def real():
+    pytest.importorskip("openpyxl")
+    return pd.read_excel(DATASET)
+
+
+@pytest.mark.parametrize("load", [synthetic, real])
+def test_pipeline_reproduces_the_notebook(load, tmp_path):
+    df = load()
+    rgb, c = df[["R", "G", "B"]].to_numpy(dtype=float), df["C"].to_numpy(dtype=float)
+    golden = notebook_yellowness(df)
+
+    pipeline = YellownessPipeline()
+    np.testing.assert_array_equal(pipeline.fit_transform(rgb, c), golden)
+
+    path = tmp_path / "feature_pipeline.json"
+    pipeline.save(path)
+    np.testing.assert_array_equal(YellownessPipeline.load(path).transform(rgb, c), golden)
+
+
+def test_backend_serves_the_training_features(tmp_path):
+    # the bundle the server loads replays the notebook's fit on new readings
+    df = synthetic()
+    rgb, c = df[["R", "G", "B"]].to_numpy(dtype=float), df["C"].to_numpy(dtype=float)
+    golden = notebook_yellowness(df)
+    YellownessPipeline().fit(rgb, c).save(tmp_path / "feature_pipeline.json")
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, len(FEATURE_COLUMNS)))
+    y = (X[:, 0] > 0).astype(int)
+    members = [("rf", RandomForestClassifier(n_estimators=5, random_state=0))]
+    joblib.dump(StandardScaler().fit(pd.DataFrame(X, columns=FEATURE_COLUMNS)), tmp_path / "scaler.pkl")
+    joblib.dump(VotingClassifier(members, voting="soft").fit(X, y), tmp_path / "voting_model.pkl")
+    joblib.dump(StackingClassifier(members).fit(X, y), tmp_path / "stacked_model.pkl")
+
+    bundle = load_bundle(str(tmp_path))
+    out = np.empty(len(df))
+    bundle.yellowness(rgb, c, out=out)
+    np.testing.assert_array_equal(out, golden)
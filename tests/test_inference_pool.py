@@ -0,0 +1,68 @@
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import inference_pool
+from inference_pool import InferencePool, _score_shared
+
+
+class FailingBundle:
+    model_dir = "failing-model"
+    version = "v1"
+
+    def score(self, features):
+        scaled = features * 2
+        raise ValueError(f"model blew up on {len(scaled)} rows")
+
+
+class InlineExecutor:
+    # runs the worker function in this process, like a one-worker pool
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def test_worker_error_is_not_masked(monkeypatch):
+    # a live view of the block made close() raise BufferError instead
+    monkeypatch.setitem(inference_pool._bundles, FailingBundle.model_dir, FailingBundle())
+    block = shared_memory.SharedMemory(create=True, size=4 * 9 * 8)
+    try:
+        with pytest.raises(ValueError, match="model blew up") as e:
+            _score_shared(FailingBundle.model_dir, FailingBundle.version, block.name, 4, 7)
+        # nothing the exception keeps alive still views the block; older
+        # numpy releases pin the buffer through such views
+        tb = e.value.__traceback__
+        while tb is not None:
+            assert not any(isinstance(v, np.ndarray) for v in tb.tb_frame.f_locals.values())
+            tb = tb.tb_next
+    finally:
+        block.close()
+        block.unlink()
+
+
+def test_pool_reraises_the_worker_error(monkeypatch):
+    monkeypatch.setitem(inference_pool._bundles, FailingBundle.model_dir, FailingBundle())
+    pool = InferencePool(workers=1)
+    pool._executor = InlineExecutor()
+    with pytest.raises(ValueError, match="model blew up"):
+        pool.score(np.zeros((4, 7)), FailingBundle())
+    assert pool.calls == 0
+
+
+def test_pool_scores_through_shared_memory(monkeypatch):
+    bundle = SimpleNamespace(model_dir="sum-model", version="v1",
+                             score=lambda X: (X.sum(axis=1), X.max(axis=1)))
+    monkeypatch.setitem(inference_pool._bundles, bundle.model_dir, bundle)
+    pool = InferencePool(workers=1)
+    pool._executor = InlineExecutor()
+    X = np.arange(28, dtype=float).reshape(4, 7)
+    p_vote, p_stack = pool.score(X, bundle)
+    np.testing.assert_array_equal(p_vote, X.sum(axis=1))
+    np.testing.assert_array_equal(p_stack, X.max(axis=1))
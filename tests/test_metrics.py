@@ -0,0 +1,43 @@
+import pytest
+
+from metrics import Callback, LabeledMetric, Metric, Registry
+
+
+def test_metric_bases_are_abstract():
+    with pytest.raises(TypeError):
+        Metric("m", "doc")
+    with pytest.raises(TypeError):
+        LabeledMetric("m", "doc")
+
+
+def test_render():
+    registry = Registry()
+    errors = registry.counter("errors", "Errors by kind.", ["kind"])
+    errors.labels("timeout").inc()
+    errors.labels("timeout").inc(2)
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(5.0)
+    registry.callback("healthy", "Healthy boards.", "gauge", lambda: 3)
+    registry.callback("reads", "Reads by board.", "counter", lambda: {("a",): 1, ("b",): None}, ["board"])
+    assert registry.render().splitlines() == [
+        "# HELP errors Errors by kind.",
+        "# TYPE errors counter",
+        'errors_total{kind="timeout"} 3',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 1',
+        'latency_seconds_bucket{le="+Inf"} 2',
+        "latency_seconds_sum 5.05",
+        "latency_seconds_count 2",
+        "# HELP healthy Healthy boards.",
+        "# TYPE healthy gauge",
+        "healthy 3",
+        "# HELP reads Reads by board.",
+        "# TYPE reads counter",
+        'reads_total{board="a"} 1',
+    ]
+    with pytest.raises(ValueError):
+        errors.labels()
+    assert not hasattr(Callback("c", "doc", "gauge", lambda: 1), "labels")
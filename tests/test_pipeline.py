@@ -0,0 +1,50 @@
+import glob
+import importlib
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("xgboost")
+pytest.importorskip("catboost")
+pytest.importorskip("openpyxl")
+
+from training.pipeline import StageCache, run_pipeline  # noqa: E402
+
+SMALL = {"n_samples": 20, "n_trials": 2, "processes": 1, "n_jobs": 2}
+
+
+def test_no_cache_keeps_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    out = tmp_path / "out"
+    run_pipeline(out_dir=str(out), cache_dir=None, **SMALL)
+    assert sorted(os.listdir(tmp_path)) == ["out"]
+    for name in ("scaler.pkl", "voting_model.pkl", "stacked_model.pkl", "feature_pipeline.json", "manifest.json"):
+        assert (out / name).exists()
+
+
+def test_fit_stage_needs_only_the_cached_params(tmp_path):
+    cache = tmp_path / "cache"
+    first = run_pipeline(out_dir=str(tmp_path / "a"), cache_dir=str(cache), **SMALL)
+    os.remove(cache / "tuning.db")
+    for path in glob.glob(str(cache / "fit-*.joblib")):
+        os.remove(path)
+    second = run_pipeline(out_dir=str(tmp_path / "b"), cache_dir=str(cache), **SMALL)
+    assert not (cache / "tuning.db").exists()
+    assert second["test_auc"] == pytest.approx(first["test_auc"])
+
+
+def test_stage_key_covers_module_constants(tmp_path, monkeypatch):
+    # a stage module like pipeline.py: the function body never changes,
+    # only a constant it reads
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = tmp_path / "stage_module.py"
+
+    def key(label_map):
+        module.write_text(f"LABEL_MAP = {label_map!r}\n\n\ndef load(df):\n    return df.map(LABEL_MAP)\n")
+        sys.modules.pop("stage_module", None)
+        stage = importlib.import_module("stage_module")
+        return StageCache(None).key("load", stage.load, [], {}, [])
+
+    assert key({"Yes": 1, "No": 0}) == key({"Yes": 1, "No": 0})
+    assert key({"Yes": 1, "No": 0}) != key({"Yes": 1, "No": 0, "Mid": 1})
@@ -0,0 +1,101 @@
+import importlib
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier, StackingClassifier, VotingClassifier
+from sklearn.preprocessing import StandardScaler
+
+from features import FEATURE_COLUMNS, YellownessPipeline
+
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient  # noqa: E402
+
+READING = {"age": 45, "gender": "Male", "height": 170.0, "weight": 70.0, "r": 180.0, "g": 150.0,
+           "b": 100.0, "bodyTemp": 36.9, "thermalMax": 35.2, "gsr": 400.0}
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    # a tiny model directory and a fleet nobody polls; server.py reads its
+    # settings at import, so the environment is set first
+    model_dir = tmp_path_factory.mktemp("model")
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(60, len(FEATURE_COLUMNS)))
+    y = (X[:, 0] > 0).astype(int)
+    members = [("rf", RandomForestClassifier(n_estimators=5, random_state=0))]
+    joblib.dump(StandardScaler().fit(pd.DataFrame(X, columns=FEATURE_COLUMNS)), model_dir / "scaler.pkl")
+    joblib.dump(VotingClassifier(members, voting="soft").fit(X, y), model_dir / "voting_model.pkl")
+    joblib.dump(StackingClassifier(members).fit(X, y), model_dir / "stacked_model.pkl")
+    yellowness = YellownessPipeline().fit(rng.uniform(50, 250, size=(40, 3)), np.ones(40))
+    yellowness.save(model_dir / "feature_pipeline.json")
+
+    import devices
+    import model_registry
+
+    with pytest.MonkeyPatch.context() as mp:
+        # other tests may have imported these modules already
+        mp.setattr(model_registry, "MODEL_DIR", str(model_dir))
+        mp.setattr(devices, "DEVICES_FILE", str(model_dir / "devices.json"))
+        mp.setenv("ESP32_POLL_INTERVAL", "0")
+        mp.setenv("ESP32_HEALTH_INTERVAL", "0")
+        mp.delenv("LIVERGUARD_STORE_DIR", raising=False)
+        yield importlib.import_module("server")
+
+
+@pytest.fixture
+def client(server):
+    with TestClient(server.app) as client:
+        yield client
+
+
+def test_batch_rejects_non_positive_height_and_weight(client):
+    for field in ("height", "weight"):
+        for value in (0, -170.0):
+            res = client.post("/predict/batch", json=[READING, dict(READING, **{field: value})])
+            assert res.status_code == 422
+            assert res.json()["detail"][0]["loc"] == ["body", 1, field]
+    res = client.post("/predict/batch", json=[READING])
+    assert res.status_code == 200
+    assert res.json()["count"] == 1
+
+
+def test_predict_and_stream_reject_non_positive_query_values(client):
+    params = {"age": 45, "gender": "Male", "height": 170.0, "weight": 70.0}
+    for field in ("age", "height", "weight"):
+        bad = dict(params, **{field: 0})
+        # validated before the board is read or anything is queued
+        res = client.get("/predict", params=bad)
+        assert res.status_code == 422
+        assert res.json()["detail"][0]["loc"] == ["query", field]
+        res = client.get("/stream/default", params=bad)
+        assert res.status_code == 422
+
+
+def test_ingest_limits_body_size(client, server, monkeypatch):
+    monkeypatch.setattr(server, "INGEST_MAX_BYTES", 64)
+    res = client.post("/ingest", content=b"\0" * 65)
+    assert res.status_code == 413
+    # no Content-Length: the limit applies while streaming the body
+    res = client.post("/ingest", content=iter([b"\0" * 40, b"\0" * 40]))
+    assert res.status_code == 413
+    res = client.post("/ingest", content=b"\0" * 10)
+    assert res.status_code == 400
+
+
+def test_predict_reads_the_board_every_call_without_polling(client, server, monkeypatch):
+    reads = []
+
+    async def read(device_id):
+        reads.append(device_id)
+        return {k: READING[k] for k in ("r", "g", "b", "bodyTemp", "thermalMax", "gsr")}
+
+    monkeypatch.setattr(server.fleet, "read", read)
+    assert not server.poller.running
+    params = {"age": 45, "gender": "Male", "height": 170.0, "weight": 70.0}
+    for _ in range(3):
+        res = client.get("/predict", params=params)
+        assert res.status_code == 200
+        assert res.json()["acquisition"]["source"] == "live"
+    assert reads == ["default"] * 3
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier, StackingClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+
+from training import stacking
+from training.svm_cv import calibrated_svc
+from training.tuning import cv_splitter
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(240, 5))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(size=240) > 0).astype(int)
+    return X, y, rng.normal(size=(100, 5))
+
+
+def members():
+    return [
+        ("rf", RandomForestClassifier(n_estimators=30, random_state=0)),
+        ("lr", LogisticRegression()),
+        ("svm_rbf", calibrated_svc(cv_splitter(), "rbf", 1.0)),
+        ("svm_poly", calibrated_svc(cv_splitter(), "poly", 0.5, degree=2)),
+    ]
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_assembled_ensembles_match_sklearn_fit(data, n_jobs):
+    X, y, X_new = data
+    final = LogisticRegression(max_iter=1000)
+    stacked = StackingClassifier(estimators=members(), final_estimator=final).fit(X, y)
+    voting = VotingClassifier(estimators=members(), voting="soft").fit(X, y)
+
+    fitted = [(name, clone(model).fit(X, y)) for name, model in members()]
+    shared_voting, shared_stacked = stacking.fit_ensembles(fitted, X, y, final_estimator=final, n_jobs=n_jobs)
+
+    np.testing.assert_array_equal(shared_voting.predict_proba(X_new), voting.predict_proba(X_new))
+    np.testing.assert_array_equal(shared_stacked.predict_proba(X_new), stacked.predict_proba(X_new))
+    np.testing.assert_array_equal(shared_stacked.predict(X_new), stacked.predict(X_new))
+    np.testing.assert_array_equal(shared_stacked.transform(X_new), stacked.transform(X_new))
+
+
+def test_oof_svm_columns_use_the_calibrated_path(data):
+    X, y, _ = data
+    fitted = [(name, clone(model).fit(X, y)) for name, model in members()]
+    oof = stacking.oof_predictions(fitted, X, y, n_jobs=1)
+    # each fold model is a CalibratedClassifierCV clone: refitting one fold
+    # by hand through the same estimator gives the same column
+    train, test = next(iter(stacking.check_cv(stacking.STACK_CV, y, classifier=True).split(X, y)))
+    fold_model = clone(fitted[2][1]).fit(X[train], y[train])
+    np.testing.assert_array_equal(oof["svm_rbf"][test], fold_model.predict_proba(X[test]))
+
+
+def test_assembled_stacking_predicts_the_original_labels(data):
+    X, y, X_new = data
+    labels = np.where(y == 1, "Yes", "No")
+    final = LogisticRegression(max_iter=1000)
+    fitted = [(name, clone(model).fit(X, labels)) for name, model in members()[:2]]
+    stacked = StackingClassifier(estimators=members()[:2], final_estimator=final).fit(X, labels)
+    _, shared_stacked = stacking.fit_ensembles(fitted, X, labels, final_estimator=final, n_jobs=1)
+    np.testing.assert_array_equal(shared_stacked.classes_, ["No", "Yes"])
+    np.testing.assert_array_equal(shared_stacked.predict(X_new), stacked.predict(X_new))
+    with pytest.raises(ValueError, match="binary"):
+        stacking.assemble_stacking(fitted, {}, np.arange(len(y)) % 3)
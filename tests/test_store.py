@@ -0,0 +1,49 @@
+import os
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from features import FEATURE_COLUMNS
+from store import TABLES, ColumnStore, hour_partition
+
+
+def prediction_rows(rng, n, ts):
+    features = {name: rng.normal(size=n) * 1e3 for name in FEATURE_COLUMNS}
+    return dict(ts=ts, device_id="ward1", model_version="v1", p_vote=rng.uniform(size=n),
+                p_stack=rng.uniform(size=n), **features)
+
+
+def test_predictions_keep_full_precision(tmp_path):
+    rng = np.random.default_rng(0)
+    store = ColumnStore(str(tmp_path))
+    rows = prediction_rows(rng, 50, time.time() - np.arange(50.0)[::-1])
+    store.append("predictions", **rows)
+    store.flush()
+    result = store.query("predictions")
+    for name in list(FEATURE_COLUMNS) + ["p_vote", "p_stack"]:
+        np.testing.assert_array_equal(result.column(name).to_numpy(), rows[name])
+
+
+def test_reads_files_written_as_f4(tmp_path):
+    # an hour file from before the predictions columns were f8
+    rng = np.random.default_rng(1)
+    now = time.time()
+    old = prediction_rows(rng, 10, now - 10 + np.arange(10.0))
+    arrays = {}
+    for name, dtype in TABLES["predictions"].items():
+        if dtype == "U":
+            arrays[name] = pa.array([old[name]] * 10, type=pa.string())
+        else:
+            arrays[name] = pa.array(np.asarray(old[name], dtype="f8" if name == "ts" else "f4"))
+    part = tmp_path / "predictions" / hour_partition(now)
+    os.makedirs(part)
+    pq.write_table(pa.table(arrays), part / "part-old.parquet")
+
+    store = ColumnStore(str(tmp_path))
+    store.append("predictions", **prediction_rows(rng, 5, now + np.arange(5.0)))
+    result = store.query("predictions", start=now - 60)
+    assert len(result) == 15
+    assert result.schema.field(FEATURE_COLUMNS[0]).type == pa.float64()
+    np.testing.assert_array_equal(result.column("p_vote").to_numpy()[:10], old["p_vote"].astype("f4"))
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from sklearn.svm import SVC
+
+from compiled_model import calibrated_proba, export_estimator, svc_decision
+from ensemble import SharedEnsemble
+from training.stacking import fit_ensembles
+from training.svm_cv import SVMFoldCache, calibrated_svc
+from training.tuning import cv_folds, cv_splitter
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 5))
+    y = (X[:, 0] + 0.5 * X[:, 3] ** 2 + rng.normal(size=300) > 0.5).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize("kernel, params", [
+    ("rbf", {"gamma": "scale"}), ("rbf", {"gamma": "auto"}), ("poly", {"degree": 3}), ("poly", {"degree": 2})
+])
+def test_precomputed_decisions_match_svc(data, kernel, params):
+    X, y = data
+    folds = cv_folds(y)
+    decision, _ = SVMFoldCache(X, y, folds).cv_decision(kernel, 2.0, **params)
+    for train, test in folds:
+        model = SVC(kernel=kernel, C=2.0, class_weight="balanced", **params).fit(X[train], y[train])
+        np.testing.assert_allclose(decision[test], model.decision_function(X[test]), atol=1e-9)
+
+
+def test_block_cache_stays_under_its_budget(data):
+    X, y = data
+    folds = cv_folds(y)
+    one_fold = sum(k.nbytes for k in SVMFoldCache(X, y, folds).block(0, "rbf"))
+    cache = SVMFoldCache(X, y, folds, max_block_bytes=int(1.5 * one_fold))
+    for degree in (2, 3, 4):
+        cache.cv_decision("poly", 1.0, degree=degree)
+        assert cache.block_bytes <= cache.max_block_bytes
+    assert len(cache._blocks) == 1
+    # an evicted block is rebuilt with the same values
+    again, _ = cache.cv_decision("poly", 1.0, degree=2)
+    np.testing.assert_allclose(again, SVMFoldCache(X, y, folds).cv_decision("poly", 1.0, degree=2)[0])
+
+
+def test_calibrated_svc_compiles_and_shares(data):
+    X, y = data
+    model = calibrated_svc(cv_splitter(), "rbf", 1.0).fit(X, y)
+    p = model.predict_proba(X)[:, 1]
+    spec = export_estimator(model)
+    np.testing.assert_allclose(calibrated_proba(spec, svc_decision(spec, X)), p, atol=1e-12)
+
+    # and SharedEnsemble scores it through the inner SVC
+    members = [("svm_rbf", model), ("svm_poly", calibrated_svc(cv_splitter(), "poly", 1.0, degree=2).fit(X, y))]
+    voting, stacked = fit_ensembles(members, X, y, n_jobs=1)
+    p_vote, p_stack = SharedEnsemble(voting, stacked).predict_proba(X)
+    np.testing.assert_allclose(p_vote, voting.predict_proba(X)[:, 1], atol=1e-12)
+    np.testing.assert_allclose(p_stack, stacked.predict_proba(X)[:, 1], atol=1e-12)
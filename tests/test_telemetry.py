@@ -0,0 +1,34 @@
+import time
+
+import numpy as np
+
+from sensor_buffer import SENSOR_CHANNELS
+from telemetry import TelemetryIngest, device_key, encode_packet
+
+
+class StubPoller:
+    def __init__(self, device_ids):
+        self.buffers = dict.fromkeys(device_ids)
+        self.batches = []
+
+    def record_many(self, device_id, ts, values):
+        self.batches.append((device_id, ts, values))
+
+
+def test_rejects_bad_timestamps_and_clamps_future_ones():
+    poller = StubPoller(["ward1"])
+    ingest = TelemetryIngest(poller)
+    now = time.time()
+    ts = [now - 2.0, np.nan, np.inf, -np.inf, 0.0, now + 3600 * 24 * 365, now - 1.0]
+    values = np.full((len(ts), len(SENSOR_CHANNELS)), 100.0)
+    accepted, rejected = ingest.ingest(encode_packet([device_key("ward1")] * len(ts), ts, values))
+    assert (accepted, rejected) == (4, 3)
+
+    [(device_id, got, _)] = poller.batches
+    after = time.time()
+    assert device_id == "ward1"
+    assert np.all(np.isfinite(got)) and np.all(got <= after)
+    # time order kept, with "on arrival" and the future sample at now
+    assert np.all(np.diff(got) >= 0)
+    assert list(got[:2]) == [now - 2.0, now - 1.0]
+    assert np.all(got[2:] >= now)
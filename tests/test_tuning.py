@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("optuna")
+
+from training import tuning  # noqa: E402
+
+
+def test_failing_trials_do_not_retry_forever(tmp_path, monkeypatch):
+    calls = []
+
+    def objective(trial):
+        calls.append(trial.number)
+        if len(calls) > 50:
+            # would otherwise never return; fail the test instead of hanging
+            raise RuntimeError("tune_family kept retrying failed trials")
+        raise ValueError("model could not be fitted")
+
+    monkeypatch.setattr(tuning, "objective_for", lambda *args: objective)
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(30, 3))
+    y = np.arange(30) % 2
+    storage = f"sqlite:///{tmp_path}/tuning.db"
+
+    result = tuning.tune_family("LogisticRegression", X, y, storage, n_trials=4)
+    assert len(calls) == 4
+    assert result["failed"] == 4
+    assert result["complete"] == 0
+    assert result["best_value"] is None and result["best_params"] is None
+
+    # a rerun tries again, still bounded
+    result = tuning.tune_family("LogisticRegression", X, y, storage, n_trials=4)
+    assert len(calls) == 8
+    assert result["failed"] == 8
@@ -0,0 +1,60 @@
+import os
+from urllib.parse import urlsplit
+
+import httpx
+
+# -----------------------
+# ESP32 acquisition settings
+# -----------------------
+CONNECT_TIMEOUT = float(os.getenv("ESP32_CONNECT_TIMEOUT", "2.0"))
+READ_TIMEOUT = float(os.getenv("ESP32_READ_TIMEOUT", "3.0"))
+MAX_CONNECTIONS = int(os.getenv("ESP32_MAX_CONNECTIONS", "4"))
+KEEPALIVE_EXPIRY = float(os.getenv("ESP32_KEEPALIVE_EXPIRY", "30.0"))
+
+
+class DeviceError(Exception):
+    pass
+
+
+class DeviceTimeout(DeviceError):
+    pass
+
+
+class SensorClient:
+    # one pooled keep-alive client per device origin, so repeated reads
+    # reuse the TCP connection and a slow board only holds its own pool
+    def __init__(self, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_connections=MAX_CONNECTIONS, keepalive_expiry=KEEPALIVE_EXPIRY):
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        # building an SSL context costs ~20 ms; share one across the fleet
+        self.ssl_context = httpx.create_ssl_context()
+        self._clients = {}
+
+    def _client(self, url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(origin)
+        if client is None:
+            client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits, verify=self.ssl_context)
+            self._clients[origin] = client
+        return client
+
+    async def read(self, url):
+        try:
+            resp = await self._client(url).get(url)
+            resp.raise_for_status()
+            return resp.json()
+        except httpx.TimeoutException as e:
+            raise DeviceTimeout(f"{url} timed out") from e
+        except (httpx.HTTPError, ValueError) as e:
+            raise DeviceError(f"{url}: {e}") from e
+
+    async def aclose(self):
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
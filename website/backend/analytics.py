@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from model_registry import SCORE_BINS
+from sensor_buffer import SENSOR_CHANNELS
+
+# -----------------------
+# Analytics settings
+# -----------------------
+# counters are kept per time bucket in a fixed ring: 1440 x 60 s = one day
+ANALYTICS_BUCKET = float(os.getenv("LIVERGUARD_ANALYTICS_BUCKET", "60"))  # seconds
+ANALYTICS_BUCKETS = int(os.getenv("LIVERGUARD_ANALYTICS_BUCKETS", "1440"))
+
+# a reading counts as a sensor failure when a channel leaves its plausible
+# range; an all-zero RGB triple means the colour sensor did not answer
+DEFAULT_SENSOR_LIMITS = {
+    "bodyTemp": [30.0, 45.0],
+    "thermalMax": [20.0, 45.0],
+    "gsr": [1.0, 4094.0]  # 12-bit ADC rails
+}
+SENSOR_LIMITS = dict(DEFAULT_SENSOR_LIMITS, **json.loads(os.getenv("LIVERGUARD_SENSOR_LIMITS", "{}")))
+
+RGB = [SENSOR_CHANNELS.index(ch) for ch in ("r", "g", "b")]
+FAULTS = ["rgb_zero"] + [f"{ch}_out_of_range" for ch in SENSOR_LIMITS]
+
+
+def sensor_faults(values):
+    # (n, channels) readings -> (n, len(FAULTS)) bool
+    faults = np.empty((len(values), len(FAULTS)), dtype=bool)
+    faults[:, 0] = np.all(values[:, RGB] == 0, axis=1)
+    for j, (ch, (lo, hi)) in enumerate(SENSOR_LIMITS.items(), start=1):
+        x = values[:, SENSOR_CHANNELS.index(ch)]
+        faults[:, j] = (x < lo) | (x > hi)
+    return faults
+
+
+class Analytics:
+    # Sensor and model counters aggregated into time buckets as readings and
+    # predictions arrive. Memory and query cost depend only on the number of
+    # buckets, never on how much history went through.
+    def __init__(self, bucket_s=ANALYTICS_BUCKET, buckets=ANALYTICS_BUCKETS):
+        n_ch = len(SENSOR_CHANNELS)
+        self.bucket_s = bucket_s
+        self.buckets = buckets
+        # bucket number (ts // bucket_s) each ring slot holds, -1 = empty
+        self._ids = np.full(buckets, -1, dtype=np.int64)
+        self.readings = np.zeros(buckets, dtype=np.int64)
+        self.faults = np.zeros((buckets, len(FAULTS)), dtype=np.int64)
+        self.any_fault = np.zeros(buckets, dtype=np.int64)
+        self.ch_sum = np.zeros((buckets, n_ch))
+        self.ch_sq = np.zeros((buckets, n_ch))
+        self.predictions = np.zeros(buckets, dtype=np.int64)
+        self.disagree = np.zeros(buckets, dtype=np.int64)
+        self.abs_diff = np.zeros(buckets)
+        self.proba_sum = np.zeros((buckets, 2))  # Voting, Stacked
+        self.hist = np.zeros((buckets, 2, SCORE_BINS), dtype=np.int64)
+        self._arrays = [self.readings, self.faults, self.any_fault, self.ch_sum, self.ch_sq,
+                        self.predictions, self.disagree, self.abs_diff, self.proba_sum, self.hist]
+        self._lock = threading.Lock()
+
+    def _slots(self, ts):
+        # ring slot per timestamp; clears slots a newer bucket takes over and
+        # returns -1 for anything older than the ring
+        ids = np.floor(np.asarray(ts, dtype=float) / self.bucket_s).astype(np.int64)
+        for bucket in np.unique(ids):
+            slot = bucket % self.buckets
+            if self._ids[slot] < bucket:
+                for arr in self._arrays:
+                    arr[slot] = 0
+                self._ids[slot] = bucket
+        slots = ids % self.buckets
+        return np.where(self._ids[slots] == ids, slots, -1)
+
+    def record_readings(self, ts, values):
+        values = np.asarray(values, dtype=float)
+        faults = sensor_faults(values)
+        with self._lock:
+            slots = self._slots(np.broadcast_to(ts, len(values)))
+            keep = slots >= 0
+            slots, values, faults = slots[keep], values[keep], faults[keep]
+            np.add.at(self.readings, slots, 1)
+            np.add.at(self.faults, slots, faults.astype(np.int64))
+            np.add.at(self.any_fault, slots, faults.any(axis=1).astype(np.int64))
+            np.add.at(self.ch_sum, slots, values)
+            np.add.at(self.ch_sq, slots, values * values)
+
+    def record_predictions(self, ts, p_vote, p_stack):
+        p = np.column_stack([p_vote, p_stack]).astype(float)
+        bins = np.clip((p * SCORE_BINS).astype(int), 0, SCORE_BINS - 1)
+        # the same 0.5 cut the API reports as the Voting / Stacked label
+        disagree = np.rint(p[:, 0]) != np.rint(p[:, 1])
+        with self._lock:
+            slot = self._slots([ts])[0]
+            if slot < 0:
+                return
+            self.predictions[slot] += len(p)
+            self.disagree[slot] += int(disagree.sum())
+            self.abs_diff[slot] += float(np.abs(p[:, 0] - p[:, 1]).sum())
+            self.proba_sum[slot] += p.sum(axis=0)
+            np.add.at(self.hist[slot], (np.repeat([[0, 1]], len(p), axis=0), bins), 1)
+
+    def summary(self, now, window=None):
+        # totals over the last `window` seconds (default: the whole ring) and
+        # one series point per bucket that saw traffic
+        current = int(np.floor(now / self.bucket_s))
+        span = self.buckets if window is None else int(np.clip(np.ceil(window / self.bucket_s), 1, self.buckets))
+        with self._lock:
+            rows = np.flatnonzero((self._ids > current - span) & (self._ids <= current))
+            rows = rows[np.argsort(self._ids[rows])]
+            ids = self._ids[rows]
+            readings, faults, any_fault = self.readings[rows], self.faults[rows], self.any_fault[rows]
+            ch_sum, ch_sq = self.ch_sum[rows].sum(axis=0), self.ch_sq[rows].sum(axis=0)
+            predictions, disagree = self.predictions[rows], self.disagree[rows]
+            abs_diff, proba_sum = self.abs_diff[rows].sum(), self.proba_sum[rows]
+            hist = self.hist[rows].sum(axis=0)
+
+        n, m = int(readings.sum()), int(predictions.sum())
+        mean = ch_sum / n if n else None
+        std = np.sqrt(np.maximum(ch_sq / n - mean * mean, 0.0)) if n else None
+        fault_totals = faults.sum(axis=0)
+        proba_totals = proba_sum.sum(axis=0)
+        return {
+            "bucket_s": self.bucket_s,
+            "window_s": span * self.bucket_s,
+            "sensors": {
+                "readings": n,
+                "failure_rate": float(any_fault.sum() / n) if n else None,
+                "failures": {name: int(c) for name, c in zip(FAULTS, fault_totals)},
+                "failure_rates": {name: (float(c / n) if n else None) for name, c in zip(FAULTS, fault_totals)},
+                "channels": {
+                    ch: {"mean": None if mean is None else float(mean[i]), "std": None if std is None else float(std[i])}
+                    for i, ch in enumerate(SENSOR_CHANNELS)
+                }
+            },
+            "models": {
+                "predictions": m,
+                "disagreement_rate": float(disagree.sum() / m) if m else None,
+                "mean_abs_diff": float(abs_diff / m) if m else None,
+                "mean_proba": {
+                    "Voting": float(proba_totals[0] / m) if m else None,
+                    "Stacked": float(proba_totals[1] / m) if m else None
+                },
+                "score_histogram": {"Voting": hist[0].tolist(), "Stacked": hist[1].tolist()}
+            },
+            "series": [
+                {
+                    "ts": float(bucket * self.bucket_s),
+                    "readings": int(r),
+                    "failure_rate": float(f / r) if r else None,
+                    "predictions": int(p),
+                    "disagreement_rate": float(d / p) if p else None,
+                    "mean_score": float(s.sum() / (2 * p)) if p else None
+                }
+                for bucket, r, f, p, d, s in zip(ids, readings, any_fault, predictions, disagree, proba_sum)
+            ]
+        }
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger("liverguard.batcher")
+
+# -----------------------
+# Micro-batching settings
+# -----------------------
+# <=1 disables batching and every /predict scores its own row
+BATCH_MAX_SIZE = int(os.getenv("LIVERGUARD_BATCH_MAX_SIZE", "64"))
+# how long the first request of a batch waits for company
+BATCH_MAX_WAIT_MS = float(os.getenv("LIVERGUARD_BATCH_MAX_WAIT_MS", "2"))
+
+
+class MicroBatcher:
+    # Collects concurrent single-row requests and scores them with one call.
+    # score_fn(records, bundle) -> (p_vote, p_stack) runs in the threadpool;
+    # requests routed to different model versions are scored separately.
+    # Up to `concurrency` batches are scored at once; while all slots are
+    # busy, new requests keep queueing and form the next, larger batch.
+    def __init__(self, score_fn, max_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS, concurrency=1):
+        self.score_fn = score_fn
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000
+        self.concurrency = concurrency
+        self.batches = 0
+        self.rows = 0
+        self._queue = None
+        self._slots = None
+        self._inflight = set()
+        self._task = None
+
+    @property
+    def enabled(self):
+        return self.max_size > 1
+
+    @property
+    def running(self):
+        return self._task is not None
+
+    def start(self):
+        if not self.enabled:
+            return
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        # batches already handed to the scorer finish normally
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+        # nobody will score what is still queued
+        while not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("inference scheduler stopped"))
+
+    async def score(self, record, bundle):
+        # -> (p_vote, p_stack) floats for one record
+        if self._task is None:
+            p_vote, p_stack = await run_in_threadpool(self.score_fn, [record], bundle)
+            return p_vote[0], p_stack[0]
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, bundle, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_size:
+            # drain what is already queued before paying for a timer
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._score_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _score_batch(self, batch):
+        try:
+            # clients that gave up while waiting do not need scoring
+            batch = [item for item in batch if not item[2].done()]
+            by_version = {}
+            for item in batch:
+                by_version.setdefault(item[1].version, []).append(item)
+            for items in by_version.values():
+                await self._score(items)
+        finally:
+            self._slots.release()
+
+    async def _score(self, items):
+        records = [record for record, _, _ in items]
+        try:
+            p_vote, p_stack = await run_in_threadpool(self.score_fn, records, items[0][1])
+        except Exception as e:
+            if len(items) > 1:
+                # one bad row must not fail its neighbours: rescore each row
+                # on its own so only the culprit gets the error
+                logger.warning("batch of %d rows failed (%r); scoring rows one by one", len(records), e)
+                for item in items:
+                    await self._score([item])
+                return
+            logger.exception("scoring a row failed")
+            future = items[0][2]
+            if not future.done():
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.rows += len(records)
+        for (_, _, future), v, s in zip(items, p_vote, p_stack):
+            if not future.done():
+                future.set_result((v, s))
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "max_size": self.max_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "concurrency": self.concurrency,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else None
+        }
@@ -0,0 +1,452 @@
+import json
+import os
+import sys
+import tempfile
+
+import joblib
+import numpy as np
+
+from metrics import STAGE_SECONDS
+
+# -----------------------
+# Pure-NumPy ensemble engine
+# -----------------------
+# compile_ensembles() turns the fitted scaler, VotingClassifier and
+# StackingClassifier into plain arrays (flattened trees, SVM support
+# vectors, the LR meta-learner weights); CompiledEnsemble scores whole
+# batches with vectorized NumPy instead of ten sklearn predict_proba calls.
+# Base learners shared by both ensembles are stored and evaluated once.
+
+TOLERANCE = 1e-6
+CHUNK_ROWS = 4096  # bounds the (rows x trees) traversal buffers
+
+SCALER_STAGE = STAGE_SECONDS.labels("scaler")
+BASE_STAGE = STAGE_SECONDS.labels("base_learners")
+VOTING_STAGE = STAGE_SECONDS.labels("voting")
+STACKED_STAGE = STAGE_SECONDS.labels("stacked")
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+# -----------------------
+# Export: fitted estimators -> arrays
+# -----------------------
+def _pack_trees(trees):
+    # trees: list of per-tree (feature, threshold, left, right, value, depth)
+    # with -1 children on leaves. Concatenate into one node table where
+    # leaves loop back to themselves, so traversal is a fixed-depth loop.
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset, depth = 0, 0
+    for f, t, l, r, v, d in trees:
+        n = len(f)
+        ids = np.arange(n) + offset
+        leaf = l < 0
+        feature.append(np.where(leaf, 0, f))
+        threshold.append(np.where(leaf, 0.0, t))
+        left.append(np.where(leaf, ids, l + offset))
+        right.append(np.where(leaf, ids, r + offset))
+        value.append(np.where(leaf, v, 0.0))
+        roots.append(offset)
+        offset += n
+        depth = max(depth, d)
+    # children interleaved as [left, right] so one gather picks the branch
+    children = np.stack([np.concatenate(left), np.concatenate(right)], axis=1)
+    return {
+        "feature": np.concatenate(feature).astype(np.intp),
+        "threshold": np.concatenate(threshold),
+        "children": children.ravel().astype(np.intp),
+        "value": np.concatenate(value),
+        "roots": np.asarray(roots, dtype=np.intp),
+        "depth": depth
+    }
+
+
+def _export_random_forest(model):
+    trees = []
+    for est in model.estimators_:
+        t = est.tree_
+        value = t.value[:, 0, :]
+        total = value.sum(axis=1)
+        total[total == 0] = 1.0
+        trees.append((t.feature, t.threshold, t.children_left, t.children_right,
+                      value[:, 1] / total, t.max_depth))
+    # sklearn compares float32 features against float64 thresholds, x <= t
+    return dict(_pack_trees(trees), kind="forest", op="le", x_dtype="float32",
+                n_trees=len(trees), link="mean")
+
+
+def _export_xgboost(model):
+    booster = model.get_booster()
+    config = json.loads(booster.save_config())
+    if config["learner"]["objective"]["name"] != "binary:logistic":
+        raise ValueError("only binary:logistic XGBoost models can be compiled")
+    base_score = float(config["learner"]["learner_model_param"]["base_score"].strip("[]"))
+    names = booster.feature_names
+
+    trees = []
+    for dump in booster.get_dump(dump_format="json"):
+        nodes = {}
+        stack = [json.loads(dump)]
+        while stack:
+            node = stack.pop()
+            nodes[node["nodeid"]] = node
+            stack.extend(node.get("children", []))
+        n = max(nodes) + 1
+        f = np.zeros(n, dtype=np.intp)
+        t = np.zeros(n, dtype=np.float32)
+        l = np.full(n, -1, dtype=np.intp)
+        r = np.full(n, -1, dtype=np.intp)
+        v = np.zeros(n, dtype=np.float32)
+        depth = 0
+        for i, node in nodes.items():
+            if "leaf" in node:
+                v[i] = node["leaf"]
+                continue
+            split = node["split"]
+            f[i] = names.index(split) if names else int(split.lstrip("f"))
+            t[i] = node["split_condition"]
+            l[i], r[i] = node["yes"], node["no"]
+            depth = max(depth, node["depth"] + 1)
+        trees.append((f, t, l, r, v, depth))
+    # xgboost works in float32 and goes left when x < split_condition
+    return dict(_pack_trees(trees), kind="forest", op="lt", x_dtype="float32",
+                n_trees=len(trees), link="logit",
+                bias=float(np.log(base_score / (1 - base_score))))
+
+
+def _export_catboost(model):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "model.json")
+        model.save_model(path, format="json")
+        with open(path) as f:
+            spec = json.load(f)
+
+    flat_index = {ff["feature_index"]: ff["flat_feature_index"]
+                  for ff in spec["features_info"]["float_features"]}
+    trees = spec["oblivious_trees"]
+    depth = max(len(t["splits"]) for t in trees)
+    feature = np.zeros((len(trees), depth), dtype=np.intp)
+    border = np.full((len(trees), depth), np.inf, dtype=np.float32)  # padded levels never fire
+    leaves = np.zeros((len(trees), 2 ** depth))
+    for i, tree in enumerate(trees):
+        for j, split in enumerate(tree["splits"]):
+            if split["split_type"] != "FloatFeature":
+                raise ValueError("only float-feature CatBoost splits can be compiled")
+            feature[i, j] = flat_index[split["float_feature_index"]]
+            border[i, j] = split["border"]
+        leaves[i, :len(tree["leaf_values"])] = tree["leaf_values"]
+
+    scale, bias = spec["scale_and_bias"]
+    return {
+        "kind": "oblivious",
+        "feature": feature,
+        "border": border,
+        "leaves": leaves,
+        "scale": float(scale),
+        "bias": float(bias[0])
+    }
+
+
+def _export_svc(model, calibrated=False):
+    if not (model.probability or calibrated):
+        raise ValueError("SVC must be fitted with probability=True")
+    if model.kernel not in ("rbf", "poly"):
+        raise ValueError(f"unsupported SVC kernel {model.kernel!r}")
+    sv = np.ascontiguousarray(model.support_vectors_, dtype=float)
+    return {
+        "kind": "svc",
+        "kernel": model.kernel,
+        "support_vectors": sv,
+        "sv_sq_norms": np.einsum("ij,ij->i", sv, sv),  # precomputed for RBF
+        "dual_coef": np.ascontiguousarray(model.dual_coef_[0], dtype=float),
+        "intercept": float(model.intercept_[0]),
+        "gamma": float(model._gamma),
+        "degree": int(model.degree),
+        "coef0": float(model.coef0),
+        **({} if calibrated else {"prob_a": float(model.probA_[0]), "prob_b": float(model.probB_[0])})
+    }
+
+
+def _export_calibrated_svc(model):
+    # CalibratedClassifierCV(SVC, method="sigmoid", ensemble=False): one SVC
+    # fitted on all rows and one sigmoid on its decision value
+    if model.method != "sigmoid" or len(model.calibrated_classifiers_) != 1:
+        raise ValueError("only a single sigmoid-calibrated classifier can be compiled")
+    calibrated = model.calibrated_classifiers_[0]
+    if type(calibrated.estimator).__name__ != "SVC":
+        raise ValueError(f"cannot compile calibrated {type(calibrated.estimator).__name__}")
+    spec = _export_svc(calibrated.estimator, calibrated=True)
+    spec["sigmoid_a"] = float(calibrated.calibrators[0].a_)
+    spec["sigmoid_b"] = float(calibrated.calibrators[0].b_)
+    return spec
+
+
+def export_estimator(model):
+    name = type(model).__name__
+    if name == "RandomForestClassifier":
+        return _export_random_forest(model)
+    if name == "XGBClassifier":
+        return _export_xgboost(model)
+    if name == "CatBoostClassifier":
+        return _export_catboost(model)
+    if name == "SVC":
+        return _export_svc(model)
+    if name == "CalibratedClassifierCV":
+        return _export_calibrated_svc(model)
+    raise ValueError(f"cannot compile {name}")
+
+
+# libsvm's Platt pair, or the CalibratedClassifierCV sigmoid
+CALIBRATION_KEYS = ("prob_a", "prob_b", "sigmoid_a", "sigmoid_b")
+
+
+def split_calibration(spec):
+    # An SVC refit with probability=True gets a fresh random Platt CV, so the
+    # voting and stacking copies differ only in their calibration. Split it
+    # off so the kernel part -- the expensive bit -- can be shared.
+    if spec["kind"] != "svc":
+        return spec, {}
+    return ({k: v for k, v in spec.items() if k not in CALIBRATION_KEYS},
+            {k: spec[k] for k in CALIBRATION_KEYS if k in spec})
+
+
+def check_ensembles(voting_model, stacked_model):
+    if voting_model.voting != "soft":
+        raise ValueError("only soft voting can be compiled")
+    if stacked_model.passthrough:
+        raise ValueError("stacking with passthrough cannot be compiled")
+    if any(m != "predict_proba" for m in stacked_model.stack_method_):
+        raise ValueError("stacking must use predict_proba for every estimator")
+    for model in (voting_model, stacked_model):
+        if list(model.classes_) != [0, 1]:
+            raise ValueError("only binary 0/1 ensembles can be compiled")
+
+
+def compile_ensembles(scaler, voting_model, stacked_model):
+    check_ensembles(voting_model, stacked_model)
+
+    # members point into one deduplicated component list
+    components, index = [], {}
+
+    def member(model):
+        shared, calibration = split_calibration(export_estimator(model))
+        key = joblib.hash(shared)
+        if key not in index:
+            index[key] = len(components)
+            components.append(shared)
+        return dict(calibration, component=index[key])
+
+    weights = voting_model.weights
+    final = stacked_model.final_estimator_
+    return {
+        "scaler": {
+            "mean": np.asarray(scaler.mean_, dtype=float),
+            "scale": np.asarray(scaler.scale_, dtype=float)
+        },
+        "components": components,
+        "voting": {
+            "members": [member(m) for m in voting_model.estimators_],
+            "weights": None if weights is None else np.asarray(weights, dtype=float)
+        },
+        "stacking": {
+            "members": [member(m) for m in stacked_model.estimators_],
+            "coef": np.asarray(final.coef_[0], dtype=float),
+            "intercept": float(final.intercept_[0])
+        }
+    }
+
+
+# -----------------------
+# Vectorized scoring
+# -----------------------
+def _forest_proba(c, X):
+    x = np.ascontiguousarray(X, dtype=c["x_dtype"])
+    flat_x = x.ravel()
+    row_offset = (np.arange(len(x)) * x.shape[1])[:, None]
+    node = np.broadcast_to(c["roots"], (len(x), len(c["roots"])))
+    for _ in range(c["depth"]):
+        value = np.take(flat_x, np.take(c["feature"], node) + row_offset)
+        threshold = np.take(c["threshold"], node)
+        # right branch when the split test fails
+        go_right = value > threshold if c["op"] == "le" else value >= threshold
+        node = np.take(c["children"], 2 * node + go_right)
+    leaf = np.take(c["value"], node)
+    if c["link"] == "mean":
+        return leaf.sum(axis=1) / c["n_trees"]
+    margin = leaf.astype(np.float32).sum(axis=1, dtype=np.float32) + np.float32(c["bias"])
+    return _sigmoid(margin.astype(float))
+
+
+def _oblivious_proba(c, X):
+    x = X.astype(np.float32)
+    bits = x[:, c["feature"]] > c["border"]  # (rows, trees, depth)
+    index = (bits << np.arange(bits.shape[2])).sum(axis=2)
+    trees = np.arange(c["leaves"].shape[0])
+    raw = c["leaves"][trees, index].sum(axis=1)
+    return _sigmoid(c["scale"] * raw + c["bias"])
+
+
+def svc_decision(c, X):
+    sv = c["support_vectors"]
+    dot = X @ sv.T
+    if c["kernel"] == "rbf":
+        sq = np.einsum("ij,ij->i", X, X)[:, None] - 2 * dot + c["sv_sq_norms"]
+        K = np.exp(-c["gamma"] * np.maximum(sq, 0))
+    else:
+        base = c["gamma"] * dot + c["coef0"]
+        K = base.copy()
+        for _ in range(c["degree"] - 1):  # integer power by multiplication, far cheaper than **
+            K *= base
+    return K @ c["dual_coef"] + c["intercept"]
+
+
+def platt_proba(c, dec):
+    # libsvm's binary probability: Platt sigmoid on the internal decision
+    # value (sign-flipped in sklearn), clamped, then its pairwise-coupling
+    # solver for k=2 -- replicated so results match SVC.predict_proba
+    fApB = -dec * c["prob_a"] + c["prob_b"]
+    r01 = np.clip(1.0 / (1.0 + np.exp(fApB)), 1e-7, 1 - 1e-7)
+    r10 = 1 - r01
+
+    Q00, Q11, Q01 = r10 * r10, r01 * r01, -r10 * r01
+    p0 = np.full_like(r01, 0.5)
+    p1 = np.full_like(r01, 0.5)
+    active = np.ones(len(r01), dtype=bool)
+    eps = 0.005 / 2
+    for _ in range(100):
+        Qp0 = Q00 * p0 + Q01 * p1
+        Qp1 = Q01 * p0 + Q11 * p1
+        pQp = p0 * Qp0 + p1 * Qp1
+        active &= np.maximum(np.abs(Qp0 - pQp), np.abs(Qp1 - pQp)) >= eps
+        if not active.any():
+            break
+        # t = 0
+        diff = np.where(active, (pQp - Qp0) / Q00, 0.0)
+        p0 = p0 + diff
+        pQp = (pQp + diff * (diff * Q00 + 2 * Qp0)) / (1 + diff) / (1 + diff)
+        Qp0, Qp1 = (Qp0 + diff * Q00) / (1 + diff), (Qp1 + diff * Q01) / (1 + diff)
+        p0, p1 = p0 / (1 + diff), p1 / (1 + diff)
+        # t = 1
+        diff = np.where(active, (pQp - Qp1) / Q11, 0.0)
+        p1 = p1 + diff
+        p0, p1 = p0 / (1 + diff), p1 / (1 + diff)
+    return p1
+
+
+def sigmoid_proba(c, dec):
+    # sklearn's _SigmoidCalibration, with the binary renormalization and the
+    # clip CalibratedClassifierCV applies
+    p = 1.0 / (1.0 + np.exp(c["sigmoid_a"] * dec + c["sigmoid_b"]))
+    p[(1.0 < p) & (p <= 1.0 + 1e-5)] = 1.0
+    return p
+
+
+def calibrated_proba(c, dec):
+    # class-1 probability from an SVC decision value
+    if "prob_a" in c:
+        return platt_proba(c, dec)
+    return sigmoid_proba(c, dec)
+
+
+def component_output(c, X):
+    # class-1 probability for trees, raw decision value for SVCs
+    kind = c["kind"]
+    if kind == "forest":
+        return _forest_proba(c, X)
+    if kind == "oblivious":
+        return _oblivious_proba(c, X)
+    return svc_decision(c, X)
+
+
+def member_proba(member, outputs):
+    out = outputs[member["component"]]
+    calibrated = "prob_a" in member or "sigmoid_a" in member
+    return calibrated_proba(member, out) if calibrated else out
+
+
+class CompiledEnsemble:
+    def __init__(self, spec):
+        self.spec = spec
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        return cls(joblib.load(path, mmap_mode=mmap_mode))
+
+    def save(self, path):
+        joblib.dump(self.spec, path)
+
+    def transform(self, features):
+        s = self.spec["scaler"]
+        return (np.asarray(features, dtype=float) - s["mean"]) / s["scale"]
+
+    def _score_chunk(self, X):
+        # every distinct base learner runs once; both heads reuse its output
+        with BASE_STAGE.time():
+            outputs = [component_output(c, X) for c in self.spec["components"]]
+
+        with VOTING_STAGE.time():
+            voting = self.spec["voting"]
+            vote = np.stack([member_proba(m, outputs) for m in voting["members"]], axis=1)
+            p_vote = np.average(vote, axis=1, weights=voting["weights"])
+
+        with STACKED_STAGE.time():
+            stacking = self.spec["stacking"]
+            meta = np.stack([member_proba(m, outputs) for m in stacking["members"]], axis=1)
+            p_stack = _sigmoid(meta @ stacking["coef"] + stacking["intercept"])
+        return p_vote, p_stack
+
+    def predict_proba(self, features):
+        # raw FEATURE_COLUMNS matrix -> (p_vote, p_stack) for class 1
+        with SCALER_STAGE.time():
+            X = self.transform(features)
+        if len(X) == 0:
+            # np.average over zero rows would divide by zero
+            return np.empty(0), np.empty(0)
+        parts = [self._score_chunk(X[i:i + CHUNK_ROWS]) for i in range(0, len(X), CHUNK_ROWS)]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def max_deviation(engine, scaler, voting_model, stacked_model, features):
+    X = scaler.transform(features)
+    p_vote, p_stack = engine.predict_proba(features)
+    return max(
+        float(np.abs(p_vote - voting_model.predict_proba(X)[:, 1]).max()),
+        float(np.abs(p_stack - stacked_model.predict_proba(X)[:, 1]).max())
+    )
+
+
+# -----------------------
+# CLI: python compiled_model.py [model_dir]
+# -----------------------
+def main(model_dir="."):
+    import pandas as pd
+    from features import FEATURE_COLUMNS
+    from model_registry import REQUIRED, sha256_file
+
+    scaler = joblib.load(os.path.join(model_dir, "scaler.pkl"))
+    voting_model = joblib.load(os.path.join(model_dir, "voting_model.pkl"))
+    stacked_model = joblib.load(os.path.join(model_dir, "stacked_model.pkl"))
+
+    engine = CompiledEnsemble(compile_ensembles(scaler, voting_model, stacked_model))
+
+    # check on synthetic rows spread around the training distribution
+    rng = np.random.default_rng(0)
+    raw = scaler.mean_ + scaler.scale_ * rng.normal(scale=1.5, size=(2000, len(scaler.mean_)))
+    deviation = max_deviation(engine, scaler, voting_model, stacked_model,
+                              pd.DataFrame(raw, columns=FEATURE_COLUMNS))
+    if deviation > TOLERANCE:
+        sys.exit(f"compiled model deviates from sklearn by {deviation:.2e} (> {TOLERANCE:.0e})")
+
+    # lets the model registry reject a compiled model that has gone stale
+    engine.spec["source_checksums"] = {
+        name: sha256_file(os.path.join(model_dir, name)) for name in REQUIRED
+    }
+    path = os.path.join(model_dir, "compiled_model.pkl")
+    engine.save(path)
+    print(f"wrote {path} (max |dp| = {deviation:.2e})")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+from acquisition import DeviceError, DeviceTimeout
+from metrics import REGISTRY, STAGE_SECONDS
+from telemetry import device_key
+
+logger = logging.getLogger("liverguard.devices")
+
+# -----------------------
+# Fleet settings
+# -----------------------
+DEVICES_FILE = os.getenv(
+    "LIVERGUARD_DEVICES_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "devices.json")
+)
+# consecutive failures that open a device's circuit, and how long it stays open
+BREAKER_FAILURES = int(os.getenv("ESP32_BREAKER_FAILURES", "3"))
+BREAKER_COOLDOWN = float(os.getenv("ESP32_BREAKER_COOLDOWN", "10.0"))
+# in-flight reads per board; the ESP32 web server handles one or two at a time
+DEVICE_CONCURRENCY = int(os.getenv("ESP32_DEVICE_CONCURRENCY", "2"))
+# parallel probes during a fleet-wide health check
+HEALTH_CONCURRENCY = int(os.getenv("ESP32_HEALTH_CONCURRENCY", "64"))
+
+
+FETCH_STAGE = STAGE_SECONDS.labels("fetch")
+DEVICE_ERRORS = REGISTRY.counter(
+    "liverguard_device_errors", "Failed board reads by kind (timeout, error, circuit_open).", ["kind"]
+)
+
+
+class CircuitOpen(DeviceError):
+    pass
+
+
+class CircuitBreaker:
+    # closed -> open after `failures` errors in a row; after `cooldown`
+    # seconds one trial read is let through (half-open) and decides
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self.trips = 0
+
+    def allow(self, now=None):
+        if self.state == "closed":
+            return True
+        now = time.monotonic() if now is None else now
+        if self.state == "open" and now - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+            return True
+        return False
+
+    def success(self):
+        self.state = "closed"
+        self.consecutive = 0
+
+    def failure(self, now=None):
+        self.consecutive += 1
+        if self.state == "half_open" or self.consecutive >= self.failures:
+            if self.state != "open":
+                self.trips += 1
+            self.state = "open"
+            self.opened_at = time.monotonic() if now is None else now
+
+
+class Device:
+    def __init__(self, device_id, url, max_concurrency=DEVICE_CONCURRENCY):
+        self.device_id = device_id
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.breaker = CircuitBreaker()
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.reads = 0
+        self.errors = 0
+        self.last_ok = None
+        self.last_error = None
+        self.latency_ms = None  # EMA of successful reads
+
+    def config(self):
+        return {"url": self.url, "max_concurrency": self.max_concurrency}
+
+    def info(self):
+        return dict(
+            self.config(),
+            state=self.breaker.state,
+            consecutive_failures=self.breaker.consecutive,
+            trips=self.breaker.trips,
+            reads=self.reads,
+            errors=self.errors,
+            last_ok_age=None if self.last_ok is None else round(time.time() - self.last_ok, 3),
+            last_error=self.last_error,
+            latency_ms=None if self.latency_ms is None else round(self.latency_ms, 2)
+        )
+
+
+class DeviceFleet:
+    # station id -> board endpoint, persisted as {"devices": {id: {"url": ...}}}.
+    # Every read goes through the device's circuit breaker and concurrency
+    # slots; all I/O is asyncio, so hundreds of boards need no threads.
+    def __init__(self, client, path=None):
+        self.client = client
+        self.path = path
+        self.devices = {}
+
+    @classmethod
+    def load(cls, client, path=DEVICES_FILE, defaults=None):
+        fleet = cls(client, path)
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                config = json.load(f).get("devices", {})
+        else:
+            config = {device_id: {"url": url} for device_id, url in (defaults or {}).items()}
+        for device_id, entry in config.items():
+            fleet.add(device_id, **entry)
+        return fleet
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"devices": {d.device_id: d.config() for d in self.devices.values()}}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def __contains__(self, device_id):
+        return device_id in self.devices
+
+    def __iter__(self):
+        return iter(list(self.devices))
+
+    def add(self, device_id, url, max_concurrency=DEVICE_CONCURRENCY):
+        if not url.startswith(("http://", "https://")):
+            raise ValueError(f"device {device_id}: url must be http(s), got {url!r}")
+        if max_concurrency < 1:
+            raise ValueError(f"device {device_id}: max_concurrency must be >= 1")
+        # binary telemetry addresses boards by crc32 of their id
+        for other in self.devices:
+            if other != device_id and device_key(other) == device_key(device_id):
+                raise ValueError(f"device {device_id}: telemetry key collides with {other}, pick another id")
+        device = Device(device_id, url, max_concurrency)
+        self.devices[device_id] = device
+        return device
+
+    def remove(self, device_id):
+        return self.devices.pop(device_id)
+
+    def default(self, preferred=None):
+        # the station used when a request names none: `preferred` if it is
+        # configured, then "default", then the first board; None when empty
+        for device_id in (preferred, "default"):
+            if device_id in self.devices:
+                return device_id
+        return next(iter(self.devices), None)
+
+    async def read(self, device_id):
+        device = self.devices[device_id]
+        if not device.breaker.allow():
+            DEVICE_ERRORS.labels("circuit_open").inc()
+            raise CircuitOpen(f"{device_id} circuit open after {device.breaker.consecutive} failures")
+        t0 = time.perf_counter()
+        try:
+            async with device.slots:
+                t0 = time.perf_counter()
+                reading = await self.client.read(device.url)
+        except DeviceError as e:
+            FETCH_STAGE.observe(time.perf_counter() - t0)
+            DEVICE_ERRORS.labels("timeout" if isinstance(e, DeviceTimeout) else "error").inc()
+            device.errors += 1
+            device.last_error = str(e)
+            device.breaker.failure()
+            raise
+        except BaseException as e:
+            # cancelled (caller gone) or an unexpected error: the attempt
+            # still settles the breaker, otherwise a half-open trial that
+            # never finishes leaves it rejecting every read until restart
+            if isinstance(e, Exception):
+                DEVICE_ERRORS.labels("error").inc()
+                device.errors += 1
+                device.last_error = repr(e)
+            device.breaker.failure()
+            raise
+        seconds = time.perf_counter() - t0
+        FETCH_STAGE.observe(seconds)
+        ms = seconds * 1e3
+        device.reads += 1
+        device.last_ok = time.time()
+        device.last_error = None
+        device.latency_ms = ms if device.latency_ms is None else 0.8 * device.latency_ms + 0.2 * ms
+        device.breaker.success()
+        return reading
+
+    async def check_all(self, concurrency=HEALTH_CONCURRENCY):
+        # probe every board once; state lands in each device's info()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def probe(device_id):
+            async with slots:
+                try:
+                    await self.read(device_id)
+                except (DeviceError, KeyError):
+                    pass
+
+        await asyncio.gather(*(probe(device_id) for device_id in self))
+
+    def info(self):
+        states = [d.breaker.state for d in self.devices.values()]
+        return {
+            "count": len(states),
+            "healthy": states.count("closed"),
+            "devices": {device_id: d.info() for device_id, d in self.devices.items()}
+        }
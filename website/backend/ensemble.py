@@ -0,0 +1,71 @@
+import joblib
+import numpy as np
+
+from compiled_model import calibrated_proba, check_ensembles, export_estimator, split_calibration
+from metrics import STAGE_SECONDS
+
+BASE_STAGE = STAGE_SECONDS.labels("base_learners")
+VOTING_STAGE = STAGE_SECONDS.labels("voting")
+STACKED_STAGE = STAGE_SECONDS.labels("stacked")
+
+
+# -----------------------
+# Shared base-learner scoring (sklearn objects)
+# -----------------------
+class SharedEnsemble:
+    # The notebook builds the VotingClassifier and StackingClassifier from
+    # the same stack_estimators list, so both hold equivalent fitted copies
+    # of every base learner. Score each distinct learner once per batch and
+    # feed the result to the soft vote and to the stacking final_estimator.
+    def __init__(self, voting_model, stacked_model):
+        check_ensembles(voting_model, stacked_model)
+        self.voting_model = voting_model
+        self.stacked_model = stacked_model
+
+        # groups: (estimator, use_decision_function) evaluated once per batch
+        self.groups = []
+        index = {}
+
+        def member(model):
+            try:
+                shared, calibration = split_calibration(export_estimator(model))
+            except ValueError:
+                shared, calibration = model, {}
+            key = joblib.hash(shared)
+            if key not in index:
+                index[key] = len(self.groups)
+                if "sigmoid_a" in calibration:
+                    # the decision value comes from the SVC inside the calibrator
+                    model = model.calibrated_classifiers_[0].estimator
+                self.groups.append((model, bool(calibration)))
+            return dict(calibration, component=index[key])
+
+        self.vote_members = [member(m) for m in voting_model.estimators_]
+        self.stack_members = [member(m) for m in stacked_model.estimators_]
+
+    @property
+    def n_evaluations(self):
+        return len(self.groups)
+
+    def _proba(self, member, outputs):
+        out = outputs[member["component"]]
+        if "prob_a" in member or "sigmoid_a" in member:
+            return calibrated_proba(member, out)
+        return out[:, 1]
+
+    def predict_proba(self, X):
+        # scaled matrix -> (p_vote, p_stack) for class 1
+        with BASE_STAGE.time():
+            outputs = [
+                model.decision_function(X) if use_decision else model.predict_proba(X)
+                for model, use_decision in self.groups
+            ]
+
+        with VOTING_STAGE.time():
+            vote = np.asarray([self._proba(m, outputs) for m in self.vote_members])
+            p_vote = np.average(vote, axis=0, weights=self.voting_model.weights)
+
+        with STACKED_STAGE.time():
+            meta = np.column_stack([self._proba(m, outputs) for m in self.stack_members])
+            p_stack = self.stacked_model.final_estimator_.predict_proba(meta)[:, 1]
+        return p_vote, p_stack
@@ -0,0 +1,141 @@
+import json
+
+import numpy as np
+from sklearn.preprocessing import RobustScaler
+
+# model input columns, in the order the scaler was fit on
+FEATURE_COLUMNS = ["Age", "Gender", "BodyTemp", "LiverTemp", "GSR", "BMI", "Yellowness Index"]
+
+
+# -----------------------
+# Yellowness index constants (precomputed once)
+# -----------------------
+GAMMA = 2.2
+EPS = 1e-6
+
+# sRGB (D65) -> XYZ
+M_SRGB_D65 = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041]
+])
+Cx, Cz = 1.2769, 1.0592
+
+# YI only needs Y and (Cx*X - Cz*Z), so fold Cx/Cz into the matrix:
+# linear_rgb @ YI_WEIGHTS -> columns [Y, Cx*X - Cz*Z]
+YI_WEIGHTS = np.ascontiguousarray(np.stack([
+    M_SRGB_D65[1],
+    Cx * M_SRGB_D65[0] - Cz * M_SRGB_D65[2]
+], axis=1))
+
+for _const in (M_SRGB_D65, YI_WEIGHTS):
+    _const.setflags(write=False)
+
+
+class YellownessWorkspace:
+    # scratch buffers for yellowness_index; reuse one per batch size
+    # so repeated calls do not allocate
+    def __init__(self, n):
+        self.n = n
+        self.c = np.empty((n, 1))
+        self.rgb = np.empty((n, 3))
+        self.denom = np.empty((n, 3))
+        self.yz = np.empty((n, 2))
+
+
+def yellowness_index(rgb, c, out=None, workspace=None):
+    # rgb: (N, 3) raw sensor counts, c: (N,) intensity -> (N,) YI.
+    # Per-row gray-world balance, matching compute_yellowness on one reading.
+    rgb = np.asarray(rgb, dtype=float)
+    n = rgb.shape[0]
+    ws = workspace if workspace is not None else YellownessWorkspace(n)
+    if ws.n != n:
+        raise ValueError(f"workspace is sized for {ws.n} rows, got {n}")
+    if out is None:
+        out = np.empty(n)
+
+    np.maximum(np.asarray(c, dtype=float).reshape(n, 1), EPS, out=ws.c)
+    np.divide(rgb, ws.c, out=ws.rgb)
+
+    # gray world over a single reading is the reading itself
+    np.add(ws.rgb, EPS, out=ws.denom)
+    np.divide(ws.rgb, ws.denom, out=ws.rgb)
+    np.clip(ws.rgb, 0, 1, out=ws.rgb)
+    np.power(ws.rgb, GAMMA, out=ws.rgb)
+
+    np.matmul(ws.rgb, YI_WEIGHTS, out=ws.yz)
+    y = ws.yz[:, 0]
+    np.maximum(y, EPS, out=y)
+    np.divide(ws.yz[:, 1], y, out=out)
+    np.multiply(out, 100, out=out)
+    return out
+
+
+# -----------------------
+# Fitted train/serve pipeline
+# -----------------------
+class YellownessPipeline:
+    # The training notebook white-balances against the dataset-wide gray
+    # world, RobustScales XYZ and min-max normalizes YI over the dataset.
+    # fit() learns those statistics; transform() replays them on new
+    # readings, so the notebook and the backend run the same code.
+    def __init__(self, gray_world_avg=None, xyz_center=None, xyz_scale=None, yi_min=None, yi_max=None):
+        self.gray_world_avg = None if gray_world_avg is None else np.asarray(gray_world_avg, dtype=float)
+        self.xyz_center = None if xyz_center is None else np.asarray(xyz_center, dtype=float)
+        self.xyz_scale = None if xyz_scale is None else np.asarray(xyz_scale, dtype=float)
+        self.yi_min = yi_min
+        self.yi_max = yi_max
+
+    @staticmethod
+    def _rgb_norm(rgb, c):
+        # C order keeps the reductions bit-identical to the notebook's np.stack
+        rgb = np.ascontiguousarray(rgb, dtype=float)
+        c = np.asarray(c, dtype=float).reshape(-1, 1)
+        return rgb / np.clip(c, EPS, None)
+
+    def _xyz(self, rgb_norm):
+        rgb_balanced = np.clip(rgb_norm / self.gray_world_avg, 0, 1)
+        rgb_linear = np.power(rgb_balanced, GAMMA)
+        return rgb_linear @ M_SRGB_D65.T
+
+    def _yi_raw(self, xyz):
+        X_scaled, Y_scaled, Z_scaled = ((xyz - self.xyz_center) / self.xyz_scale).T
+        return 100 * (Cx * X_scaled - Cz * Z_scaled) / np.clip(Y_scaled, EPS, None)
+
+    def fit(self, rgb, c):
+        rgb_norm = self._rgb_norm(rgb, c)
+        self.gray_world_avg = np.mean(rgb_norm, axis=0)
+
+        scaler_xyz = RobustScaler().fit(self._xyz(rgb_norm))
+        self.xyz_center = scaler_xyz.center_
+        self.xyz_scale = scaler_xyz.scale_
+
+        yi_raw = self._yi_raw(self._xyz(rgb_norm))
+        self.yi_min = float(yi_raw.min())
+        self.yi_max = float(yi_raw.max())
+        return self
+
+    def transform(self, rgb, c):
+        yi_raw = self._yi_raw(self._xyz(self._rgb_norm(rgb, c)))
+        return (yi_raw - self.yi_min) / (self.yi_max - self.yi_min)
+
+    def fit_transform(self, rgb, c):
+        return self.fit(rgb, c).transform(rgb, c)
+
+    def to_dict(self):
+        return {
+            "gray_world_avg": self.gray_world_avg.tolist(),
+            "xyz_center": self.xyz_center.tolist(),
+            "xyz_scale": self.xyz_scale.tolist(),
+            "yi_min": self.yi_min,
+            "yi_max": self.yi_max
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
@@ -0,0 +1,150 @@
+import logging
+import multiprocessing
+import os
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from model_registry import ModelLoadError, load_bundle, warm_bundle
+
+logger = logging.getLogger("liverguard.pool")
+
+# -----------------------
+# Process-pool settings
+# -----------------------
+# >0: score in this many worker processes instead of the server's threads
+INFERENCE_WORKERS = int(os.getenv("LIVERGUARD_INFERENCE_WORKERS", "0"))
+# "spawn" keeps workers free of the parent's event loop and threads
+INFERENCE_START_METHOD = os.getenv("LIVERGUARD_INFERENCE_START_METHOD", "spawn")
+
+
+# -----------------------
+# Worker side
+# -----------------------
+# model_dir -> bundle, loaded once per worker process
+_bundles = {}
+
+
+def _init_worker(model_dirs):
+    for model_dir in model_dirs:
+        _worker_bundle(model_dir, None)
+
+
+def _worker_bundle(model_dir, version):
+    bundle = _bundles.get(model_dir)
+    if bundle is None or (version is not None and bundle.version != version):
+        bundle = warm_bundle(load_bundle(model_dir))
+        _bundles[model_dir] = bundle
+    if version is not None and bundle.version != version:
+        raise ModelLoadError(f"{model_dir} now holds {bundle.version}, not {version}")
+    return bundle
+
+
+def _score_shared(model_dir, version, name, n_rows, n_cols):
+    # features and results live in one shared block: [n_rows, n_cols + 2]
+    block = shared_memory.SharedMemory(name=name)
+    data = None
+    try:
+        data = np.ndarray((n_rows, n_cols + 2), dtype=np.float64, buffer=block.buf)
+        bundle = _worker_bundle(model_dir, version)
+        data[:, n_cols], data[:, n_cols + 1] = bundle.score(data[:, :n_cols])
+    except BaseException as e:
+        # bundle.score's frames in the traceback still hold views of the
+        # block; drop their locals so close() cannot raise BufferError and
+        # hide the real error
+        traceback.clear_frames(e.__traceback__)
+        raise
+    finally:
+        data = None
+        block.close()
+
+
+# -----------------------
+# Server side
+# -----------------------
+class InferencePool:
+    # Scores feature matrices in worker processes. Each worker loads a model
+    # version once; matrices go through shared memory, so only the block name
+    # and shape are pickled per call. score() blocks, call it from a thread.
+    def __init__(self, workers=INFERENCE_WORKERS, model_dirs=(), start_method=INFERENCE_START_METHOD):
+        self.workers = workers
+        self.model_dirs = tuple(model_dirs)
+        self.start_method = start_method
+        self.calls = 0
+        self.rows = 0
+        self.restarts = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    def start(self):
+        if not self.enabled or self._executor is not None:
+            return
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(self.model_dirs,)
+        )
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def warm(self):
+        # make every worker load its models before traffic arrives
+        if self._executor is not None:
+            list(self._executor.map(_init_worker, [self.model_dirs] * self.workers))
+
+    def _restart(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                logger.error("inference worker died, restarting the pool")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self.restarts += 1
+                self.start()
+
+    def score(self, features, bundle):
+        # raw FEATURE_COLUMNS matrix -> (p_vote, p_stack), like bundle.score
+        features = np.asarray(features, dtype=np.float64)
+        n_rows, n_cols = features.shape
+        block = shared_memory.SharedMemory(create=True, size=max(1, n_rows * (n_cols + 2) * 8))
+        data = None
+        try:
+            data = np.ndarray((n_rows, n_cols + 2), dtype=np.float64, buffer=block.buf)
+            data[:, :n_cols] = features
+            executor = self._executor
+            try:
+                executor.submit(
+                    _score_shared, bundle.model_dir, bundle.version, block.name, n_rows, n_cols
+                ).result()
+            except BrokenProcessPool:
+                self._restart(executor)
+                raise
+            self.calls += 1
+            self.rows += n_rows
+            return data[:, n_cols].copy(), data[:, n_cols + 1].copy()
+        finally:
+            # release the view on every path, or close() raises BufferError
+            data = None
+            block.close()
+            block.unlink()
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "workers": self.workers,
+            "start_method": self.start_method,
+            "calls": self.calls,
+            "rows": self.rows,
+            "restarts": self.restarts
+        }
@@ -0,0 +1,241 @@
+import abc
+import bisect
+import math
+import threading
+import time
+
+# -----------------------
+# Prometheus text exposition without the client library
+# -----------------------
+# Every instrument is a plain Python object: observe()/inc() is a bisect and
+# a couple of additions under an uncontended lock (~1 us), cheap enough to
+# stay on in production. Label children are created once and reused, so hot
+# paths bind them at import time: FETCH = STAGE_SECONDS.labels("fetch").
+
+# seconds; fine resolution at the low end where the per-stage timings live
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025,
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Timer:
+    __slots__ = ("child", "t0")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.t0)
+
+
+class CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+
+class HistogramChild:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self)
+
+
+class Metric(abc.ABC):
+    # anything the registry renders: subclasses yield (name, labels, value)
+    kind = None
+
+    def __init__(self, name, doc, labelnames=()):
+        self.name = name
+        self.doc = doc
+        self.labelnames = tuple(labelnames)
+
+    @abc.abstractmethod
+    def samples(self):
+        pass
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{name}{labels} {_number(value)}" for name, labels, value in self.samples()]
+        return "\n".join(lines)
+
+
+class LabeledMetric(Metric):
+    # instruments updated in-process, one child per label value tuple
+    def __init__(self, name, doc, labelnames=()):
+        super().__init__(name, doc, labelnames)
+        self.children = {}
+        self._lock = threading.Lock()
+
+    @abc.abstractmethod
+    def _child(self):
+        pass
+
+    def labels(self, *values):
+        values = tuple(str(v) for v in values)
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}")
+            with self._lock:
+                child = self.children.setdefault(values, self._child())
+        return child
+
+
+class Counter(LabeledMetric):
+    kind = "counter"
+
+    def _child(self):
+        return CounterChild()
+
+    def inc(self, amount=1.0):
+        self.labels().inc(amount)
+
+    def samples(self):
+        for values, child in list(self.children.items()):
+            yield self.name + "_total", _labels(self.labelnames, values), child.value
+
+
+class Histogram(LabeledMetric):
+    kind = "histogram"
+
+    def __init__(self, name, doc, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, doc, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def samples(self):
+        for values, child in list(self.children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                yield self.name + "_bucket", _labels(self.labelnames, values, ("le", _number(bound))), cumulative
+            yield self.name + "_sum", _labels(self.labelnames, values), total
+            yield self.name + "_count", _labels(self.labelnames, values), cumulative
+
+
+class Callback(Metric):
+    # value read from existing stats at scrape time: fn() -> number, or
+    # {label value tuple: number} when the metric has labels
+    def __init__(self, name, doc, kind, fn, labelnames=()):
+        super().__init__(name, doc, labelnames)
+        self.kind = kind
+        self.fn = fn
+
+    def samples(self):
+        value = self.fn()
+        suffix = "_total" if self.kind == "counter" else ""
+        items = value.items() if isinstance(value, dict) else [((), value)]
+        for values, v in items:
+            if v is not None:
+                yield self.name + suffix, _labels(self.labelnames, values), v
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, doc, labelnames=()):
+        return self._register(Counter(name, doc, labelnames))
+
+    def histogram(self, name, doc, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, doc, labelnames, buckets))
+
+    def callback(self, name, doc, kind, fn, labelnames=()):
+        return self._register(Callback(name, doc, kind, fn, labelnames))
+
+    def render(self):
+        return "\n".join(m.render() for m in list(self.metrics.values())) + "\n"
+
+
+REGISTRY = Registry()
+
+# shared by the modules that time pipeline stages
+STAGE_SECONDS = REGISTRY.histogram(
+    "liverguard_stage_seconds", "Time spent in each stage of the prediction path.", ["stage"]
+)
+
+
+class RequestMetrics:
+    # ASGI middleware: latency and status per route template; the template
+    # ("/devices/{device_id}") keeps label cardinality bounded
+    def __init__(self, app, registry=REGISTRY):
+        self.app = app
+        self.latency = registry.histogram(
+            "liverguard_http_request_seconds", "HTTP request latency by route.", ["method", "route"]
+        )
+        self.responses = registry.counter(
+            "liverguard_http_responses", "HTTP responses by route and status code.", ["method", "route", "status"]
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = [500]
+
+        async def send_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            self.latency.labels(method, path).observe(time.perf_counter() - t0)
+            self.responses.labels(method, path, status[0]).inc()
@@ -0,0 +1,360 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from compiled_model import CompiledEnsemble
+from ensemble import SharedEnsemble
+from features import FEATURE_COLUMNS, YellownessPipeline, yellowness_index
+from metrics import STAGE_SECONDS
+
+logger = logging.getLogger("liverguard.models")
+
+# -----------------------
+# Artifact layout
+# -----------------------
+MODEL_DIR = os.getenv("LIVERGUARD_MODEL_DIR", os.path.dirname(os.path.abspath(__file__)))
+REQUIRE_MANIFEST = os.getenv("LIVERGUARD_REQUIRE_MANIFEST", "0") == "1"
+
+MANIFEST = "manifest.json"
+REQUIRED = ("voting_model.pkl", "stacked_model.pkl", "scaler.pkl")
+OPTIONAL = ("feature_pipeline.json", "compiled_model.pkl")
+
+# Pickled sklearn objects are mapped copy-on-write: libsvm refuses read-only
+# buffers, but untouched pages stay shared between worker processes.
+# The compiled engine only reads its arrays, so it maps them read-only.
+SKLEARN_MMAP_MODE = "c"
+COMPILED_MMAP_MODE = "r"
+
+
+DATAFRAME_STAGE = STAGE_SECONDS.labels("dataframe")
+SCALER_STAGE = STAGE_SECONDS.labels("scaler")
+VOTING_STAGE = STAGE_SECONDS.labels("voting")
+STACKED_STAGE = STAGE_SECONDS.labels("stacked")
+
+
+class ModelLoadError(Exception):
+    pass
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_checksums(model_dir):
+    return {
+        name: sha256_file(os.path.join(model_dir, name))
+        for name in REQUIRED + OPTIONAL
+        if os.path.exists(os.path.join(model_dir, name))
+    }
+
+
+def write_manifest(model_dir, version=None):
+    checksums = artifact_checksums(model_dir)
+    missing = [name for name in REQUIRED if name not in checksums]
+    if missing:
+        raise ModelLoadError(f"{model_dir} is missing {', '.join(missing)}")
+    if version is None:
+        version = hashlib.sha256("".join(sorted(checksums.values())).encode()).hexdigest()[:12]
+    manifest = {
+        "version": version,
+        "feature_columns": FEATURE_COLUMNS,
+        "artifacts": checksums,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+    with open(os.path.join(model_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _check_schema(name, model):
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None and list(names) != FEATURE_COLUMNS:
+        raise ModelLoadError(f"{name} was fit on {list(names)}, expected {FEATURE_COLUMNS}")
+    n = getattr(model, "n_features_in_", len(FEATURE_COLUMNS))
+    if n != len(FEATURE_COLUMNS):
+        raise ModelLoadError(f"{name} expects {n} features, expected {len(FEATURE_COLUMNS)}")
+
+
+def model_proba(model, X):
+    # Prefer using predicted probabilities to compute a meaningful confidence
+    try:
+        return model.predict_proba(X)[:, 1].astype(float)
+    except Exception:
+        # fallback to deterministic prediction if predict_proba isn't available
+        return np.asarray(model.predict(X), dtype=float)
+
+
+# -----------------------
+# One loaded model version
+# -----------------------
+class ModelBundle:
+    def __init__(self, version, model_dir, scaler, voting_model, stacked_model,
+                 yellowness_pipeline=None, compiled=None, checksums=None, verified=False):
+        self.version = version
+        self.model_dir = model_dir
+        self.scaler = scaler
+        self.voting_model = voting_model
+        self.stacked_model = stacked_model
+        self.yellowness_pipeline = yellowness_pipeline
+        self.compiled = compiled
+        self.checksums = checksums or {}
+        self.verified = verified
+        self.load_seconds = None
+
+        # sklearn path: base learners common to both ensembles run once per batch
+        self.shared = None
+        if compiled is None:
+            try:
+                self.shared = SharedEnsemble(voting_model, stacked_model)
+            except ValueError as e:
+                logger.warning("scoring voting and stacked models separately: %s", e)
+
+    @property
+    def engine(self):
+        if self.compiled is not None:
+            return "compiled"
+        return "shared" if self.shared is not None else "sklearn"
+
+    def yellowness(self, rgb, c, out=None):
+        if self.yellowness_pipeline is None:
+            return yellowness_index(rgb, c, out=out)
+        yi = self.yellowness_pipeline.transform(rgb, c)
+        if out is None:
+            return yi
+        out[:] = yi
+        return out
+
+    def score(self, features):
+        # raw FEATURE_COLUMNS matrix -> (p_vote, p_stack)
+        if self.compiled is not None:
+            return self.compiled.predict_proba(features)
+
+        # scaler and both ensembles run once over the whole matrix;
+        # the scaler was fit on a named frame, so keep the column names
+        with DATAFRAME_STAGE.time():
+            frame = pd.DataFrame(features, columns=FEATURE_COLUMNS)
+        with SCALER_STAGE.time():
+            X = self.scaler.transform(frame)
+        if self.shared is not None:
+            return self.shared.predict_proba(X)
+        with VOTING_STAGE.time():
+            p_vote = model_proba(self.voting_model, X)
+        with STACKED_STAGE.time():
+            p_stack = model_proba(self.stacked_model, X)
+        return p_vote, p_stack
+
+    def info(self):
+        return {
+            "version": self.version,
+            "model_dir": self.model_dir,
+            "engine": self.engine,
+            "verified": self.verified,
+            "feature_pipeline": self.yellowness_pipeline is not None,
+            "load_seconds": self.load_seconds,
+            "checksums": self.checksums
+        }
+
+
+def load_bundle(model_dir=MODEL_DIR, require_manifest=REQUIRE_MANIFEST):
+    t0 = time.perf_counter()
+    model_dir = os.path.abspath(model_dir)
+    path = lambda name: os.path.join(model_dir, name)  # noqa: E731
+
+    checksums = artifact_checksums(model_dir)
+    missing = [name for name in REQUIRED if name not in checksums]
+    if missing:
+        raise ModelLoadError(f"{model_dir} is missing {', '.join(missing)}")
+
+    # checksums are validated before anything is unpickled
+    manifest = None
+    if os.path.exists(path(MANIFEST)):
+        with open(path(MANIFEST)) as f:
+            manifest = json.load(f)
+        for name, expected in manifest["artifacts"].items():
+            if name not in checksums:
+                raise ModelLoadError(f"{name} is listed in {MANIFEST} but missing")
+            if checksums[name] != expected:
+                raise ModelLoadError(f"{name} does not match the checksum in {MANIFEST}")
+        unlisted = set(checksums) - set(manifest["artifacts"])
+        if unlisted:
+            raise ModelLoadError(f"{', '.join(sorted(unlisted))} not listed in {MANIFEST}")
+        if manifest.get("feature_columns", FEATURE_COLUMNS) != FEATURE_COLUMNS:
+            raise ModelLoadError(f"{MANIFEST} feature schema does not match the backend")
+        version = manifest["version"]
+    elif require_manifest:
+        raise ModelLoadError(f"{model_dir} has no {MANIFEST}")
+    else:
+        version = "unversioned-" + checksums["voting_model.pkl"][:8]
+        logger.warning("%s has no %s; serving unverified artifacts as %s", model_dir, MANIFEST, version)
+
+    scaler = joblib.load(path("scaler.pkl"), mmap_mode=SKLEARN_MMAP_MODE)
+    _check_schema("scaler", scaler)
+
+    # fitted YI statistics exported by the training notebook
+    yellowness_pipeline = None
+    if "feature_pipeline.json" in checksums:
+        yellowness_pipeline = YellownessPipeline.load(path("feature_pipeline.json"))
+    else:
+        logger.warning(
+            "feature_pipeline.json not found; Yellowness Index falls back to "
+            "per-reading balancing and will not match the training distribution"
+        )
+
+    # pure-NumPy engine, only if it was compiled from exactly these pickles
+    compiled = None
+    if "compiled_model.pkl" in checksums:
+        candidate = CompiledEnsemble.load(path("compiled_model.pkl"), mmap_mode=COMPILED_MMAP_MODE)
+        sources = candidate.spec.get("source_checksums", {})
+        if all(sources.get(name) == checksums[name] for name in REQUIRED):
+            compiled = candidate
+        else:
+            logger.warning("compiled_model.pkl was built from other pickles; using sklearn")
+
+    # the compiled engine replaces both ensembles, so skip unpickling them
+    voting_model = stacked_model = None
+    if compiled is None:
+        voting_model = joblib.load(path("voting_model.pkl"), mmap_mode=SKLEARN_MMAP_MODE)
+        stacked_model = joblib.load(path("stacked_model.pkl"), mmap_mode=SKLEARN_MMAP_MODE)
+        _check_schema("voting_model", voting_model)
+        _check_schema("stacked_model", stacked_model)
+
+    bundle = ModelBundle(version, model_dir, scaler, voting_model, stacked_model,
+                         yellowness_pipeline, compiled, checksums, verified=manifest is not None)
+    bundle.load_seconds = round(time.perf_counter() - t0, 4)
+    logger.info("loaded model %s from %s in %.3fs (%s engine)",
+                version, model_dir, bundle.load_seconds, bundle.engine)
+    return bundle
+
+
+def warm_bundle(bundle, rows=8):
+    # push a few synthetic rows through every code path before serving
+    rng = np.random.default_rng(0)
+    features = bundle.scaler.mean_ + bundle.scaler.scale_ * rng.normal(size=(rows, len(FEATURE_COLUMNS)))
+    bundle.yellowness(rng.uniform(0, 255, size=(rows, 3)), np.ones(rows))
+    p_vote, p_stack = bundle.score(features)
+    if not (np.all(np.isfinite(p_vote)) and np.all(np.isfinite(p_stack))):
+        raise ModelLoadError(f"model {bundle.version} produced non-finite scores while warming up")
+    return bundle
+
+
+# -----------------------
+# Live versions + A/B routing
+# -----------------------
+SCORE_BINS = 20
+LATENCY_WINDOW = 2048
+
+
+class VersionStats:
+    def __init__(self):
+        self.requests = 0
+        self.rows = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # seconds, most recent calls
+        self.score_hist = np.zeros(SCORE_BINS, dtype=np.int64)
+
+    def record(self, seconds, scores):
+        self.requests += 1
+        self.rows += len(scores)
+        self.latencies.append(seconds)
+        bins = np.clip((np.asarray(scores) * SCORE_BINS).astype(int), 0, SCORE_BINS - 1)
+        np.add.at(self.score_hist, bins, 1)
+
+    def summary(self):
+        lat = np.asarray(self.latencies) * 1e3
+        p50, p99 = np.percentile(lat, [50, 99]) if len(lat) else (None, None)
+        total = self.score_hist.sum()
+        centers = (np.arange(SCORE_BINS) + 0.5) / SCORE_BINS
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "latency_ms": {"p50": p50, "p99": p99},
+            "mean_score": float(centers @ self.score_hist / total) if total else None,
+            "score_histogram": self.score_hist.tolist()
+        }
+
+
+class ModelRegistry:
+    # `active` serves by default; a `candidate` gets `candidate_share` of the
+    # traffic. Swaps are single reference assignments, so in-flight requests
+    # finish on the bundle they started with.
+    def __init__(self, active):
+        self.active = active
+        self.candidate = None
+        self.candidate_share = 0.0
+        self.stats = {active.version: VersionStats()}
+        self._lock = threading.Lock()
+
+    def route(self):
+        candidate = self.candidate
+        if candidate is not None and random.random() < self.candidate_share:
+            return candidate
+        return self.active
+
+    def record(self, version, seconds, scores):
+        with self._lock:
+            self.stats.setdefault(version, VersionStats()).record(seconds, scores)
+
+    def load(self, model_dir, role="active", share=None):
+        # blocking: run off the event loop
+        bundle = warm_bundle(load_bundle(model_dir))
+        with self._lock:
+            self.stats.setdefault(bundle.version, VersionStats())
+            if role == "candidate":
+                self.candidate = bundle
+                if share is not None:
+                    self.candidate_share = share
+            else:
+                self.active = bundle
+        logger.info("model %s is now %s", bundle.version, role)
+        return bundle
+
+    def promote(self):
+        with self._lock:
+            if self.candidate is None:
+                raise ModelLoadError("no candidate model to promote")
+            self.active, self.candidate = self.candidate, None
+            self.candidate_share = 0.0
+        return self.active
+
+    def drop_candidate(self):
+        with self._lock:
+            self.candidate = None
+            self.candidate_share = 0.0
+
+    def info(self):
+        with self._lock:
+            return {
+                "active": self.active.info(),
+                "candidate": None if self.candidate is None else self.candidate.info(),
+                "candidate_share": self.candidate_share,
+                "stats": {version: st.summary() for version, st in self.stats.items()}
+            }
+
+
+def manifest_version(model_dir):
+    try:
+        with open(os.path.join(model_dir, MANIFEST)) as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+# -----------------------
+# CLI: python model_registry.py [model_dir] [version]  -> writes manifest.json
+# -----------------------
+if __name__ == "__main__":
+    manifest = write_manifest(*(sys.argv[1:3] or [MODEL_DIR]))
+    print(json.dumps(manifest, indent=2))
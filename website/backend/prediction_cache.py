@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from features import FEATURE_COLUMNS
+
+# -----------------------
+# Cache settings
+# -----------------------
+CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "4096"))  # entries, 0 disables
+CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "300"))  # seconds
+
+# quantization step per feature, roughly the sensor resolution; readings
+# that round to the same grid point share a cached prediction
+DEFAULT_RESOLUTION = {
+    "Age": 1.0,
+    "Gender": 1.0,
+    "BodyTemp": 0.1,
+    "LiverTemp": 0.1,
+    "GSR": 1.0,
+    "BMI": 0.1,
+    "Yellowness Index": 0.001
+}
+CACHE_RESOLUTION = dict(DEFAULT_RESOLUTION, **json.loads(os.getenv("PREDICTION_CACHE_RESOLUTION", "{}")))
+
+
+class PredictionCache:
+    # LRU + TTL map: (model version, quantized feature row) -> (p_vote, p_stack).
+    # The version is part of the key, so a model reload never serves stale
+    # scores; old entries simply age out.
+    def __init__(self, max_entries=CACHE_SIZE, ttl=CACHE_TTL, resolution=CACHE_RESOLUTION):
+        unknown = set(resolution) - set(FEATURE_COLUMNS)
+        if unknown:
+            raise ValueError(f"unknown features in cache resolution: {sorted(unknown)}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.steps = np.array([resolution[name] for name in FEATURE_COLUMNS], dtype=float)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def keys(self, version, features):
+        grid = np.rint(np.asarray(features, dtype=float) / self.steps).astype(np.int64)
+        return [(version, row.tobytes()) for row in grid]
+
+    def get_many(self, keys):
+        # -> (p_vote, p_stack, missing row indices); missing rows hold NaN
+        n = len(keys)
+        p_vote = np.full(n, np.nan)
+        p_stack = np.full(n, np.nan)
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] < now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    missing.append(i)
+                    continue
+                self._entries.move_to_end(key)
+                p_vote[i], p_stack[i] = entry[1], entry[2]
+            self.hits += n - len(missing)
+            self.misses += len(missing)
+        return p_vote, p_stack, missing
+
+    def put_many(self, keys, p_vote, p_stack):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for key, v, s in zip(keys, p_vote, p_stack):
+                self._entries[key] = (expires, float(v), float(s))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "resolution": dict(zip(FEATURE_COLUMNS, self.steps.tolist()))
+        }
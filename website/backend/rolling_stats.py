@@ -0,0 +1,177 @@
+import json
+import os
+
+import numpy as np
+
+from sensor_buffer import SENSOR_CHANNELS
+
+# -----------------------
+# Rolling-window settings
+# -----------------------
+SIGNAL_WINDOW = int(os.getenv("LIVERGUARD_SIGNAL_WINDOW", "20"))  # readings
+SIGNAL_EMA_ALPHA = float(os.getenv("LIVERGUARD_SIGNAL_EMA_ALPHA", "0.2"))
+
+# a channel is stable when its rolling std and |slope| (units per second)
+# are both under these limits; "gsr" and "thermalMax" are the noisy ones
+DEFAULT_THRESHOLDS = {
+    "r": {"std": 5.0, "slope": 2.0},
+    "g": {"std": 5.0, "slope": 2.0},
+    "b": {"std": 5.0, "slope": 2.0},
+    "bodyTemp": {"std": 0.1, "slope": 0.02},
+    "thermalMax": {"std": 0.3, "slope": 0.05},
+    "gsr": {"std": 15.0, "slope": 5.0}
+}
+SIGNAL_THRESHOLDS = dict(DEFAULT_THRESHOLDS, **json.loads(os.getenv("LIVERGUARD_SIGNAL_THRESHOLDS", "{}")))
+
+# recompute the running sums from the window this often to stop float drift
+RESYNC_EVERY = 1024
+
+
+class RollingStats:
+    # Windowed mean / variance / least-squares slope plus an EMA for every
+    # sensor channel at once. Each update is O(1): running sums of x, x^2
+    # and k*x (k = position in the window) are adjusted for the reading that
+    # enters and the one that leaves.
+    def __init__(self, window=SIGNAL_WINDOW, alpha=SIGNAL_EMA_ALPHA):
+        n_ch = len(SENSOR_CHANNELS)
+        self.window = window
+        self.alpha = alpha
+        self._ts = np.zeros(window)
+        self._values = np.zeros((window, n_ch))
+        self._head = 0
+        self.count = 0
+        self.updates = 0
+        self._s1 = np.zeros(n_ch)
+        self._s2 = np.zeros(n_ch)
+        self._sk = np.zeros(n_ch)
+        self.ema = np.zeros(n_ch)
+
+    def update(self, ts, values):
+        x = np.asarray(values, dtype=float)
+        n = self.count
+        if n < self.window:
+            self._sk += n * x
+            self._s1 += x
+            self._s2 += x * x
+            self.count += 1
+        else:
+            # oldest leaves, everyone else moves one position down
+            old = self._values[self._head]
+            self._s1 -= old
+            self._sk += (n - 1) * x - self._s1
+            self._s1 += x
+            self._s2 += x * x - old * old
+        self._ts[self._head] = ts
+        self._values[self._head] = x
+        self._head = (self._head + 1) % self.window
+        self.ema = x.copy() if n == 0 else self.alpha * x + (1 - self.alpha) * self.ema
+        self.updates += 1
+        if self.updates % RESYNC_EVERY == 0:
+            self._resync()
+
+    def update_many(self, ts, values):
+        # a batch, oldest first: rebuild the window and fold the EMA with
+        # array ops instead of one scalar update per reading
+        values = np.asarray(values, dtype=float)
+        k = len(values)
+        if k == 1:
+            self.update(ts[0], values[0])
+            return
+        old_ts, old_values = self._ordered()
+        new_ts = np.concatenate([old_ts, ts])[-self.window:]
+        new_values = np.concatenate([old_values, values])[-self.window:]
+        n = len(new_ts)
+        self._ts[:n] = new_ts
+        self._values[:n] = new_values
+        self._head = n % self.window
+        self.count = n
+        self._resync()
+        if self.updates == 0:
+            self.ema, values = values[0].copy(), values[1:]
+        self.updates += k
+        m = len(values)
+        decay = (1 - self.alpha) ** np.arange(m - 1, -1, -1)
+        self.ema = (1 - self.alpha) ** m * self.ema + self.alpha * (decay @ values)
+
+    def _resync(self):
+        _, values = self._ordered()
+        self._s1 = values.sum(axis=0)
+        self._s2 = (values * values).sum(axis=0)
+        self._sk = np.arange(len(values)) @ values
+
+    def _ordered(self):
+        idx = (self._head - self.count + np.arange(self.count)) % self.window
+        return self._ts[idx], self._values[idx]
+
+    @property
+    def last_ts(self):
+        return self._ts[(self._head - 1) % self.window]
+
+    @property
+    def ready(self):
+        return self.count == self.window
+
+    @property
+    def mean(self):
+        return self._s1 / max(self.count, 1)
+
+    @property
+    def variance(self):
+        n = self.count
+        if n < 2:
+            return np.zeros_like(self._s1)
+        return np.maximum(self._s2 - self._s1 * self._s1 / n, 0.0) / (n - 1)
+
+    @property
+    def slope(self):
+        # least-squares slope per reading, scaled to units per second by the
+        # mean spacing of the window's timestamps
+        n = self.count
+        if n < 2:
+            return np.zeros_like(self._s1)
+        k_sum = n * (n - 1) / 2
+        k_var = n * (n * n - 1) / 12
+        per_reading = (self._sk - k_sum * self._s1 / n) / k_var
+        newest = self.last_ts
+        oldest = self._ts[(self._head - n) % self.window]
+        spacing = (newest - oldest) / (n - 1)
+        return per_reading / spacing if spacing > 0 else np.zeros_like(self._s1)
+
+    def summary(self):
+        std, slope = np.sqrt(self.variance), self.slope
+        return {
+            ch: {
+                "mean": float(self.mean[i]),
+                "std": float(std[i]),
+                "ema": float(self.ema[i]),
+                "slope": float(slope[i])
+            }
+            for i, ch in enumerate(SENSOR_CHANNELS)
+        }
+
+
+class StabilityGate:
+    def __init__(self, thresholds=SIGNAL_THRESHOLDS):
+        unknown = set(thresholds) - set(SENSOR_CHANNELS)
+        if unknown:
+            raise ValueError(f"unknown channels in signal thresholds: {sorted(unknown)}")
+        self.thresholds = thresholds
+        self._max_std = np.array([thresholds[ch]["std"] for ch in SENSOR_CHANNELS])
+        self._max_slope = np.array([thresholds[ch]["slope"] for ch in SENSOR_CHANNELS])
+
+    def unstable_channels(self, stats):
+        # [] once the window is full and every channel is within limits
+        if not stats.ready:
+            return list(SENSOR_CHANNELS)
+        bad = (np.sqrt(stats.variance) > self._max_std) | (np.abs(stats.slope) > self._max_slope)
+        return [ch for ch, b in zip(SENSOR_CHANNELS, bad) if b]
+
+    def check(self, stats):
+        unstable = self.unstable_channels(stats)
+        return {
+            "stable": not unstable,
+            "samples": stats.count,
+            "window": stats.window,
+            "unstable": unstable,
+            "channels": stats.summary()
+        }
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import random
+import time
+
+import numpy as np
+
+from acquisition import DeviceError
+
+logger = logging.getLogger("liverguard.poller")
+
+SENSOR_CHANNELS = ["r", "g", "b", "bodyTemp", "thermalMax", "gsr"]
+
+
+# -----------------------
+# Ring buffer of timestamped readings
+# -----------------------
+class ReadingRing:
+    # fixed-size, preallocated; only touched from the event loop
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self._ts = np.zeros(capacity, dtype=float)
+        self._values = np.zeros((capacity, len(SENSOR_CHANNELS)), dtype=float)
+        self._head = 0  # next slot to write
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, ts, values):
+        self._ts[self._head] = ts
+        self._values[self._head] = values
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def extend(self, ts, values):
+        # many readings at once, oldest first; only the newest `capacity` stay
+        ts, values = ts[-self.capacity:], values[-self.capacity:]
+        idx = (self._head + np.arange(len(ts))) % self.capacity
+        self._ts[idx] = ts
+        self._values[idx] = values
+        self._head = (self._head + len(ts)) % self.capacity
+        self._count = min(self._count + len(ts), self.capacity)
+
+    def append_reading(self, reading, ts=None):
+        self.append(time.time() if ts is None else ts, [reading[ch] for ch in SENSOR_CHANNELS])
+
+    def last(self, n=1, max_age=None, now=None):
+        # newest-last (ts, values) copies of up to n readings younger than max_age
+        n = min(n, self._count)
+        idx = (self._head - n + np.arange(n)) % self.capacity
+        ts, values = self._ts[idx], self._values[idx]
+        if max_age is not None:
+            now = time.time() if now is None else now
+            fresh = ts >= now - max_age
+            ts, values = ts[fresh], values[fresh]
+        return ts, values
+
+    def average(self, n=1, max_age=None, now=None):
+        # mean of the last n fresh readings, or None if nothing is fresh enough
+        ts, values = self.last(n, max_age, now)
+        if len(ts) == 0:
+            return None
+        return ts[-1], values.mean(axis=0), len(ts)
+
+
+def reading_dict(values):
+    return {ch: float(v) for ch, v in zip(SENSOR_CHANNELS, values)}
+
+
+# -----------------------
+# Background poller
+# -----------------------
+class SensorPoller:
+    # one asyncio task per device, never a thread; reads go through the
+    # DeviceFleet so breakers and per-board concurrency limits apply
+    def __init__(self, fleet, interval=0.5, capacity=256):
+        self.fleet = fleet
+        self.interval = interval
+        self.capacity = capacity
+        self.buffers = {}
+        self.last_error = {}
+        # called as listener(device_id, ts, values) after every stored batch,
+        # ts shaped (n,) and values (n, len(SENSOR_CHANNELS))
+        self.listeners = []
+        self._tasks = {}
+        self._started = False
+        for device_id in fleet:
+            self.add(device_id)
+
+    def add(self, device_id):
+        self.buffers.setdefault(device_id, ReadingRing(self.capacity))
+        if self._started and device_id not in self._tasks:
+            self._tasks[device_id] = asyncio.create_task(self._poll(device_id))
+
+    async def remove(self, device_id):
+        task = self._tasks.pop(device_id, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.buffers.pop(device_id, None)
+        self.last_error.pop(device_id, None)
+
+    def start(self):
+        if self.interval <= 0:
+            return
+        self._started = True
+        for device_id in self.buffers:
+            self.add(device_id)
+
+    async def stop(self):
+        self._started = False
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = {}
+
+    def record(self, device_id, reading):
+        # every stored reading, polled or read live, goes through here
+        values = np.array([[reading[ch] for ch in SENSOR_CHANNELS]], dtype=float)
+        if not np.all(np.isfinite(values)):
+            raise ValueError(f"non-numeric reading from {device_id}")
+        self.record_many(device_id, np.array([time.time()]), values)
+
+    def record_many(self, device_id, ts, values):
+        self.buffers[device_id].extend(ts, values)
+        for listener in self.listeners:
+            listener(device_id, ts, values)
+
+    @property
+    def running(self):
+        return self._started
+
+    async def _poll(self, device_id):
+        loop = asyncio.get_running_loop()
+        # spread the first reads so a large fleet does not poll in lockstep
+        next_at = loop.time() + random.uniform(0, self.interval)
+        while True:
+            await asyncio.sleep(next_at - loop.time())
+            try:
+                reading = await self.fleet.read(device_id)
+                self.record(device_id, reading)
+                self.last_error.pop(device_id, None)
+            except (DeviceError, KeyError, TypeError, ValueError) as e:
+                if device_id not in self.last_error:
+                    logger.warning("polling %s failed: %s", device_id, e)
+                self.last_error[device_id] = str(e)
+            # fixed rate, but never try to catch up on missed ticks
+            next_at = max(next_at + self.interval, loop.time())
@@ -1,120 +1,697 @@
-from fastapi import FastAPI
-import requests
-import joblib
-import numpy as np
-import pandas as pd
-
-# -----------------------
-# Load models
-# -----------------------
-voting_model = joblib.load("voting_model.pkl")
-stacked_model = joblib.load("stacked_model.pkl")
-scaler = joblib.load("scaler.pkl")
-
-app = FastAPI()
-
-ESP32_IP = "http://172.25.90.172/read"  
-
-
-# -----------------------
-# Yellowness index logic
-# -----------------------
-def compute_yellowness(r, g, b, c):
-    rgb = np.array([[r, g, b]], dtype=float)
-    rgb_norm = rgb / max(c, 1e-6)
-
-    gray_world_avg = np.mean(rgb_norm, axis=0)
-    rgb_balanced = np.clip(rgb_norm / (gray_world_avg + 1e-6), 0, 1)
-
-    gamma = 2.2
-    rgb_linear = np.power(rgb_balanced, gamma)
-
-    M = np.array([
-        [0.4124564, 0.3575761, 0.1804375],
-        [0.2126729, 0.7151522, 0.0721750],
-        [0.0193339, 0.1191920, 0.9503041]
-    ])
-
-    xyz = rgb_linear @ M.T
-    X, Y, Z = xyz[0]
-
-    Cx, Cz = 1.2769, 1.0592
-    yi = 100 * (Cx * X - Cz * Z) / max(Y, 1e-6)
-
-    return yi
-
-
-# -----------------------
-# Prediction API
-# -----------------------
-@app.get("/predict")
-def predict(age: int, gender: str, height: float, weight: float):
-
-    # get ESP32 data
-    sensor = requests.get(ESP32_IP).json()
-
-    # BMI
-    h_m = height / 100
-    bmi = weight / (h_m * h_m)
-
-    # gender mapping
-    gender_val = 1.0 if gender.lower() == "male" else 0.0
-
-    # yellowness
-    yi = compute_yellowness(
-        sensor["r"],
-        sensor["g"],
-        sensor["b"],
-        1.0  # intensity already normalized in many cases
-    )
-
-    df = pd.DataFrame([{
-        "Age": age,
-        "Gender": gender_val,
-        "BodyTemp": sensor["bodyTemp"],
-        "LiverTemp": sensor["thermalMax"],
-        "GSR": sensor["gsr"],
-        "BMI": bmi,
-        "Yellowness Index": yi
-    }])
-
-    X = scaler.transform(df)
-
-    # Prefer using predicted probabilities to compute a meaningful confidence
-    try:
-        p_vote = voting_model.predict_proba(X)[0][1]
-    except Exception:
-        # fallback to deterministic prediction if predict_proba isn't available
-        p_vote = float(voting_model.predict(X)[0])
-
-    try:
-        p_stack = stacked_model.predict_proba(X)[0][1]
-    except Exception:
-        p_stack = float(stacked_model.predict(X)[0])
-
-    # Ensemble probability (average of model probabilities)
-    ensemble_prob = float((p_vote + p_stack) / 2)
-
-    pred = locals().get("pred", ensemble_prob * 10.0)
-    
-    if pred < 6.0:
-        risk = "Low"
-    elif pred < 7.8:
-        risk = "Medium"
-    else:
-        risk = "High"
-        
-    confidence = int(round(max(0.0, min(100.0, (pred / 10.0) * 100.0))))
-    
-
-    return {
-        "risk": risk,
-        "confidence": confidence,
-        "models": {
-            "Voting": int(round(p_vote)),
-            "Stacked": int(round(p_stack)),
-            "Voting_proba": float(p_vote),
-            "Stacked_proba": float(p_stack)
-        },
-        "sensor": sensor
-    }
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.exception_handlers import http_exception_handler
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+import numpy as np
+
+from acquisition import DeviceError, DeviceTimeout, SensorClient
+from analytics import Analytics
+from batcher import MicroBatcher
+from devices import DEVICES_FILE, CircuitOpen, DeviceFleet
+from features import FEATURE_COLUMNS
+from inference_pool import INFERENCE_WORKERS, InferencePool
+from metrics import REGISTRY, STAGE_SECONDS, RequestMetrics
+from model_registry import (
+    MODEL_DIR, ModelLoadError, ModelRegistry, load_bundle, manifest_version, warm_bundle
+)
+from prediction_cache import PredictionCache
+from rolling_stats import RollingStats, StabilityGate
+from sensor_buffer import SENSOR_CHANNELS, SensorPoller, reading_dict
+from store import TABLES, ColumnStore
+from streaming import STREAM_KEEPALIVE, StreamHub
+from telemetry import INGEST_MAX_BYTES, INGEST_UDP_PORT, FrameError, TelemetryIngest, start_udp
+
+# -----------------------
+# Load models
+# -----------------------
+# checksums and feature schema are validated before serving
+registry = ModelRegistry(warm_bundle(load_bundle(MODEL_DIR)))
+
+# >0: reload when MODEL_DIR/manifest.json announces a new version
+# (copy the artifacts in first, write the manifest last)
+MODEL_WATCH_INTERVAL = float(os.getenv("LIVERGUARD_MODEL_WATCH_INTERVAL", "0"))
+# admin endpoints stay disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("LIVERGUARD_ADMIN_TOKEN")
+
+logger = logging.getLogger("liverguard")
+
+prediction_cache = PredictionCache()
+
+# stations come from LIVERGUARD_DEVICES_FILE; this board is the fallback
+# when no file exists yet
+ESP32_IP = "http://172.25.90.172/read"  
+
+DEVICES = {"default": ESP32_IP}
+# station for requests that name none; unset or unknown falls back to
+# "default", then to the first configured board
+DEFAULT_DEVICE = os.getenv("LIVERGUARD_DEFAULT_DEVICE")
+# >0 with polling off: probe every board this often to keep breakers current
+HEALTH_INTERVAL = float(os.getenv("ESP32_HEALTH_INTERVAL", "30"))
+
+# background polling: 0 disables it and every /predict reads the board live
+# (the reading is still recorded for streams, stats and the store)
+POLL_INTERVAL = float(os.getenv("ESP32_POLL_INTERVAL", "0.5"))
+BUFFER_SIZE = int(os.getenv("ESP32_BUFFER_SIZE", "256"))
+MAX_STALENESS = float(os.getenv("ESP32_MAX_STALENESS", "2.0"))
+
+# optional worker processes for CPU-bound scoring (LIVERGUARD_INFERENCE_WORKERS)
+inference_pool = InferencePool(INFERENCE_WORKERS, model_dirs=[MODEL_DIR])
+
+sensor_client = SensorClient()
+fleet = DeviceFleet.load(sensor_client, DEVICES_FILE, defaults=DEVICES)
+poller = SensorPoller(fleet, interval=POLL_INTERVAL, capacity=BUFFER_SIZE)
+
+# rolling mean / variance / EMA / slope per device, updated with every reading
+signal_stats = {device_id: RollingStats() for device_id in fleet}
+stability_gate = StabilityGate()
+
+
+def update_signal(device_id, ts, values):
+    signal_stats[device_id].update_many(ts, values)
+
+
+poller.listeners.append(update_signal)
+
+# boards may also push batches of binary samples (POST /ingest or UDP)
+telemetry = TelemetryIngest(poller)
+
+# readings and predictions kept as Parquet when LIVERGUARD_STORE_DIR is set
+store = ColumnStore()
+
+
+def store_readings(device_id, ts, values):
+    store.append("readings", ts=ts, device_id=device_id,
+                 **{ch: values[:, i] for i, ch in enumerate(SENSOR_CHANNELS)})
+
+
+if store.enabled:
+    poller.listeners.append(store_readings)
+
+# time-bucketed sensor and model counters behind GET /analytics
+analytics = Analytics()
+
+
+def count_readings(device_id, ts, values):
+    analytics.record_readings(ts, values)
+
+
+poller.listeners.append(count_readings)
+
+
+async def check_devices():
+    while True:
+        await asyncio.sleep(HEALTH_INTERVAL)
+        await fleet.check_all()
+
+
+async def watch_models():
+    failed = None
+    while True:
+        await asyncio.sleep(MODEL_WATCH_INTERVAL)
+        version = manifest_version(MODEL_DIR)
+        if version in (None, failed, registry.active.version):
+            continue
+        try:
+            await asyncio.to_thread(registry.load, MODEL_DIR)
+        except Exception as e:
+            failed = version
+            logger.error("could not hot-reload model %s: %s", version, e)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    inference_pool.start()
+    await asyncio.to_thread(inference_pool.warm)
+    store.start()
+    poller.start()
+    batcher.start()
+    watcher = asyncio.create_task(watch_models()) if MODEL_WATCH_INTERVAL > 0 else None
+    # polled boards are health-checked by the poller itself
+    health = asyncio.create_task(check_devices()) if HEALTH_INTERVAL > 0 and not poller.running else None
+    udp = await start_udp(telemetry) if INGEST_UDP_PORT else None
+    yield
+    if udp is not None:
+        udp.close()
+    for task in (watcher, health):
+        if task is not None:
+            task.cancel()
+    await hub.stop()
+    await batcher.stop()
+    await poller.stop()
+    await sensor_client.aclose()
+    await asyncio.to_thread(inference_pool.stop)
+    await asyncio.to_thread(store.stop)
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(RequestMetrics)
+
+
+# -----------------------
+# Metrics (GET /metrics, Prometheus text format)
+# -----------------------
+FEATURES_STAGE = STAGE_SECONDS.labels("features")
+YELLOWNESS_STAGE = STAGE_SECONDS.labels("yellowness")
+POOL_STAGE = STAGE_SECONDS.labels("pool")
+ERRORS = REGISTRY.counter("liverguard_errors", "Errors returned to clients by exception type and status.",
+                          ["type", "status"])
+
+# cache, batcher and fleet already count; their values are read at scrape time
+for _name in ("hits", "misses", "evictions", "expirations"):
+    REGISTRY.callback(f"liverguard_prediction_cache_{_name}", f"Prediction cache {_name}.", "counter",
+                      lambda name=_name: getattr(prediction_cache, name))
+REGISTRY.callback("liverguard_prediction_cache_entries", "Rows held by the prediction cache.", "gauge",
+                  lambda: prediction_cache.stats()["entries"])
+REGISTRY.callback("liverguard_batcher_batches", "Micro-batches scored.", "counter", lambda: batcher.batches)
+REGISTRY.callback("liverguard_batcher_rows", "Rows scored through the micro-batcher.", "counter",
+                  lambda: batcher.rows)
+REGISTRY.callback("liverguard_devices_healthy", "Boards whose circuit is closed.", "gauge",
+                  lambda: fleet.info()["healthy"])
+
+
+@app.exception_handler(HTTPException)
+async def count_http_errors(request, exc):
+    ERRORS.labels("HTTPException", exc.status_code).inc()
+    return await http_exception_handler(request, exc)
+
+
+@app.exception_handler(Exception)
+async def count_unhandled_errors(request, exc):
+    ERRORS.labels(type(exc).__name__, 500).inc()
+    logger.exception("unhandled error on %s", request.url.path)
+    return JSONResponse(status_code=500, content={"detail": "Internal Server Error"})
+
+
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+# -----------------------
+# Yellowness index logic
+# -----------------------
+def compute_yellowness(r, g, b, c, bundle=None):
+    # single-reading wrapper around the batched path
+    bundle = bundle or registry.active
+    return float(bundle.yellowness([[r, g, b]], [c])[0])
+
+
+# -----------------------
+# Feature matrix + scoring
+# -----------------------
+class PatientReading(BaseModel):
+    age: int = Field(gt=0)
+    gender: str
+    # cm and kg; BMI divides by height, so zero or negative is a 422
+    height: float = Field(gt=0)
+    weight: float = Field(gt=0)
+    r: float
+    g: float
+    b: float
+    bodyTemp: float
+    thermalMax: float
+    gsr: float
+    c: float = 1.0  # intensity already normalized in many cases
+    device_id: Optional[str] = None  # station that took the reading, if known
+
+
+def build_features(records, bundle):
+    # one row per patient, columns in FEATURE_COLUMNS order
+    n = len(records)
+    X = np.empty((n, len(FEATURE_COLUMNS)), dtype=float)
+    rgb = np.empty((n, 3), dtype=float)
+    c = np.empty(n, dtype=float)
+    with FEATURES_STAGE.time():
+        for i, rec in enumerate(records):
+            X[i, 0] = rec.age
+            X[i, 1] = 1.0 if rec.gender.lower() == "male" else 0.0
+            X[i, 2] = rec.bodyTemp
+            X[i, 3] = rec.thermalMax
+            X[i, 4] = rec.gsr
+            h_m = rec.height / 100
+            X[i, 5] = rec.weight / (h_m * h_m)
+            rgb[i] = (rec.r, rec.g, rec.b)
+            c[i] = rec.c
+    with YELLOWNESS_STAGE.time():
+        bundle.yellowness(rgb, c, out=X[:, 6])
+    return X
+
+
+def score_features(records, bundle):
+    # one model version serves the whole call; feature code is per-version too
+    features = build_features(records, bundle)
+    if not prediction_cache.enabled:
+        p_vote, p_stack = score_rows(features, bundle)
+    else:
+        # only rows that miss the cache reach the models
+        keys = prediction_cache.keys(bundle.version, features)
+        p_vote, p_stack, missing = prediction_cache.get_many(keys)
+        if missing:
+            v, s = score_rows(features[missing], bundle)
+            p_vote[missing], p_stack[missing] = v, s
+            prediction_cache.put_many([keys[i] for i in missing], v, s)
+    record_predictions(records, bundle, features, p_vote, p_stack)
+    return p_vote, p_stack
+
+
+def record_predictions(records, bundle, features, p_vote, p_stack):
+    # cache hits count too: every row scored is one prediction served
+    now = time.time()
+    analytics.record_predictions(now, p_vote, p_stack)
+    if store.enabled:
+        store.append("predictions", ts=now, model_version=bundle.version,
+                     device_id=[rec.device_id or "" for rec in records],
+                     p_vote=p_vote, p_stack=p_stack,
+                     **{name: features[:, i] for i, name in enumerate(FEATURE_COLUMNS)})
+
+
+def score_rows(features, bundle):
+    t0 = time.perf_counter()
+    if inference_pool.enabled:
+        # stages inside worker processes are not visible here
+        with POOL_STAGE.time():
+            p_vote, p_stack = inference_pool.score(features, bundle)
+    else:
+        p_vote, p_stack = bundle.score(features)
+    registry.record(bundle.version, time.perf_counter() - t0, (p_vote + p_stack) / 2)
+    return p_vote, p_stack
+
+
+# concurrent /predict calls are scored together in micro-batches,
+# one batch in flight per worker process when the pool is on
+batcher = MicroBatcher(score_features, concurrency=max(1, INFERENCE_WORKERS))
+
+
+def risk_output(p_vote, p_stack):
+    # Ensemble probability (average of model probabilities)
+    ensemble_prob = float((p_vote + p_stack) / 2)
+    pred = ensemble_prob * 10.0
+
+    if pred < 6.0:
+        risk = "Low"
+    elif pred < 7.8:
+        risk = "Medium"
+    else:
+        risk = "High"
+
+    confidence = int(round(max(0.0, min(100.0, (pred / 10.0) * 100.0))))
+
+    return {
+        "risk": risk,
+        "confidence": confidence,
+        "models": {
+            "Voting": int(round(p_vote)),
+            "Stacked": int(round(p_stack)),
+            "Voting_proba": float(p_vote),
+            "Stacked_proba": float(p_stack)
+        }
+    }
+
+
+# -----------------------
+# Prediction API
+# -----------------------
+async def read_sensor(device_id):
+    try:
+        return await fleet.read(device_id)
+    except CircuitOpen as e:
+        raise HTTPException(status_code=503, detail=f"ESP32 unavailable: {e}")
+    except DeviceTimeout as e:
+        raise HTTPException(status_code=504, detail=f"ESP32 timeout: {e}")
+    except DeviceError as e:
+        raise HTTPException(status_code=502, detail=f"ESP32 error: {e}")
+
+
+def check_device(device_id):
+    if device_id not in poller.buffers:
+        raise HTTPException(status_code=404, detail=f"unknown device {device_id}")
+
+
+def resolve_device(device_id=None):
+    if device_id is None:
+        device_id = fleet.default(DEFAULT_DEVICE)
+        if device_id is None:
+            raise HTTPException(status_code=404, detail="no devices configured")
+    check_device(device_id)
+    return device_id
+
+
+async def acquire(device_id, samples=1):
+    # serve from the poller's buffer when it is fresh enough, otherwise
+    # fall back to a live read of the board. Without polling the buffer only
+    # holds earlier requests' reads, so every call reads the board
+    check_device(device_id)
+    buffer = poller.buffers[device_id]
+    latest = buffer.average(samples, max_age=MAX_STALENESS) if poller.running else None
+    if latest is not None:
+        ts, values, n = latest
+        return reading_dict(values), {"source": "buffer", "samples": n, "age": round(time.time() - ts, 3)}
+
+    sensor = await read_sensor(device_id)
+    try:
+        poller.record(device_id, sensor)
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=502, detail="ESP32 error: malformed reading")
+    return reading_dict(buffer.last(1)[1][0]), {"source": "live", "samples": 1, "age": 0.0}
+
+
+def signal_check(device_id):
+    stats = signal_stats[device_id]
+    check = stability_gate.check(stats)
+    age = time.time() - stats.last_ts if stats.count else None
+    if age is None or age > MAX_STALENESS:
+        # the window froze because the board stopped answering
+        check["stable"] = False
+    check["age"] = None if age is None else round(age, 3)
+    return check
+
+
+async def acquire_stable(device_id, wait=10.0):
+    # score one converged measurement instead of a single noisy sample:
+    # wait until every channel's rolling std and slope are within limits
+    check_device(device_id)
+    if not poller.running:
+        raise HTTPException(status_code=503, detail="stable mode needs background polling (ESP32_POLL_INTERVAL > 0)")
+    deadline = time.monotonic() + wait
+    while True:
+        check = signal_check(device_id)
+        if check["stable"]:
+            break
+        if time.monotonic() >= deadline:
+            raise HTTPException(status_code=409, detail=dict(check, message="sensor signal not stable"))
+        await asyncio.sleep(POLL_INTERVAL)
+    stats = signal_stats[device_id]
+    return reading_dict(stats.mean), {"source": "rolling", "samples": stats.count, "age": check["age"],
+                                      "stability": check}
+
+
+@app.get("/predict")
+async def predict(age: int = Query(gt=0), gender: str = Query(), height: float = Query(gt=0),
+                  weight: float = Query(gt=0), samples: int = 1, stable: bool = False, wait: float = 10.0,
+                  device_id: Optional[str] = None):
+    device_id = resolve_device(device_id)
+
+    # get ESP32 data; averaging the last N buffered samples costs no device I/O
+    if stable:
+        sensor, acquisition = await acquire_stable(device_id, max(0.0, wait))
+    else:
+        sensor, acquisition = await acquire(device_id, max(1, samples))
+
+    reading = PatientReading(age=age, gender=gender, height=height, weight=weight,
+                             device_id=device_id, **sensor)
+
+    bundle = registry.route()
+    p_vote, p_stack = await batcher.score(reading, bundle)
+
+    result = risk_output(p_vote, p_stack)
+    result["model_version"] = bundle.version
+    result["device_id"] = device_id
+    result["sensor"] = sensor
+    result["acquisition"] = acquisition
+    return result
+
+
+@app.post("/predict/batch")
+def predict_batch(records: List[PatientReading]):
+    # screening camps upload many readings at once; build one matrix
+    # so the DataFrame/sklearn validation cost is paid once per batch
+    if not records:
+        return {"count": 0, "results": []}
+
+    bundle = registry.route()
+    p_vote, p_stack = score_features(records, bundle)
+
+    return {
+        "count": len(records),
+        "model_version": bundle.version,
+        "results": [risk_output(v, s) for v, s in zip(p_vote, p_stack)]
+    }
+
+
+# -----------------------
+# Live streaming (SSE / WebSocket)
+# -----------------------
+async def stream_frame(device_id, patient):
+    # latest reading + its YI, and a score over the rolling window once stable
+    ts, values = poller.buffers[device_id].last(1)
+    sensor = reading_dict(values[0])
+    bundle = registry.route()
+    frame = {
+        "device_id": device_id,
+        "ts": float(ts[0]),
+        "model_version": bundle.version,
+        "sensor": sensor,
+        "yellowness": compute_yellowness(sensor["r"], sensor["g"], sensor["b"], 1.0, bundle)
+    }
+    check = signal_check(device_id)
+    frame["stable"] = check["stable"]
+    frame["unstable"] = check["unstable"]
+    # only a converged signal is worth an inference call
+    if patient is not None and check["stable"]:
+        age, gender, height, weight = patient
+        reading = PatientReading(age=age, gender=gender, height=height, weight=weight,
+                                 device_id=device_id, **reading_dict(signal_stats[device_id].mean))
+        p_vote, p_stack = await batcher.score(reading, bundle)
+        frame["score"] = risk_output(p_vote, p_stack)
+        frame["window"] = check["samples"]
+    return frame
+
+
+# one fan-out per device, fed by the poller; clients never poll the board
+hub = StreamHub(poller, stream_frame)
+
+
+def open_stream(device_id, age, gender, height, weight):
+    check_device(device_id)
+    if not poller.running:
+        raise HTTPException(status_code=503, detail="streaming needs background polling (ESP32_POLL_INTERVAL > 0)")
+    fields = (age, gender, height, weight)
+    if all(f is None for f in fields):
+        return hub.subscribe(device_id)
+    if any(f is None for f in fields):
+        raise HTTPException(status_code=400, detail="scoring needs age, gender, height and weight")
+    return hub.subscribe(device_id, (age, gender, height, weight))
+
+
+@app.get("/stream/{device_id}")
+async def stream_sse(device_id: str, age: Optional[int] = Query(None, gt=0), gender: Optional[str] = None,
+                     height: Optional[float] = Query(None, gt=0), weight: Optional[float] = Query(None, gt=0)):
+    sub = open_stream(device_id, age, gender, height, weight)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    frame = await sub.next(STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {json.dumps(frame)}\n\n"
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+
+@app.websocket("/ws/{device_id}")
+async def stream_ws(websocket: WebSocket, device_id: str, age: Optional[int] = Query(None, gt=0),
+                    gender: Optional[str] = None, height: Optional[float] = Query(None, gt=0),
+                    weight: Optional[float] = Query(None, gt=0)):
+    try:
+        sub = open_stream(device_id, age, gender, height, weight)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                frame = await sub.next(STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                frame = {"keepalive": True}
+            await websocket.send_json(frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        hub.unsubscribe(sub)
+
+
+@app.post("/ingest")
+async def ingest_packet(request: Request):
+    # application/octet-stream body in the telemetry.py frame layout; the
+    # size limit is enforced while reading, not after the body is in memory
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > INGEST_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"packet larger than {INGEST_MAX_BYTES} bytes")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > INGEST_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"packet larger than {INGEST_MAX_BYTES} bytes")
+    try:
+        accepted, rejected = telemetry.ingest(bytes(body))
+    except FrameError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"accepted": accepted, "rejected": rejected}
+
+
+@app.get("/ingest")
+def ingest_stats():
+    return telemetry.stats()
+
+
+@app.get("/signal/{device_id}")
+def signal_status(device_id: str):
+    check_device(device_id)
+    return signal_check(device_id)
+
+
+@app.get("/streams")
+def stream_stats():
+    return hub.stats()
+
+
+@app.get("/analytics")
+def analytics_summary(window: Optional[float] = None):
+    # pre-aggregated buckets: cost depends on the bucket count, not on history
+    if window is not None and window <= 0:
+        raise HTTPException(status_code=400, detail="window must be positive")
+    return analytics.summary(time.time(), window)
+
+
+# -----------------------
+# Columnar store
+# -----------------------
+@app.get("/store")
+def store_stats():
+    return store.stats()
+
+
+@app.get("/store/{table}")
+def store_query(table: str, device_id: Optional[str] = None, start: Optional[float] = None,
+                end: Optional[float] = None, limit: int = 1000):
+    # rows with start <= ts < end (unix seconds), the newest `limit` of them
+    if table not in TABLES:
+        raise HTTPException(status_code=404, detail=f"unknown table {table}")
+    if not store.enabled:
+        raise HTTPException(status_code=503, detail="store disabled (set LIVERGUARD_STORE_DIR, needs pyarrow)")
+    rows = store.query(table, start=start, end=end, device_id=device_id, limit=max(1, limit))
+    return {"table": table, "count": len(rows), "rows": rows.to_pylist()}
+
+
+# -----------------------
+# Model versions / admin
+# -----------------------
+def check_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN or x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="admin token required")
+
+
+def check_share(share):
+    if share is not None and not 0.0 <= share <= 1.0:
+        raise HTTPException(status_code=400, detail="share must be between 0 and 1")
+
+
+@app.get("/models")
+def models():
+    return registry.info()
+
+
+@app.get("/batching")
+def batching_stats():
+    return dict(batcher.stats(), pool=inference_pool.stats())
+
+
+@app.get("/cache")
+def cache_stats():
+    return prediction_cache.stats()
+
+
+@app.delete("/admin/cache", dependencies=[Depends(check_admin)])
+def admin_clear_cache():
+    prediction_cache.clear()
+    return prediction_cache.stats()
+
+
+@app.post("/admin/models/load", dependencies=[Depends(check_admin)])
+async def admin_load_model(model_dir: str, role: str = "active", share: Optional[float] = None):
+    # load + warm off the event loop, then swap; traffic keeps flowing meanwhile
+    if role not in ("active", "candidate"):
+        raise HTTPException(status_code=400, detail="role must be 'active' or 'candidate'")
+    check_share(share)
+    try:
+        await asyncio.to_thread(registry.load, model_dir, role, share)
+    except (ModelLoadError, OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"could not load {model_dir}: {e}")
+    return registry.info()
+
+
+@app.post("/admin/models/share", dependencies=[Depends(check_admin)])
+def admin_candidate_share(share: float):
+    check_share(share)
+    registry.candidate_share = share
+    return registry.info()
+
+
+@app.post("/admin/models/promote", dependencies=[Depends(check_admin)])
+def admin_promote_candidate():
+    try:
+        registry.promote()
+    except ModelLoadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return registry.info()
+
+
+@app.delete("/admin/models/candidate", dependencies=[Depends(check_admin)])
+def admin_drop_candidate():
+    registry.drop_candidate()
+    return registry.info()
+
+
+# -----------------------
+# Device fleet
+# -----------------------
+@app.get("/devices")
+def devices():
+    return dict(fleet.info(), polling=poller.running, default=fleet.default(DEFAULT_DEVICE))
+
+
+@app.get("/devices/{device_id}")
+def device_status(device_id: str):
+    check_device(device_id)
+    return dict(fleet.devices[device_id].info(), polling_error=poller.last_error.get(device_id))
+
+
+@app.put("/admin/devices/{device_id}", dependencies=[Depends(check_admin)])
+async def admin_put_device(device_id: str, url: str, max_concurrency: Optional[int] = None):
+    # add a station or repoint it; the change is written back to the devices file
+    kwargs = {} if max_concurrency is None else {"max_concurrency": max_concurrency}
+    try:
+        fleet.add(device_id, url, **kwargs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # restart polling against the new endpoint with fresh buffers
+    await poller.remove(device_id)
+    signal_stats[device_id] = RollingStats()
+    poller.add(device_id)
+    fleet.save()
+    return fleet.devices[device_id].info()
+
+
+@app.delete("/admin/devices/{device_id}", dependencies=[Depends(check_admin)])
+async def admin_delete_device(device_id: str):
+    check_device(device_id)
+    await poller.remove(device_id)
+    fleet.remove(device_id)
+    signal_stats.pop(device_id, None)
+    fleet.save()
+    return fleet.info()
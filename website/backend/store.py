@@ -0,0 +1,249 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from features import FEATURE_COLUMNS
+from sensor_buffer import SENSOR_CHANNELS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional: the store stays off without pyarrow
+    pa = None
+
+logger = logging.getLogger("liverguard.store")
+
+# -----------------------
+# Columnar store settings
+# -----------------------
+# empty disables the store; otherwise Parquet files land under this directory
+STORE_DIR = os.getenv("LIVERGUARD_STORE_DIR", "")
+STORE_FLUSH_INTERVAL = float(os.getenv("LIVERGUARD_STORE_FLUSH_INTERVAL", "5.0"))  # seconds
+STORE_FLUSH_ROWS = int(os.getenv("LIVERGUARD_STORE_FLUSH_ROWS", "50000"))
+# appends beyond this many pending rows are dropped rather than growing memory
+STORE_MAX_PENDING = int(os.getenv("LIVERGUARD_STORE_MAX_PENDING", "1000000"))
+# small row groups keep single-device range reads from decoding whole files
+ROW_GROUP_ROWS = 16384
+
+# column name -> numpy dtype. Raw sensor channels fit f4; the model's
+# features and scores are stored at full precision so a row replays
+# through the models exactly (files written with f4 are read as f8)
+TABLES = {
+    "readings": dict(
+        [("ts", "f8"), ("device_id", "U")] + [(ch, "f4") for ch in SENSOR_CHANNELS]
+    ),
+    "predictions": dict(
+        [("ts", "f8"), ("device_id", "U"), ("model_version", "U")]
+        + [(name, "f8") for name in FEATURE_COLUMNS]
+        + [("p_vote", "f8"), ("p_stack", "f8")]
+    )
+}
+
+
+if pa is not None:
+    PARTITION_FIELDS = [("date", pa.string()), ("hour", pa.int32())]
+    PARTITIONING = ds.partitioning(pa.schema(PARTITION_FIELDS), flavor="hive")
+
+
+def table_schema(table):
+    # the current column types plus the hive partition keys; scanning with
+    # it casts files written under an older dtype instead of failing
+    return pa.schema(
+        [(name, pa.string() if dtype == "U" else pa.from_numpy_dtype(np.dtype(dtype)))
+         for name, dtype in TABLES[table].items()] + PARTITION_FIELDS
+    )
+
+
+def hour_partition(ts):
+    # hive-style directory for the UTC hour of a unix timestamp
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("date=%Y-%m-%d/hour=%H")
+
+
+class ColumnStore:
+    # Append-only Parquet tables, partitioned by UTC hour. Appends only copy
+    # arrays into an in-memory list; a background thread turns them into
+    # Parquet files, so requests never wait on the disk.
+    def __init__(self, root=STORE_DIR, flush_interval=STORE_FLUSH_INTERVAL,
+                 flush_rows=STORE_FLUSH_ROWS, max_pending=STORE_MAX_PENDING):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.max_pending = max_pending
+        self.enabled = bool(root) and pa is not None
+        if root and pa is None:
+            logger.warning("LIVERGUARD_STORE_DIR is set but pyarrow is not installed; store disabled")
+        self._pending = {name: [] for name in TABLES}
+        self._pending_rows = {name: 0 for name in TABLES}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._seq = 0
+        self.written = {name: 0 for name in TABLES}
+        self.dropped = {name: 0 for name in TABLES}
+        self.files = 0
+
+    # -------- writing --------
+    def append(self, table, **columns):
+        # columns: equal-length arrays, or scalars repeated over the batch
+        if not self.enabled:
+            return
+        n = max(np.size(v) for v in columns.values())
+        batch = {}
+        for name, dtype in TABLES[table].items():
+            value = columns.get(name)
+            if dtype == "U":
+                value = np.broadcast_to(np.asarray("" if value is None else value, dtype=object), n)
+            else:
+                value = np.broadcast_to(np.asarray(np.nan if value is None else value, dtype=dtype), n)
+            batch[name] = np.array(value)
+        with self._lock:
+            if self._pending_rows[table] + n > self.max_pending:
+                self.dropped[table] += n
+                return
+            self._pending[table].append(batch)
+            self._pending_rows[table] += n
+            full = self._pending_rows[table] >= self.flush_rows
+        if full:
+            self._wake.set()
+
+    def _take(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = {name: [] for name in TABLES}
+            self._pending_rows = {name: 0 for name in TABLES}
+        return pending
+
+    def flush(self):
+        for table, batches in self._take().items():
+            if batches:
+                self._write(table, batches)
+
+    def _to_arrow(self, table, batches):
+        arrays = {}
+        for name, dtype in TABLES[table].items():
+            column = np.concatenate([b[name] for b in batches]) if batches else \
+                np.array([], dtype=object if dtype == "U" else dtype)
+            if dtype == "U":
+                arrays[name] = pa.array(column, type=pa.string())
+            else:
+                arrays[name] = pa.array(column)
+        return pa.table(arrays)
+
+    def _write(self, table, batches):
+        data = self._to_arrow(table, batches)
+        ts = data.column("ts").to_numpy()
+        hours = np.floor(ts / 3600).astype(np.int64)
+        # device-major inside each hour file: row-group min/max on device_id
+        # then lets single-device queries skip most of the file
+        devices = np.concatenate([b["device_id"] for b in batches]).astype(str)
+        order = np.lexsort((ts, devices, hours))
+        bounds = np.flatnonzero(np.diff(hours[order])) + 1
+        for rows in np.split(order, bounds):
+            part = os.path.join(self.root, table, hour_partition(ts[rows[0]]))
+            os.makedirs(part, exist_ok=True)
+            self._seq += 1
+            name = f"part-{int(time.time() * 1000)}-{os.getpid()}-{self._seq}.parquet"
+            tmp = os.path.join(part, "." + name)
+            pq.write_table(data.take(pa.array(rows)), tmp, compression="zstd", row_group_size=ROW_GROUP_ROWS)
+            # readers never see half-written files
+            os.replace(tmp, os.path.join(part, name))
+            self.files += 1
+        self.written[table] += len(ts)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stopping
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("store flush failed")
+            if stopping:
+                return
+
+    def start(self):
+        if self.enabled and self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="store-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        # the writer thread does a final flush before it exits
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+
+    # -------- reading --------
+    def query(self, table, start=None, end=None, device_id=None, columns=None, limit=None):
+        # rows with start <= ts < end (unix seconds), newest last; pending
+        # rows that are not flushed yet are included
+        if not self.enabled:
+            raise RuntimeError("store is disabled")
+        columns = list(columns or TABLES[table])
+        expr = None
+        for cond in (
+            None if start is None else pc.field("ts") >= start,
+            None if end is None else pc.field("ts") < end,
+            None if device_id is None else pc.field("device_id") == device_id
+        ):
+            if cond is not None:
+                expr = cond if expr is None else expr & cond
+
+        parts = []
+        path = os.path.join(self.root, table)
+        if os.path.isdir(path):
+            dataset = ds.dataset(path, schema=table_schema(table), format="parquet", partitioning=PARTITIONING,
+                                 exclude_invalid_files=True)
+            # skip hour directories outside the range before opening any file
+            hours = None
+            if start is not None:
+                day, hour = _hour(start)
+                hours = (pc.field("date") > day) | ((pc.field("date") == day) & (pc.field("hour") >= hour))
+            if end is not None:
+                day, hour = _hour(end)
+                cond = (pc.field("date") < day) | ((pc.field("date") == day) & (pc.field("hour") <= hour))
+                hours = cond if hours is None else hours & cond
+            full = expr if hours is None else (hours if expr is None else hours & expr)
+            parts.append(dataset.to_table(columns=columns, filter=full))
+
+        with self._lock:
+            pending = list(self._pending[table])
+        if pending:
+            recent = self._to_arrow(table, pending).select(columns)
+            parts.append(recent if expr is None else recent.filter(expr))
+
+        if not parts:
+            return self._to_arrow(table, []).select(columns)
+        result = pa.concat_tables(parts) if len(parts) > 1 else parts[0]
+        if "ts" in columns:
+            result = result.sort_by("ts")
+        if limit is not None and len(result) > limit:
+            result = result.slice(len(result) - limit)
+        return result
+
+    def stats(self):
+        with self._lock:
+            pending = dict(self._pending_rows)
+        return {
+            "enabled": self.enabled,
+            "root": self.root or None,
+            "pending_rows": pending,
+            "written_rows": dict(self.written),
+            "dropped_rows": dict(self.dropped),
+            "files": self.files
+        }
+
+
+def _hour(ts):
+    t = datetime.fromtimestamp(ts, tz=timezone.utc)
+    return t.strftime("%Y-%m-%d"), t.hour
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger("liverguard.stream")
+
+# -----------------------
+# Streaming settings
+# -----------------------
+# frames buffered per subscriber; a slow client loses the oldest ones
+STREAM_QUEUE_SIZE = int(os.getenv("LIVERGUARD_STREAM_QUEUE_SIZE", "8"))
+# seconds between keep-alive comments on an idle SSE connection
+STREAM_KEEPALIVE = float(os.getenv("LIVERGUARD_STREAM_KEEPALIVE", "15"))
+
+
+class Subscription:
+    def __init__(self, device_id, patient, queue_size):
+        self.device_id = device_id
+        self.patient = patient  # None or (age, gender, height, weight)
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, frame):
+        # never block the fan-out: drop the oldest frame to make room
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(frame)
+
+    async def next(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class StreamHub:
+    # One fan-out task per watched device, woken by the SensorPoller after
+    # every stored reading; the poller stays the only thing talking to the
+    # board. make_frame(device_id, patient) -> dict is awaited once per
+    # distinct patient per reading, however many clients share it.
+    def __init__(self, poller, make_frame, queue_size=STREAM_QUEUE_SIZE):
+        self.poller = poller
+        self.make_frame = make_frame
+        self.queue_size = queue_size
+        self.frames = 0
+        self._subscribers = {}  # device_id -> set of Subscription
+        self._events = {}
+        self._tasks = {}
+        poller.listeners.append(self._on_reading)
+
+    def _on_reading(self, device_id, ts, values):
+        event = self._events.get(device_id)
+        if event is not None:
+            event.set()
+
+    def subscribe(self, device_id, patient=None):
+        sub = Subscription(device_id, patient, self.queue_size)
+        self._subscribers.setdefault(device_id, set()).add(sub)
+        if device_id not in self._tasks:
+            self._events[device_id] = asyncio.Event()
+            self._tasks[device_id] = asyncio.create_task(self._fan_out(device_id))
+        return sub
+
+    def unsubscribe(self, sub):
+        subs = self._subscribers.get(sub.device_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            # last viewer left; stop fanning out for this device
+            del self._subscribers[sub.device_id]
+            del self._events[sub.device_id]
+            self._tasks.pop(sub.device_id).cancel()
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._events.clear()
+        self._subscribers.clear()
+
+    async def _fan_out(self, device_id):
+        event = self._events[device_id]
+        while True:
+            await event.wait()
+            event.clear()
+            subs = list(self._subscribers.get(device_id, ()))
+            groups = {}
+            for sub in subs:
+                groups.setdefault(sub.patient, []).append(sub)
+            for patient, members in groups.items():
+                try:
+                    frame = await self.make_frame(device_id, patient)
+                except Exception as e:
+                    logger.warning("stream frame for %s failed: %s", device_id, e)
+                    frame = {"device_id": device_id, "error": str(e)}
+                self.frames += 1
+                for sub in members:
+                    sub.offer(dict(frame, dropped=sub.dropped))
+
+    def stats(self):
+        return {
+            "queue_size": self.queue_size,
+            "frames": self.frames,
+            "devices": {
+                device_id: {
+                    "subscribers": len(subs),
+                    "dropped": sum(sub.dropped for sub in subs)
+                }
+                for device_id, subs in self._subscribers.items()
+            }
+        }
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+import time
+import zlib
+
+import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
+
+from sensor_buffer import SENSOR_CHANNELS
+
+logger = logging.getLogger("liverguard.telemetry")
+
+# -----------------------
+# Binary telemetry frames
+# -----------------------
+# packet = header + count samples, little-endian, no padding:
+#   header  magic "LGT" | version u8 | count u32
+#   sample  device u32 (crc32 of the station id) | ts f64 (unix s, 0 = on arrival)
+#           | r g b bodyTemp thermalMax gsr as f32
+# 36 bytes per sample; a 1400-byte UDP payload carries 38 samples.
+MAGIC = b"LGT"
+VERSION = 1
+HEADER_DTYPE = np.dtype([("magic", "S3"), ("version", "u1"), ("count", "<u4")])
+SAMPLE_DTYPE = np.dtype(
+    [("device", "<u4"), ("ts", "<f8")] + [(ch, "<f4") for ch in SENSOR_CHANNELS]
+)
+
+# 0 disables the UDP listener; POST /ingest is always available
+INGEST_UDP_PORT = int(os.getenv("LIVERGUARD_INGEST_UDP_PORT", "0"))
+INGEST_UDP_HOST = os.getenv("LIVERGUARD_INGEST_UDP_HOST", "0.0.0.0")
+INGEST_MAX_BYTES = int(os.getenv("LIVERGUARD_INGEST_MAX_BYTES", str(1 << 20)))
+
+
+class FrameError(ValueError):
+    pass
+
+
+def device_key(device_id):
+    return zlib.crc32(device_id.encode())
+
+
+def encode_packet(keys, ts, values):
+    # boards and tests: (n,) device keys, (n,) timestamps, (n, 6) channels
+    samples = np.zeros(len(ts), dtype=SAMPLE_DTYPE)
+    samples["device"] = keys
+    samples["ts"] = ts
+    values = np.asarray(values, dtype=np.float32)
+    for i, ch in enumerate(SENSOR_CHANNELS):
+        samples[ch] = values[:, i]
+    header = np.array([(MAGIC, VERSION, len(samples))], dtype=HEADER_DTYPE)
+    return header.tobytes() + samples.tobytes()
+
+
+def decode_packet(data):
+    # -> structured array viewing the packet bytes; no per-field objects
+    if len(data) < HEADER_DTYPE.itemsize:
+        raise FrameError("packet shorter than its header")
+    if len(data) > INGEST_MAX_BYTES:
+        raise FrameError(f"packet larger than {INGEST_MAX_BYTES} bytes")
+    header = np.frombuffer(data, dtype=HEADER_DTYPE, count=1)[0]
+    if header["magic"] != MAGIC or header["version"] != VERSION:
+        raise FrameError("not a LiverGuard telemetry packet")
+    count = int(header["count"])
+    if len(data) != HEADER_DTYPE.itemsize + count * SAMPLE_DTYPE.itemsize:
+        raise FrameError(f"header announces {count} samples but the body length does not match")
+    return np.frombuffer(data, dtype=SAMPLE_DTYPE, count=count, offset=HEADER_DTYPE.itemsize)
+
+
+class TelemetryIngest:
+    # Decodes packets and hands each device's samples to the poller as one
+    # batch, so buffers, rolling stats and streams see them like polled data.
+    def __init__(self, poller):
+        self.poller = poller
+        self.packets = 0
+        self.samples = 0
+        self.rejected = 0
+        self.bad_packets = 0
+        self._fleet = None
+        self._keys = None
+        self._ids = None
+
+    def _devices(self):
+        # sorted crc32 keys and matching station ids, rebuilt when the fleet changes
+        fleet = tuple(self.poller.buffers)
+        if fleet != self._fleet:
+            keys = np.array([device_key(device_id) for device_id in fleet], dtype=np.uint32)
+            order = np.argsort(keys)
+            self._fleet, self._keys, self._ids = fleet, keys[order], [fleet[i] for i in order]
+        return self._keys, self._ids
+
+    def ingest(self, data):
+        try:
+            samples = decode_packet(data)
+        except FrameError:
+            self.bad_packets += 1
+            raise
+        self.packets += 1
+        keys, ids = self._devices()
+        if not len(keys):
+            self.rejected += len(samples)
+            return 0, len(samples)
+
+        slot = np.minimum(np.searchsorted(keys, samples["device"]), len(keys) - 1)
+        values = structured_to_unstructured(samples[list(SENSOR_CHANNELS)], dtype=float)
+        ts = samples["ts"].astype(float)
+        finite = np.isfinite(ts)
+        known = (keys[slot] == samples["device"]) & np.all(np.isfinite(values), axis=1) & finite
+        # a board clock ahead of ours would sort past every later reading,
+        # look fresh forever and land in a future hour partition
+        now = time.time()
+        ts[finite & (ts <= 0)] = now
+        np.minimum(ts, now, out=ts)
+
+        # one batch per device, each in time order
+        rows = np.flatnonzero(known)
+        rows = rows[np.lexsort((ts[rows], slot[rows]))]
+        bounds = np.flatnonzero(np.diff(slot[rows])) + 1
+        for chunk in np.split(rows, bounds) if len(rows) else ():
+            self.poller.record_many(ids[slot[chunk[0]]], ts[chunk], values[chunk])
+        accepted = len(rows)
+
+        self.samples += accepted
+        self.rejected += len(samples) - accepted
+        return accepted, len(samples) - accepted
+
+    def stats(self):
+        return {
+            "packets": self.packets,
+            "samples": self.samples,
+            "rejected": self.rejected,
+            "bad_packets": self.bad_packets,
+            "udp_port": INGEST_UDP_PORT or None
+        }
+
+
+class UDPIngest(asyncio.DatagramProtocol):
+    def __init__(self, ingest):
+        self.ingest = ingest
+
+    def datagram_received(self, data, addr):
+        try:
+            self.ingest.ingest(data)
+        except FrameError as e:
+            logger.debug("dropped packet from %s: %s", addr, e)
+
+
+async def start_udp(ingest, host=INGEST_UDP_HOST, port=INGEST_UDP_PORT):
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: UDPIngest(ingest), local_addr=(host, port))
+    return transport
@@ -6,8 +6,10 @@ import plotly.express as px
 from datetime import datetime, timedelta
 import pickle
 from pathlib import Path
+import os
 import requests
 import time
+import json
 if "page" not in st.session_state:
     st.session_state.page = "🏠 Home"
 
@@ -502,6 +504,73 @@ def show_home():
         """, unsafe_allow_html=True)
 
 
+# station to stream from; unset uses the backend's default board
+DEVICE_ID = os.getenv("LIVERGUARD_DEVICE_ID")
+
+
+def stream_device():
+    if DEVICE_ID:
+        return DEVICE_ID
+    res = requests.get("http://127.0.0.1:8000/devices", timeout=10)
+    res.raise_for_status()
+    device_id = res.json().get("default")
+    if device_id is None:
+        raise RuntimeError("no devices configured on the backend")
+    return device_id
+
+
+def show_live_stream(age, gender, height, weight, seconds):
+    st.markdown("---")
+    st.markdown("## 📡 Live Sensor Stream")
+
+    params = {
+        "age": int(age),
+        "gender": "Male" if str(gender).lower().startswith("m") else "Female",
+        "height": float(height),
+        "weight": float(weight)
+    }
+    status = st.empty()
+    metrics = st.empty()
+    chart = st.empty()
+    history = []
+
+    try:
+        # server-sent events: one "data: {...}" line per new reading
+        with requests.get(f"http://127.0.0.1:8000/stream/{stream_device()}", params=params,
+                          stream=True, timeout=10) as res:
+            res.raise_for_status()
+            end = time.time() + seconds
+            for line in res.iter_lines(decode_unicode=True):
+                if time.time() > end:
+                    break
+                if not line or not line.startswith("data:"):
+                    continue
+                frame = json.loads(line[5:])
+                if "error" in frame:
+                    status.warning(f"⚠️ {frame['error']}")
+                    continue
+
+                score = frame.get("score")
+                if score is None:
+                    status.info("Waiting for a stable reading...")
+                    continue
+                status.success(f"🟢 Streaming · model {frame.get('model_version', '?')} · dropped frames: {frame.get('dropped', 0)}")
+
+                with metrics.container():
+                    c1, c2, c3 = st.columns(3)
+                    c1.metric("Risk", score["risk"])
+                    c2.metric("Confidence", f"{score['confidence']}%")
+                    c3.metric("Yellowness Index", f"{frame['yellowness']:.3f}")
+
+                history.append({
+                    "time": datetime.fromtimestamp(frame["ts"]),
+                    "Ensemble probability": (score["models"]["Voting_proba"] + score["models"]["Stacked_proba"]) / 2
+                })
+                chart.line_chart(pd.DataFrame(history[-200:]).set_index("time"))
+    except Exception as e:
+        st.error(f"🔴 Live stream unavailable: {e}")
+
+
 def show_live_detection():
     st.markdown('<h1 class="main-header">Live Detection</h1>', unsafe_allow_html=True)
 
@@ -519,6 +588,11 @@ def show_live_detection():
 
             submit_button = st.form_submit_button("🔬 Run Detection", use_container_width=True)
 
+        # continuous feed while the patient stays on the sensor
+        with st.expander("📡 Live Stream"):
+            stream_seconds = st.slider("Duration (s)", 5, 120, 30)
+            stream_button = st.button("▶️ Start Live Stream", use_container_width=True)
+
     # ================= RIGHT SIDE =================
     with col2:
         st.markdown('<h3 style="font-family: Orbitron; color: #00D9FF;">📊 Detection Results</h3>', unsafe_allow_html=True)
@@ -540,6 +614,8 @@ def show_live_detection():
                         "height": float(height),
                         "weight": float(weight)
                     }
+                    if DEVICE_ID:
+                        params["device_id"] = DEVICE_ID
 
                     res = requests.get(
                         "http://127.0.0.1:8000/predict",
@@ -595,6 +671,9 @@ def show_live_detection():
                 st.error(f"🔴 Backend or device not reachable: {e}")
                 return
 
+    if stream_button:
+        show_live_stream(age, gender, height, weight, stream_seconds)
+
     # ======================================================
     # 🧠 FULL WIDTH CLINICAL SECTION (OUTSIDE COLUMNS)
     # ======================================================
@@ -792,6 +871,12 @@ Excellent long-term liver health expected.
 
                
 
+def fetch_analytics(window):
+    res = requests.get("http://127.0.0.1:8000/analytics", params={"window": window}, timeout=10)
+    res.raise_for_status()
+    return res.json()
+
+
 def show_analytics():
     st.markdown('<h1 class="main-header">Advanced Analytics</h1>', unsafe_allow_html=True)
 
@@ -802,95 +887,116 @@ def show_analytics():
         "Select Analytics View",
         ["📡 Sensor Performance", "🤖 Model Performance"]
     )
+    windows = {"Last hour": 3600, "Last 6 hours": 6 * 3600, "Last 24 hours": 24 * 3600}
+    window = st.radio("Time window", list(windows), horizontal=True)
+
+    # counters are pre-aggregated by the backend, so this is one small request
+    try:
+        data = fetch_analytics(windows[window])
+    except Exception as e:
+        st.error(f"🔴 Analytics unavailable: {e}")
+        return
+
+    series = pd.DataFrame(data["series"])
+    if not series.empty:
+        series["time"] = pd.to_datetime(series["ts"], unit="s")
+        series = series.set_index("time")
 
     st.markdown("---")
 
     # ======================================================
-    # SENSOR PERFORMANCE (CUSTOM)
+    # SENSOR PERFORMANCE (LIVE)
     # ======================================================
     if view == "📡 Sensor Performance":
+        sensors = data["sensors"]
+        rates = sensors["failure_rates"]
+
+        if not sensors["readings"]:
+            st.info("No sensor readings in this window yet.")
+            return
+
+        def valid(rate):
+            return "n/a" if rate is None else f"{(1 - rate) * 100:.1f}%"
 
-        st.markdown("### 📡 Individual Sensor Accuracy")
+        st.markdown("### 📡 Valid Readings per Sensor")
 
         col1, col2, col3 = st.columns(3)
 
         with col1:
-            st.metric("GSR Sensor", "91%", "+2%")
+            st.metric("GSR Sensor", valid(rates["gsr_out_of_range"]))
 
         with col2:
-            st.metric("Thermal Sensor", "94%", "+1.5%")
+            thermal = max(rates["bodyTemp_out_of_range"], rates["thermalMax_out_of_range"])
+            st.metric("Thermal Sensor", valid(thermal))
 
         with col3:
-            st.metric("RGB / Yellowness", "92%", "+2.3%")
+            st.metric("RGB / Yellowness", valid(rates["rgb_zero"]))
 
-        st.markdown("---")
-
-        st.info(
-            "Multi-sensor fusion improves robustness. "
-            "If one sensor becomes noisy, ensemble models maintain stability."
+        st.caption(
+            f"{sensors['readings']} readings · {sensors['failure_rate'] * 100:.2f}% with at least one failed sensor"
         )
 
-        # Extra professional touch
-        st.markdown("### 🎯 Reliability Radar")
-
-        import plotly.graph_objects as go
-
-        metrics = ['Accuracy', 'Stability', 'Noise Resistance', 'Response Speed']
-
-        fig = go.Figure()
-
-        fig.add_trace(go.Scatterpolar(
-            r=[91, 90, 88, 92, 91],
-            theta=metrics + [metrics[0]],
-            fill='toself',
-            name='GSR'
-        ))
-
-        fig.add_trace(go.Scatterpolar(
-            r=[94, 93, 90, 91, 94],
-            theta=metrics + [metrics[0]],
-            fill='toself',
-            name='Thermal'
-        ))
+        st.markdown("---")
 
-        fig.add_trace(go.Scatterpolar(
-            r=[92, 91, 89, 94, 92],
-            theta=metrics + [metrics[0]],
-            fill='toself',
-            name='RGB'
-        ))
+        st.markdown("### ⚠️ Failure Rate over Time")
+        st.line_chart(series[["failure_rate"]].rename(columns={"failure_rate": "Failure rate"}))
 
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        st.markdown("### 📊 Channel Statistics")
+        st.dataframe(
+            pd.DataFrame(sensors["channels"]).T.rename(columns={"mean": "Mean", "std": "Std"}),
+            use_container_width=True
+        )
 
     # ======================================================
-    # MODEL PERFORMANCE (YOUR IMAGES)
+    # MODEL PERFORMANCE (LIVE + VALIDATION IMAGES)
     # ======================================================
     elif view == "🤖 Model Performance":
-
-        st.markdown("### 🔥 Feature Correlation Matrix")
-        st.image("assets/correlation.jpeg", use_container_width=True)
+        models = data["models"]
+
+        if not models["predictions"]:
+            st.info("No predictions in this window yet.")
+        else:
+            st.markdown("### 🤖 Live Model Behaviour")
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Predictions", models["predictions"])
+            col2.metric("Voting vs Stacked disagreement", f"{models['disagreement_rate'] * 100:.1f}%")
+            col3.metric("Mean |Voting − Stacked|", f"{models['mean_abs_diff']:.3f}")
+
+            st.markdown("### 📈 Score Distribution")
+            bins = len(models["score_histogram"]["Voting"])
+            fig = go.Figure()
+            for name, counts in models["score_histogram"].items():
+                fig.add_trace(go.Bar(
+                    x=[(i + 0.5) / bins for i in range(bins)],
+                    y=counts,
+                    name=name
+                ))
+            fig.update_layout(barmode="group", height=400, xaxis_title="Probability", yaxis_title="Predictions")
+            st.plotly_chart(fig, use_container_width=True)
+
+            st.markdown("### 🔀 Disagreement over Time")
+            st.line_chart(series[["disagreement_rate", "mean_score"]].rename(
+                columns={"disagreement_rate": "Disagreement rate", "mean_score": "Mean score"}
+            ))
 
         st.markdown("---")
 
-        col1, col2 = st.columns(2)
+        with st.expander("🧪 Offline validation (training dataset)"):
+            st.markdown("### 🔥 Feature Correlation Matrix")
+            st.image("assets/correlation.jpeg", use_container_width=True)
 
-        with col1:
-            st.markdown("### 🚀 ROC – Stacked Model")
-            st.image("assets/roc_stacked.jpeg", use_container_width=True)
+            col1, col2 = st.columns(2)
 
-        with col2:
-            st.markdown("### ⚡ ROC – Voting Model")
-            st.image("assets/roc_voting.jpeg", use_container_width=True)
+            with col1:
+                st.markdown("### 🚀 ROC – Stacked Model")
+                st.image("assets/roc_stacked.jpeg", use_container_width=True)
+
+            with col2:
+                st.markdown("### ⚡ ROC – Voting Model")
+                st.image("assets/roc_voting.jpeg", use_container_width=True)
 
-        st.success(
-            "Evaluation derived from validation dataset. "
-            "Both ensemble strategies demonstrate strong discrimination power."
-        )
 
-    
-    
-           
 def show_about():
     st.markdown('<h1 class="main-header">About Liver Guard AI</h1>', unsafe_allow_html=True)
     